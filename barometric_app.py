@@ -1,81 +1,105 @@
-import requests
+import http_client
+import observation_store
+import time_parse
 import datetime
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import pytz
 import numpy as np
 
-def get_barometric_plot_with_history():
-    obs_url = "https://api.weather.gov/stations/KGON/observations"
+TENDENCY_HOURS = (1, 3, 6, 12)
+MAX_SAMPLE_GAP = 30 * 60  # Seconds a reading may be from the requested time and still stand in for it
+
+class PressureSeries:
+    """Station pressure (inHg) at sorted instants, shared by the gauge and the plot.
+    Lookups are binary searches; times come back as aware UTC datetimes."""
+
+    def __init__(self, times, pressures):
+        # times: naive UTC datetime64 (as from observation_store), any order
+        times = np.asarray(times, dtype="datetime64[s]")
+        order = np.argsort(times, kind="stable")
+        self.seconds = times[order].astype(np.int64)
+        self.pressures = np.asarray(pressures, dtype=float)[order]
+
+    def __len__(self):
+        return len(self.seconds)
+
+    @property
+    def times(self):
+        return time_parse.as_datetimes(self.seconds.astype("datetime64[s]"))
+
+    @property
+    def current(self):
+        return float(self.pressures[-1]) if len(self.pressures) else None
+
+    def trend(self):
+        return "Rising" if len(self.pressures) > 1 and self.pressures[-1] > self.pressures[-2] else "Falling"
+
+    def pressure_at(self, when):
+        """Reading nearest to `when`, or None if none is within MAX_SAMPLE_GAP of it."""
+        target = when.timestamp()
+        i = int(np.searchsorted(self.seconds, target))
+        nearest = min((j for j in (i - 1, i) if 0 <= j < len(self.seconds)),
+                      key=lambda j: abs(self.seconds[j] - target), default=None)
+        if nearest is None or abs(self.seconds[nearest] - target) > MAX_SAMPLE_GAP:
+            return None
+        return float(self.pressures[nearest])
+
+    def tendency(self, hours, now=None):
+        """Change in inHg over the last `hours`, or None without a reading that old."""
+        now = now or datetime.datetime.now(pytz.UTC)
+        then = self.pressure_at(now - datetime.timedelta(hours=hours))
+        return round(self.current - then, 2) if then is not None and self.current is not None else None
+
+    def tendencies(self, now=None):
+        return {f"{hours}h": self.tendency(hours, now) for hours in TENDENCY_HOURS}
+
+# Function to get the recent KGON pressure history as a PressureSeries
+def get_pressure_series(hours=48, now=None):
+    return PressureSeries(*observation_store.store.pressure_history(hours=hours, now=now))
+
+def get_barometric_plot_with_history(series=None):
     forecast_url = "https://api.weather.gov/gridpoints/OKX/51,44/forecast/hourly"
-    headers = {"User-Agent": "weather_app"}
     utc = pytz.UTC
     
     try:
-        # Fetch actual data (past 48+ hours)
-        obs_response = requests.get(obs_url, headers=headers)
-        obs_response.raise_for_status()
-        obs_data = obs_response.json()
-        observations = obs_data["features"]
-
-        actual_times = []
-        actual_pressures = []
+        # Actual data (past 48 hours) from the shared KGON feed
         now = datetime.datetime.now(utc)
-        two_days_ago = now - datetime.timedelta(hours=48)
-        three_hours_ago = now - datetime.timedelta(hours=3)
-        pressure_3h_ago = None
-        for obs in observations:
-            timestamp = obs["properties"]["timestamp"].replace("+00:00", "Z")
-            time = datetime.datetime.fromisoformat(timestamp[:-1]).replace(tzinfo=utc)
-            if time >= two_days_ago and time <= now:
-                pressure = obs["properties"]["barometricPressure"]["value"]
-                if pressure is not None:
-                    pressure = round(pressure * 0.000295301, 2)
-                    actual_times.append(time)
-                    actual_pressures.append(pressure)
-                    # Find pressure closest to 3 hours ago
-                    if time <= three_hours_ago and (pressure_3h_ago is None or abs(time - three_hours_ago) < abs(actual_times[actual_pressures.index(pressure_3h_ago)] - three_hours_ago)):
-                        pressure_3h_ago = pressure
-
-        if not actual_times:
+        series = series if series is not None else get_pressure_series(hours=48, now=now)
+        if not len(series):
             print("No valid actual pressure data available.")
             return None, None, None, None
-
-        # Sort chronologically
-        actual_data = sorted(zip(actual_times, actual_pressures), key=lambda x: x[0])
-        actual_times, actual_pressures = zip(*actual_data)
-        actual_times = list(actual_times)
-        actual_pressures = list(actual_pressures)
+        actual_times = series.times
+        actual_pressures = series.pressures
+        pressure_3h_ago = series.pressure_at(now - datetime.timedelta(hours=3))
 
         # Debug
         print(f"Sample actual pressures (inHg): {actual_pressures[-5:]}")
-        if pressure_3h_ago:
-            print(f"Pressure 3h ago: {pressure_3h_ago:.2f} inHg at {actual_times[actual_pressures.index(pressure_3h_ago)]}")
+        if pressure_3h_ago is not None:
+            print(f"Pressure 3h ago: {pressure_3h_ago:.2f} inHg, tendencies: {series.tendencies(now)}")
 
         # Current pressure and trend
-        current_pressure = actual_pressures[-1]
-        trend = "Rising" if len(actual_pressures) > 1 and actual_pressures[-1] > actual_pressures[-2] else "Falling"
+        current_pressure = series.current
+        trend = series.trend()
 
         # Fetch forecast data (next 8 hours)
-        forecast_response = requests.get(forecast_url, headers=headers)
-        forecast_response.raise_for_status()
-        forecast_data = forecast_response.json()
+        forecast_data = http_client.get_json(forecast_url, ttl=1800)
         forecast_periods = forecast_data["properties"]["periods"]
 
         forecast_times = []
         forecast_pressures = []
-        eight_hours_future = now + datetime.timedelta(hours=8)
-        last_actual = actual_pressures[-1]
-        for i, period in enumerate(forecast_periods):
-            time = datetime.datetime.fromisoformat(period["startTime"][:-6]).replace(tzinfo=utc)
-            if time >= now and time <= eight_hours_future:
-                pressure = period.get("pressure", {}).get("value")
-                if pressure is not None:
-                    pressure = round(pressure * 0.000295301, 2)
-                else:
-                    pressure = round(last_actual + (0.05 * (i % 4) - 0.03 * ((i // 4) % 2)), 2)
-                forecast_times.append(time)
-                forecast_pressures.append(pressure)
+        last_actual = current_pressure
+        start_times = time_parse.parse_utc([period["startTime"] for period in forecast_periods])
+        now64 = np.datetime64(now.replace(tzinfo=None), "s")
+        in_window = np.flatnonzero((start_times >= now64) & (start_times <= now64 + np.timedelta64(8, "h")))
+        for i, time in zip(in_window, time_parse.as_datetimes(start_times[in_window])):
+            pressure = forecast_periods[i].get("pressure", {}).get("value")
+            if pressure is not None:
+                pressure = round(pressure * 0.000295301, 2)
+            else:
+                pressure = round(last_actual + (0.05 * (i % 4) - 0.03 * ((i // 4) % 2)), 2)
+            forecast_times.append(time)
+            forecast_pressures.append(pressure)
 
         if not forecast_times:
             print("No valid forecast pressure data available.")
@@ -85,7 +109,6 @@ def get_barometric_plot_with_history():
         print(f"Sample forecast pressures (inHg): {forecast_pressures[:5]}")
 
         # Create plot (unchanged plotting code)
-        plt.close('all')
         fig, ax = plt.subplots(figsize=(5, 3))
         ax.plot(actual_times, actual_pressures, color='black', linestyle='-', linewidth=1)
         if actual_times and forecast_times:
@@ -117,9 +140,9 @@ def get_barometric_plot_with_history():
         ax.set_xticks(minor_ticks, minor=True)
         ax.tick_params(axis='x', which='minor', length=4)
 
-        all_pressures = actual_pressures + forecast_pressures
-        min_pressure = min(29.0, min(all_pressures) - 0.2)
-        max_pressure = max(31.0, max(all_pressures) + 0.2)
+        all_pressures = np.concatenate([actual_pressures, forecast_pressures])
+        min_pressure = min(29.0, all_pressures.min() - 0.2)
+        max_pressure = max(31.0, all_pressures.max() + 0.2)
         ax.set_ylim(min_pressure, max_pressure)
         ax.set_yticks(np.arange(29.0, 31.5, 0.5))
 
@@ -132,13 +155,25 @@ def get_barometric_plot_with_history():
         ax.set_title("Barometric Pressure", color='#000000')
         ax.set_xlabel("")
         ax.set_ylabel("Pressure (inHg)", color='#000000')
-        plt.tight_layout()
+        fig.tight_layout()  # Figure-level so concurrent fetches don't lay out each other's plots
 
         return fig, current_pressure, trend, pressure_3h_ago
     except Exception as e:
         print(f"Error in get_barometric_plot_with_history: {e}")
         return None, None, None, None
 
+# Function to get just the pressure numbers (no figure, no forecast) from a series (fetched here if not given)
+def get_pressure_summary(series=None):
+    try:
+        series = series if series is not None else get_pressure_series()
+    except Exception as e:
+        print(f"Error in get_pressure_summary: {e}")
+        return None, None, None
+    if not len(series):
+        return None, None, None
+    now = datetime.datetime.now(pytz.UTC)
+    return series.current, series.trend(), series.pressure_at(now - datetime.timedelta(hours=3))
+
 # Alias for backward compatibility
 def get_barometric_plot():
     fig, current_pressure, trend, _ = get_barometric_plot_with_history()
@@ -0,0 +1,135 @@
+# cassette.py
+# Record/replay of upstream API traffic so the dashboard can be tested and benchmarked offline.
+#   GLP_HTTP_MODE=record   call the live APIs and save every response under GLP_CASSETTE_DIR
+#   GLP_HTTP_MODE=replay   serve the saved responses, never touching the network
+#   GLP_REPLAY_LATENCY=0.2 seconds of injected latency per replayed call
+#   GLP_HOST_LATENCY="api.weather.gov=0.4,waze=2"  per-host latency, overriding GLP_REPLAY_LATENCY
+# e.g.  GLP_HTTP_MODE=record streamlit run weather_dashboard.py
+# Recordings hold real responses and request URLs/bodies (API keys included), so the default
+# fixtures/ directory is git-ignored; share them deliberately, not by accident.
+import functools
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from urllib.parse import urlsplit
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+
+MODE = os.environ.get("GLP_HTTP_MODE", "live")
+CASSETTE_DIR = os.environ.get(
+    "GLP_CASSETTE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+)
+REPLAY_LATENCY = float(os.environ.get("GLP_REPLAY_LATENCY", "0"))
+
+# Function to parse "host=seconds,host=seconds" into {host: seconds}
+def _parse_host_latency(spec):
+    latency = {}
+    for item in spec.split(","):
+        host, _, seconds = item.strip().partition("=")
+        if host and seconds:
+            latency[host.strip()] = float(seconds)
+    return latency
+
+HOST_LATENCY = _parse_host_latency(os.environ.get("GLP_HOST_LATENCY", ""))  # e.g. {"api.weather.gov": 0.4, "waze": 2.0}
+
+DATE_PATTERN = re.compile(r"\d{4}-?\d{2}-?\d{2}([T ]?\d{2}:?\d{2}(:?\d{2})?)?")
+
+# Function to hash a request identity
+def _digest(identity):
+    return hashlib.sha1(identity.encode("utf-8")).hexdigest()[:12]
+
+# Function to build the fixture path for a request: <dir>/<host>/<method>_<path>_<shape>_<exact>.json
+# "shape" is the identity with dates masked out, so the same request on another day can still match
+def _fixture_path(host, method, path, identity):
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+    shape = _digest(DATE_PATTERN.sub("<date>", identity))
+    return os.path.join(CASSETTE_DIR, host, f"{method.lower()}_{slug}_{shape}_{_digest(identity)}.json")
+
+# Function to find a fixture: exact match first, else the newest recording of the same request shape
+def _find_fixture(path):
+    if os.path.exists(path):
+        return path
+    prefix = path.rsplit("_", 1)[0]
+    candidates = glob.glob(f"{glob.escape(prefix)}_*.json")
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+# Function to sleep for the configured replay latency
+def _inject_latency(host):
+    latency = HOST_LATENCY.get(host, REPLAY_LATENCY)
+    if latency:
+        time.sleep(latency)
+
+# Function to write a fixture file
+def _save(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+
+class CassetteAdapter(HTTPAdapter):
+    """HTTPAdapter that records or replays responses according to GLP_HTTP_MODE."""
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        body = request.body.decode("utf-8") if isinstance(request.body, bytes) else (request.body or "")
+        path = _fixture_path(parts.netloc, request.method, parts.path, f"{request.method} {request.url} {body}")
+        if MODE == "replay":
+            return self._replay(request, path, parts.netloc)
+        response = super().send(request, **kwargs)
+        if MODE == "record" and response.status_code != 304:  # A 304 only makes sense next to a cached body
+            _save(path, {
+                "request": {"method": request.method, "url": request.url, "body": body},
+                "response": {
+                    "status": response.status_code,
+                    "headers": dict(response.headers),
+                    "body": response.text
+                }
+            })
+        return response
+
+    def _replay(self, request, path, host):
+        fixture = _find_fixture(path)
+        if fixture is None:
+            raise ConnectionError(f"No recorded response for {request.method} {request.url}")
+        with open(fixture, encoding="utf-8") as f:
+            recorded = json.load(f)["response"]
+        _inject_latency(host)
+        response = Response()
+        response.status_code = recorded["status"]
+        headers = {k: v for k, v in recorded["headers"].items()
+                   if k.lower() not in ("content-encoding", "transfer-encoding", "content-length")}
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = recorded["body"].encode("utf-8")
+        response._content_consumed = True  # Lets iter_content() serve the body for stream=True callers
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.reason = "Replayed"
+        return response
+
+# Decorator to record/replay a function's JSON-serialisable result, for upstreams that
+# don't go through our session (e.g. WazeRouteCalculator, which makes its own requests)
+def recorded(name):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args):
+            path = _fixture_path(name, "call", fn.__name__, json.dumps(args))
+            if MODE == "replay":
+                fixture = _find_fixture(path)
+                if fixture is None:
+                    raise ConnectionError(f"No recorded result for {name}.{fn.__name__}{args}")
+                with open(fixture, encoding="utf-8") as f:
+                    result = json.load(f)["result"]
+                _inject_latency(name)
+                return result
+            result = fn(*args)
+            if MODE == "record":
+                _save(path, {"args": list(args), "result": result})
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,76 @@
+# circuit_breaker.py
+# Per-upstream circuit breakers: once a host has failed several times in a row it is
+# skipped for a cool-down period, so renders stop waiting on its timeouts.
+import threading
+import time
+
+FAILURE_THRESHOLD = 3  # Consecutive failures before the circuit opens
+COOL_DOWN_SECONDS = 60  # How long an open circuit skips the host before one trial call
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    """Closed until FAILURE_THRESHOLD consecutive failures; then open for COOL_DOWN_SECONDS,
+    after which a single trial call decides whether it closes again."""
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, cool_down=COOL_DOWN_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cool_down = cool_down
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cool_down or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True  # Half-open: let exactly one call probe the host
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                print(f"[DEBUG] Circuit closed: {self.name}")
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    print(f"[DEBUG] Circuit opened: {self.name} after {self.failures} failures")
+                self.opened_at = time.monotonic()  # A failed trial restarts the cool-down
+
+    def release(self):
+        # Call ended without saying anything about the host (e.g. our own render budget ran out)
+        with self._lock:
+            self._trial_in_flight = False
+
+    def call(self, fn, *args, **kwargs):
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} is cooling down after repeated failures")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+# Function to get the process-wide breaker for an upstream (a host name, or e.g. "waze")
+def breaker(name):
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
@@ -2,39 +2,62 @@ import matplotlib
 matplotlib.use('Agg', force=True)
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+import io
 import math
+import string
+import threading
+from xml.sax.saxutils import escape
 import numpy as np
-import requests
+import barometric_app
+import coops_client
+import http_client
+import singleflight
 import json
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from PIL import Image
 from weather_data import get_current_conditions, degrees_to_cardinal, get_current_water_temp, get_average_water_temp
 
 def get_noaa_wave_data():
-    """Fetch wave height from NOAA for New London, CT (near Groton)."""
+    """Fetch wave height from NOAA for New London, CT (near Groton); None if there's no reading."""
     try:
-        url = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
-        params = {
-            "date": "latest",
-            "station": "8461490",  # New London, CT
-            "product": "waves",
-            "format": "json",
-            "units": "english",
-            "time_zone": "gmt"
-        }
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            wave_height_ft = float(data["data"][0]["wh"]) if data.get("data") else 0.0
-            return wave_height_ft, 0.0  # NOAA waves, no swell
-        else:
-            print(f"NOAA API Error: {response.status_code}")
-            return 0.0, 0.0
+        reading = coops_client.latest("waves")
+        if reading is None:
+            print("NOAA: no recent wave reading")
+            return None
+        return reading[1], 0.0  # NOAA waves, no swell
     except Exception as e:
         print(f"NOAA Request Failed: {e}")
-        return 0.0, 0.0
+        return None
+
+# Function to get the KGON pressure 3 hours ago from the shared history, else a nominal fall
+def _pressure_3h_ago(baro_pressure):
+    try:
+        series = barometric_app.get_pressure_series(hours=12)
+        pressure = series.pressure_at(datetime.now(timezone.utc) - timedelta(hours=3))
+        if pressure is not None:
+            return pressure
+    except Exception as e:
+        print(f"Pressure history unavailable: {e}")
+    return baro_pressure - 0.1
+
+# Function to map a pressure (inHg) to its angle on the barometer dial: 28-30 fill the left half, 30-30.7 the right
+def _baro_angle(pressure):
+    pressure = min(max(pressure, 28), 30.7)
+    if pressure <= 30.0:
+        angle = 180 - ((pressure - 28) / (30.0 - 28)) * 90
+    else:
+        angle = 90 - ((pressure - 30.0) / (30.7 - 30.0)) * 90
+    return max(0, min(180, angle))
+
+# Function to map a value to its angle (degrees counterclockwise from +x) on a semicircular scale
+def _scale_angle(value, min_value, max_value, clamp=True):
+    if clamp:
+        value = min(max(value, min_value), max_value)
+    return 180 - ((value - min_value) / (max_value - min_value)) * 180
 
+@singleflight.coalesce
 def get_windy_wave_data():
-    """Fetch wave and swell height from Windy API, fallback to NOAA if dummy data."""
+    """Fetch wave and swell height from Windy API, fallback to NOAA if dummy data; None if neither has data."""
     url = "https://api.windy.com/api/point-forecast/v2"
     payload = {
         "lat": 41.311,
@@ -45,9 +68,8 @@ def get_windy_wave_data():
         "levels": ["surface"],
         "time": "now"
     }
-    headers = {"Content-Type": "application/json"}
     try:
-        response = requests.post(url, json=payload, headers=headers)
+        response = http_client.post(url, json=payload)
         if response.status_code == 200:
             data = response.json()
             wave_height_m = data.get("waves_height-surface", [0])[0]
@@ -66,15 +88,53 @@ def get_windy_wave_data():
         print(f"Windy Request Failed: {e}")
         return get_noaa_wave_data()
 
+GAUGE_PALETTE = {
+    'figure_bg': '#ffffff',
+    'gauge_bg': '#B3CDE0',
+    'border': '#3c2f2f',
+    'text': '#3c2f2f',
+    'value': 'black',
+    'needle': 'black',
+    'gust_needle': '#b22222',
+    'secondary_needle': 'red'
+}
+GAUGE_FONT = "serif"
+DIAL_LIMIT = 1.215
+TIGHT_PAD_INCHES = 0.1  # Same padding savefig(bbox_inches='tight') adds
+GAUGE_WIDTH_INCHES = 1.78
+GAUGE_GAP_INCHES = 0.25
+# A figure of just the dials, as savefig(bbox_inches='tight') would crop it
+STRIP_WIDTH_INCHES = 8 * GAUGE_WIDTH_INCHES + 7 * GAUGE_GAP_INCHES + 2 * TIGHT_PAD_INCHES
+STRIP_HEIGHT_INCHES = GAUGE_WIDTH_INCHES + 2 * TIGHT_PAD_INCHES
+# Pillow save() options per output format; both trade a little size for a much faster encode
+IMAGE_ENCODERS = {
+    "png": {"format": "png", "compress_level": 1},
+    "webp": {"format": "webp", "quality": 90, "method": 0},
+}
+POINTS_PER_INCH = 72  # SVG user units are points, so font sizes and line widths carry over as-is
+SVG_DIAL_SCALE = GAUGE_WIDTH_INCHES * POINTS_PER_INCH / (2 * DIAL_LIMIT)  # Points per dial unit
+DIAL_NAMES = ("wind_direction", "wind_speed", "temperature", "precipitation", "pressure", "humidity", "water_temp", "waves")
+MAX_TILES = 64  # Rendered dials kept per gauge, across all eight dials
+
 class CompassRoseGauge:
-    def __init__(self, width=16, height=6):
-        self.fig = plt.figure(figsize=(width, height), facecolor='#ffffff')
+    """Strip of eight dials. The faces (circles, ticks, scale labels, titles) are drawn once;
+    render_image() keeps them as a raster and pastes in each dial's needles and values, rendered
+    once per distinct reading and cached as a tile."""
+
+    def __init__(self, width=16, height=6, color_palette=None, font=None, dpi=None, pixel_width=None):
+        # pixel_width sizes the figure to the dials alone, that many pixels wide (width, height and dpi are then ignored)
+        self.palette = color_palette if color_palette else GAUGE_PALETTE
+        self.font = font if font else GAUGE_FONT
+        self.fitted = pixel_width is not None
+        if self.fitted:
+            width, height, dpi = STRIP_WIDTH_INCHES, STRIP_HEIGHT_INCHES, pixel_width / STRIP_WIDTH_INCHES
+        self.fig = plt.figure(figsize=(width, height), facecolor=self.palette['figure_bg'], dpi=dpi)
         
-        gauge_width = 1.78
-        gap = 0.25
+        gauge_width = GAUGE_WIDTH_INCHES
+        gap = GAUGE_GAP_INCHES
         left_margin = (width - (8 * gauge_width + 7 * gap)) / 2
-        top_row_y = 0.35
-        gauge_height = 2.5
+        top_row_y = TIGHT_PAD_INCHES / height if self.fitted else 0.35
+        gauge_height = gauge_width if self.fitted else 2.5
         
         self.ax1 = self.fig.add_axes([left_margin / width, top_row_y, gauge_width / width, gauge_height / height])  # Wind Direction
         self.ax2 = self.fig.add_axes([(left_margin + gauge_width + gap) / width, top_row_y, gauge_width / width, gauge_height / height])  # Wind Speed
@@ -84,27 +144,94 @@ class CompassRoseGauge:
         self.ax6 = self.fig.add_axes([(left_margin + 5 * (gauge_width + gap)) / width, top_row_y, gauge_width / width, gauge_height / height])  # Humidity
         self.ax7 = self.fig.add_axes([(left_margin + 6 * (gauge_width + gap)) / width, top_row_y, gauge_width / width, gauge_height / height])  # Water Temperature
         self.ax8 = self.fig.add_axes([(left_margin + 7 * (gauge_width + gap)) / width, top_row_y, gauge_width / width, gauge_height / height])  # Wave Height
+        self.axes = (self.ax1, self.ax2, self.ax3, self.ax4, self.ax5, self.ax6, self.ax7, self.ax8)
         
-        for ax in (self.ax1, self.ax2, self.ax3, self.ax4, self.ax5, self.ax6, self.ax7, self.ax8):
-            ax.set_xlim(-1.215, 1.215)
-            ax.set_ylim(-1.215, 1.215)
+        self.fig.canvas.manager.set_window_title("Weather Dashboard Gauges")
+        self._values = []  # Needles and value text from the last draw_values()
+        self._background = None  # Raster of the faces, filled by the first render_image()
+        self._crop = None  # Pixel box kept: the whole figure if fitted, else what savefig(bbox_inches='tight') would keep
+        self._boxes = {}  # Dial name -> its pixel box on the canvas
+        self._faces = {}  # Dial name -> its bare face pixels
+        self._tiles = {}  # (dial name, inputs) -> rendered dial pixels, oldest first
+        self.draw_faces()
+
+    def draw_compass_rose(self, wind_direction, wind_speed, wind_gusts, temperature, precip_24h, baro_pressure, humidity, water_temp, wave_height, baro_pressure_3h_ago=None, swell_height=0.0, water_temp_average=None):
+        self.draw_values(wind_direction, wind_speed, wind_gusts, temperature, precip_24h, baro_pressure,
+                         humidity, water_temp, wave_height, baro_pressure_3h_ago, swell_height, water_temp_average)
+
+    def render_image(self, wind_direction, wind_speed, wind_gusts, temperature, precip_24h, baro_pressure, humidity, water_temp, wave_height, baro_pressure_3h_ago=None, swell_height=0.0, water_temp_average=None, image_format="png"):
+        """Encoded bytes (see IMAGE_ENCODERS) of the strip assembled from cached dial tiles."""
+        if self._background is None:
+            self._draw_background()
+        strip = self._background.copy()
+        crop_left, crop_top = self._crop[:2]
+        for name, ax, draw, inputs in self._dials(wind_direction, wind_speed, wind_gusts, temperature, precip_24h, baro_pressure,
+                                                  humidity, water_temp, wave_height, baro_pressure_3h_ago, swell_height, water_temp_average):
+            left, top, right, bottom = self._boxes[name]
+            strip[top - crop_top:bottom - crop_top, left - crop_left:right - crop_left] = self._tile(name, ax, draw, inputs)
+        buf = io.BytesIO()
+        Image.fromarray(strip[:, :, :3]).save(buf, **IMAGE_ENCODERS[image_format])  # The faces are opaque; alpha is dead weight
+        return buf.getvalue()
+
+    # Function to rasterize the faces once, and find the tight crop and each dial's pixel box inside it
+    def _draw_background(self):
+        canvas = self.fig.canvas
+        self._clear_values()
+        canvas.draw()
+        pixels = np.asarray(canvas.buffer_rgba())
+        height = pixels.shape[0]
+        if self.fitted:
+            # Already laid out as tight as savefig would crop it; skip the tight bbox pass
+            self._crop = (0, 0, pixels.shape[1], height)
+        else:
+            tight = self.fig.get_tightbbox(canvas.get_renderer()).padded(TIGHT_PAD_INCHES)
+            dpi = self.fig.dpi
+            left, top = max(int(round(tight.x0 * dpi)), 0), max(int(round(height - tight.y1 * dpi)), 0)
+            self._crop = (left, top, left + int(tight.width * dpi), top + int(tight.height * dpi))
+        self._background = pixels[self._crop[1]:self._crop[3], self._crop[0]:self._crop[2]].copy()
+        self._boxes, self._faces = {}, {}
+        for name, ax in zip(DIAL_NAMES, self.axes):
+            box = ax.bbox  # Display pixels, origin at the bottom
+            left, right = max(int(box.x0), self._crop[0]), min(int(math.ceil(box.x1)), self._crop[2])
+            top, bottom = max(height - int(math.ceil(box.y1)), self._crop[1]), min(height - int(box.y0), self._crop[3])
+            self._boxes[name] = (left, top, right, bottom)
+            self._faces[name] = pixels[top:bottom, left:right].copy()
+
+    # Function to get one dial's pixels for its inputs, drawing its needles over its bare face on a miss
+    def _tile(self, name, ax, draw, inputs):
+        key = (name, inputs)
+        tile = self._tiles.get(key)
+        if tile is None:
+            left, top, right, bottom = self._boxes[name]
+            pixels = np.asarray(self.fig.canvas.buffer_rgba())
+            pixels[top:bottom, left:right] = self._faces[name]
+            artists = draw(*inputs)
+            for artist in sorted(artists, key=lambda a: a.get_zorder()):
+                ax.draw_artist(artist)
+            for artist in artists:
+                artist.remove()
+            tile = pixels[top:bottom, left:right].copy()
+            if len(self._tiles) >= MAX_TILES:
+                self._tiles.pop(next(iter(self._tiles)))  # Oldest first
+            self._tiles[key] = tile
+        return tile
+
+    def draw_faces(self):
+        border, text, face, font = self.palette['border'], self.palette['text'], self.palette['gauge_bg'], self.font
+        self._values = []
+        self._background = None
+        self._tiles = {}
+        for ax in self.axes:
+            ax.clear()
+            ax.set_xlim(-DIAL_LIMIT, DIAL_LIMIT)
+            ax.set_ylim(-DIAL_LIMIT, DIAL_LIMIT)
             ax.set_aspect('equal')
             ax.axis('off')
-        
-        self.fig.canvas.manager.set_window_title("Weather Dashboard Gauges")
 
-    def draw_compass_rose(self, wind_direction, wind_speed, wind_gusts, temperature, precip_24h, baro_pressure, humidity, water_temp, wave_height, baro_pressure_3h_ago=None, swell_height=0.0):
         # Wind Direction (ax1)
-        wind_dir_text = degrees_to_cardinal(wind_direction)
-        self.ax1.clear()
-        self.ax1.set_xlim(-1.215, 1.215)
-        self.ax1.set_ylim(-1.215, 1.215)
-        self.ax1.set_aspect('equal')
-        self.ax1.axis('off')
-
-        outer_circle = patches.Circle((0, 0), 1.215, edgecolor='#3c2f2f', facecolor='none', linewidth=1.35)
+        outer_circle = patches.Circle((0, 0), 1.215, edgecolor=border, facecolor='none', linewidth=1.35)
         self.ax1.add_patch(outer_circle)
-        inner_circle = patches.Circle((0, 0), 0.9, edgecolor='#3c2f2f', facecolor='#B3CDE0', linewidth=0.9)
+        inner_circle = patches.Circle((0, 0), 0.9, edgecolor=border, facecolor=face, linewidth=0.9)
         self.ax1.add_patch(inner_circle)
 
         directions = {"N": 0, "NE": 45, "E": 90, "SE": 135, "S": 180, "SW": 225, "W": 270, "NW": 315}
@@ -116,11 +243,11 @@ class CompassRoseGauge:
             y_outer = length * math.sin(rad)
             x_inner = inner_length * 0.72 * math.cos(rad)
             y_inner = inner_length * 0.72 * math.sin(rad)
-            self.ax1.plot([x_inner, x_outer], [y_inner, y_outer], color='#3c2f2f', linewidth=1.08)
+            self.ax1.plot([x_inner, x_outer], [y_inner, y_outer], color=border, linewidth=1.08)
             label_x = 1.125 * math.cos(rad) if label in ["N", "E", "S", "W"] else 1.035 * math.cos(rad)
             label_y = 1.125 * math.sin(rad) if label in ["N", "E", "S", "W"] else 1.035 * math.sin(rad)
             self.ax1.text(label_x, label_y, label, ha='center', va='center', 
-                         fontsize=9 if label in ["N", "E", "S", "W"] else 7.2, family='serif', color='#3c2f2f')
+                         fontsize=9 if label in ["N", "E", "S", "W"] else 7.2, family=font, color=text)
 
         for angle in range(0, 360, 15):
             if angle % 45 != 0:
@@ -129,177 +256,29 @@ class CompassRoseGauge:
                 y_outer = 1.08 * math.sin(rad)
                 x_inner = 1.035 * math.cos(rad)
                 y_inner = 1.035 * math.sin(rad)
-                self.ax1.plot([x_inner, x_outer], [y_inner, y_outer], color='#3c2f2f', linewidth=0.72)
+                self.ax1.plot([x_inner, x_outer], [y_inner, y_outer], color=border, linewidth=0.72)
 
-        needle_length = 0.81
-        rad = math.radians(90 - wind_direction)
-        tip_x = needle_length * math.cos(rad)
-        tip_y = needle_length * math.sin(rad)
-        self.ax1.arrow(0, 0, tip_x, tip_y, color='black', width=0.018, head_width=0.054, head_length=0.09, 
-                      length_includes_head=True)
-
-        center_circle = patches.Circle((0, 0), 0.27, edgecolor='#3c2f2f', facecolor='#B3CDE0', linewidth=0.9)
-        self.ax1.add_patch(center_circle)
-        self.ax1.text(0, 0, wind_dir_text, ha='center', va='center', fontsize=10.8, family='serif', 
-                     color='black', zorder=10)
-        self.ax1.text(0, -0.4, "Wind Direction", ha='center', va='center', fontsize=10, 
-                     family='serif', color='#3c2f2f')
-
-        # Wind Speed (ax2)
-        self.ax2.clear()
-        self.ax2.set_xlim(-1.215, 1.215)
-        self.ax2.set_ylim(-1.215, 1.215)
-        self.ax2.set_aspect('equal')
-        self.ax2.axis('off')
-
-        outer_semi = patches.Arc((0, 0), 2.43, 2.43, theta1=0, theta2=180, edgecolor='#3c2f2f', 
-                                facecolor='none', linewidth=1.35)
-        self.ax2.add_patch(outer_semi)
-        inner_semi = patches.Wedge((0, 0), 0.9, 0, 180, edgecolor='#3c2f2f', facecolor='#B3CDE0', linewidth=0.9)
-        self.ax2.add_patch(inner_semi)
-
-        max_speed = 100
-        for speed in range(0, max_speed + 1, 10):
-            angle = 180 - (speed / max_speed) * 180
-            rad = math.radians(angle)
-            length = 1.035 if speed % 20 == 0 else 0.945
-            x_outer = length * math.cos(rad)
-            y_outer = length * math.sin(rad)
-            x_inner = (length - 0.09) * math.cos(rad)
-            y_inner = (length - 0.09) * math.sin(rad)
-            self.ax2.plot([x_inner, x_outer], [y_inner, y_outer], color='#3c2f2f', 
-                         linewidth=1.08 if speed % 20 == 0 else 0.72)
-            if speed % 20 == 0:
-                label_x = 1.125 * math.cos(rad)
-                label_y = 1.125 * math.sin(rad)
-                self.ax2.text(label_x, label_y, str(speed), ha='center', va='center', fontsize=7.2, 
-                             family='serif', color='#3c2f2f')
-
-        self.ax2.text(0, 0.36, f"{int(wind_speed)} MPH", ha='center', va='center', fontsize=10.8, 
-                     family='serif', color='black', zorder=10)
-        self.ax2.text(0, 0.18, "Gusts", ha='center', va='center', fontsize=10.8, 
-                     family='serif', color='#b22222', zorder=10)
-
-        speed_angle = 180 - (wind_speed / max_speed) * 180
-        speed_rad = math.radians(speed_angle)
-        speed_tip_x = 0.855 * math.cos(speed_rad)
-        speed_tip_y = 0.855 * math.sin(speed_rad)
-        self.ax2.arrow(0, 0, speed_tip_x, speed_tip_y, color='black', width=0.018, head_width=0.054, 
-                      head_length=0.09, length_includes_head=True)
-
-        gust_angle = 180 - (wind_gusts / max_speed) * 180
-        gust_rad = math.radians(gust_angle)
-        gust_tip_x = 0.765 * math.cos(gust_rad)
-        gust_tip_y = 0.765 * math.sin(gust_rad)
-        self.ax2.arrow(0, 0, gust_tip_x, gust_tip_y, color='#b22222', width=0.0135, head_width=0.036, 
-                      head_length=0.072, length_includes_head=True)
-        self.ax2.text(0, -0.4, "Wind Speed", ha='center', va='center', fontsize=10, 
-                     family='serif', color='#3c2f2f')
-
-        # Temperature (ax3)
-        self.ax3.clear()
-        self.ax3.set_xlim(-1.215, 1.215)
-        self.ax3.set_ylim(-1.215, 1.215)
-        self.ax3.set_aspect('equal')
-        self.ax3.axis('off')
-
-        outer_semi = patches.Arc((0, 0), 2.43, 2.43, theta1=0, theta2=180, edgecolor='#3c2f2f', 
-                                facecolor='none', linewidth=1.35)
-        self.ax3.add_patch(outer_semi)
-        inner_semi = patches.Wedge((0, 0), 0.9, 0, 180, edgecolor='#3c2f2f', facecolor='#B3CDE0', linewidth=0.9)
-        self.ax3.add_patch(inner_semi)
-
-        min_temp, max_temp = -20, 120
-        temp_range = max_temp - min_temp
-        for temp in range(min_temp, max_temp + 1, 10):
-            normalized_temp = (temp - min_temp) / temp_range
-            angle = 180 - (normalized_temp * 180)
-            rad = math.radians(angle)
-            length = 1.035 if temp % 20 == 0 else 0.945
-            x_outer = length * math.cos(rad)
-            y_outer = length * math.sin(rad)
-            x_inner = (length - 0.09) * math.cos(rad)
-            y_inner = (length - 0.09) * math.sin(rad)
-            self.ax3.plot([x_inner, x_outer], [y_inner, y_outer], color='#3c2f2f', 
-                         linewidth=1.08 if temp % 20 == 0 else 0.72)
-            if temp % 20 == 0:
-                label_x = 1.125 * math.cos(rad)
-                label_y = 1.125 * math.sin(rad)
-                self.ax3.text(label_x, label_y, str(temp), ha='center', va='center', fontsize=7.2, 
-                             family='serif', color='#3c2f2f')
-
-        self.ax3.text(0, 0.27, f"{int(temperature)}°F", ha='center', va='center', fontsize=10.8, 
-                     family='serif', color='black', zorder=10)
-        temp_angle = 180 - ((temperature - min_temp) / temp_range) * 180
-        temp_rad = math.radians(temp_angle)
-        temp_tip_x = 0.81 * math.cos(temp_rad)
-        temp_tip_y = 0.81 * math.sin(temp_rad)
-        self.ax3.arrow(0, 0, temp_tip_x, temp_tip_y, color='black', width=0.018, head_width=0.054, 
-                      head_length=0.09, length_includes_head=True)
-        self.ax3.text(0, -0.4, "Temperature", ha='center', va='center', fontsize=10, 
-                     family='serif', color='#3c2f2f')
-
-        # Precipitation (ax4)
-        self.ax4.clear()
-        self.ax4.set_xlim(-1.215, 1.215)
-        self.ax4.set_ylim(-1.215, 1.215)
-        self.ax4.set_aspect('equal')
-        self.ax4.axis('off')
-
-        outer_semi = patches.Arc((0, 0), 2.43, 2.43, theta1=0, theta2=180, edgecolor='#3c2f2f', 
-                                facecolor='none', linewidth=1.35)
-        self.ax4.add_patch(outer_semi)
-        inner_semi = patches.Wedge((0, 0), 0.9, 0, 180, edgecolor='#3c2f2f', facecolor='#B3CDE0', linewidth=0.9)
-        self.ax4.add_patch(inner_semi)
-
-        min_precip, max_precip = 0, 15
-        precip_range = max_precip - min_precip
-        labeled_values = [0, 3, 6, 9, 12, 15]
-        for precip in range(min_precip, max_precip + 1):
-            normalized_precip = (precip - min_precip) / precip_range
-            angle = 180 - (normalized_precip * 180)
-            rad = math.radians(angle)
-            length = 1.035 if precip in labeled_values else 0.945
-            x_outer = length * math.cos(rad)
-            y_outer = length * math.sin(rad)
-            x_inner = (length - 0.09) * math.cos(rad)
-            y_inner = (length - 0.09) * math.sin(rad)
-            self.ax4.plot([x_inner, x_outer], [y_inner, y_outer], color='#3c2f2f', 
-                         linewidth=1.08 if precip in labeled_values else 0.72)
-            if precip in labeled_values:
-                label_x = 1.125 * math.cos(rad)
-                label_y = 1.125 * math.sin(rad)
-                self.ax4.text(label_x, label_y, str(precip), ha='center', va='center', fontsize=7.2, 
-                             family='serif', color='#3c2f2f')
-
-        self.ax4.text(0, 0.27, f"{precip_24h:.2f} in", ha='center', va='center', fontsize=10.8, 
-                     family='serif', color='black', zorder=10)
-        precip_24h = min(max(precip_24h, min_precip), max_precip)
-        precip_angle = 180 - ((precip_24h - min_precip) / precip_range) * 180
-        precip_rad = math.radians(precip_angle)
-        precip_tip_x = 0.81 * math.cos(precip_rad)
-        precip_tip_y = 0.81 * math.sin(precip_rad)
-        self.ax4.arrow(0, 0, precip_tip_x, precip_tip_y, color='black', width=0.018, head_width=0.054, 
-                      head_length=0.09, length_includes_head=True)
-        self.ax4.text(0, -0.4, "Precipitation 24 hrs.", ha='center', va='center', fontsize=10, 
-                     family='serif', color='#3c2f2f')
-
-        # Barometric Pressure (ax5)
-        self.ax5.clear()
-        self.ax5.set_xlim(-1.215, 1.215)
-        self.ax5.set_ylim(-1.215, 1.215)
-        self.ax5.set_aspect('equal')
-        self.ax5.axis('off')
-
-        outer_semi = patches.Arc((0, 0), 2.43, 2.43, theta1=0, theta2=180, edgecolor='#3c2f2f', 
-                                facecolor='none', linewidth=1.35)
-        self.ax5.add_patch(outer_semi)
-        inner_semi = patches.Wedge((0, 0), 0.9, 0, 180, edgecolor='#3c2f2f', facecolor='#B3CDE0', linewidth=0.9)
-        self.ax5.add_patch(inner_semi)
-
-        min_baro, max_baro = 28, 30.7
-        change_baro = 30.0
-        labeled_values = [28, 30, 30.7]
+        # Semicircular dials (ax2-ax8): outer arc and filled face
+        for ax in self.axes[1:]:
+            outer_semi = patches.Arc((0, 0), 2.43, 2.43, theta1=0, theta2=180, edgecolor=border, 
+                                    facecolor='none', linewidth=1.35)
+            ax.add_patch(outer_semi)
+            inner_semi = patches.Wedge((0, 0), 0.9, 0, 180, edgecolor=border, facecolor=face, linewidth=0.9)
+            ax.add_patch(inner_semi)
+
+        # Wind Speed (ax2): 0-100 MPH, labels every 20
+        self._draw_scale(self.ax2, range(0, 101, 10), 0, 100, lambda speed: speed % 20 == 0)
+        self.ax2.text(0, -0.4, "Wind Speed", ha='center', va='center', fontsize=10, family=font, color=text)
+
+        # Temperature (ax3): -20-120°F, labels every 20
+        self._draw_scale(self.ax3, range(-20, 121, 10), -20, 120, lambda temp: temp % 20 == 0)
+        self.ax3.text(0, -0.4, "Temperature", ha='center', va='center', fontsize=10, family=font, color=text)
+
+        # Precipitation (ax4): 0-15 in, labels every 3
+        self._draw_scale(self.ax4, range(0, 16), 0, 15, lambda precip: precip in [0, 3, 6, 9, 12, 15])
+        self.ax4.text(0, -0.4, "Precipitation 24 hrs.", ha='center', va='center', fontsize=10, family=font, color=text)
+
+        # Barometric Pressure (ax5): two scales meeting at "Change"
         tick_angles = np.linspace(180, 0, 9)
         for angle in tick_angles:
             rad = math.radians(angle)
@@ -308,17 +287,11 @@ class CompassRoseGauge:
             y_outer = length * math.sin(rad)
             x_inner = (length - 0.09) * math.cos(rad)
             y_inner = (length - 0.09) * math.sin(rad)
-            self.ax5.plot([x_inner, x_outer], [y_inner, y_outer], color='#3c2f2f', 
+            self.ax5.plot([x_inner, x_outer], [y_inner, y_outer], color=border, 
                          linewidth=1.08 if angle in [180, 90, 0] else 0.72)
 
-        for baro in labeled_values:
-            if baro <= change_baro:
-                normalized_baro = (baro - min_baro) / (change_baro - min_baro)
-                angle = 180 - (normalized_baro * 90)
-            else:
-                normalized_baro = (baro - change_baro) / (max_baro - change_baro)
-                angle = 90 - (normalized_baro * 90)
-            rad = math.radians(angle)
+        for baro in [28, 30, 30.7]:
+            rad = math.radians(_baro_angle(baro))
             label_x = 1.125 * math.cos(rad)
             label_y = 1.125 * math.sin(rad)
             if baro == 30.7:
@@ -326,221 +299,177 @@ class CompassRoseGauge:
                 label_y = 1.2 * math.sin(rad) - 0.1
             label = "Change" if baro == 30 else f"{baro:.1f}"
             self.ax5.text(label_x, label_y, label, ha='center', va='center', fontsize=7.2, 
-                         family='serif', color='#3c2f2f', zorder=10)
+                         family=font, color=text, zorder=10)
 
+        # "Stormy" and "Clear" set along the arc one character at a time
         radius = 1.0
-        stormy_angles = np.linspace(165, 135, len("Stormy"))
-        for i, char in enumerate("Stormy"):
-            angle = stormy_angles[i]
-            rad = math.radians(angle)
-            x = radius * math.cos(rad)
-            y = radius * math.sin(rad)
-            rotation = angle - 90
-            self.ax5.text(x, y, char, ha='center', va='center', fontsize=7.2, 
-                         family='serif', color='#3c2f2f', rotation=rotation, zorder=5)
-
-        clear_angles = np.linspace(45, 15, len("Clear"))
-        for i, char in enumerate("Clear"):
-            angle = clear_angles[i]
-            rad = math.radians(angle)
-            x = radius * math.cos(rad)
-            y = radius * math.sin(rad)
-            rotation = angle - 90
-            self.ax5.text(x, y, char, ha='center', va='center', fontsize=7.2, 
-                         family='serif', color='#3c2f2f', rotation=rotation, zorder=5)
-
-        self.ax5.text(0, 0.27, f"{baro_pressure:.2f}", ha='center', va='center', fontsize=10.8, 
-                     family='serif', color='black', zorder=10)
-        baro_pressure = min(max(baro_pressure, min_baro), max_baro)
-        if baro_pressure <= change_baro:
-            normalized_baro = (baro_pressure - min_baro) / (change_baro - min_baro)
-            baro_angle = 180 - (normalized_baro * 90)
-        else:
-            normalized_baro = (baro_pressure - change_baro) / (max_baro - change_baro)
-            baro_angle = 90 - (normalized_baro * 90)
-        baro_angle = max(0, min(180, baro_angle))
-        baro_rad = math.radians(baro_angle)
-        baro_tip_x = 0.81 * math.cos(baro_rad)
-        baro_tip_y = 0.81 * math.sin(baro_rad)
-        self.ax5.arrow(0, 0, baro_tip_x, baro_tip_y, color='black', width=0.018, head_width=0.054, 
-                      head_length=0.09, length_includes_head=True)
-
-        if baro_pressure_3h_ago is not None:
-            baro_pressure_3h_ago = min(max(baro_pressure_3h_ago, min_baro), max_baro)
-            if baro_pressure_3h_ago <= change_baro:
-                normalized_baro_3h = (baro_pressure_3h_ago - min_baro) / (change_baro - min_baro)
-                baro_angle_3h = 180 - (normalized_baro_3h * 90)
-            else:
-                normalized_baro_3h = (baro_pressure_3h_ago - change_baro) / (max_baro - change_baro)
-                baro_angle_3h = 90 - (normalized_baro_3h * 90)
-            baro_angle_3h = max(0, min(180, baro_angle_3h))
-            baro_rad_3h = math.radians(baro_angle_3h)
-            baro_tip_x_3h = 0.72 * math.cos(baro_rad_3h)
-            baro_tip_y_3h = 0.72 * math.sin(baro_rad_3h)
-            self.ax5.arrow(0, 0, baro_tip_x_3h, baro_tip_y_3h, color='red', width=0.0135, head_width=0.036, 
-                          head_length=0.072, length_includes_head=True)
-
-        self.ax5.text(0, -0.4, "Barometric Pressure", ha='center', va='center', fontsize=10, 
-                     family='serif', color='#3c2f2f')
-
-        # Humidity (ax6)
-        self.ax6.clear()
-        self.ax6.set_xlim(-1.215, 1.215)
-        self.ax6.set_ylim(-1.215, 1.215)
-        self.ax6.set_aspect('equal')
-        self.ax6.axis('off')
-
-        outer_semi = patches.Arc((0, 0), 2.43, 2.43, theta1=0, theta2=180, edgecolor='#3c2f2f', 
-                                facecolor='none', linewidth=1.35)
-        self.ax6.add_patch(outer_semi)
-        inner_semi = patches.Wedge((0, 0), 0.9, 0, 180, edgecolor='#3c2f2f', facecolor='#B3CDE0', linewidth=0.9)
-        self.ax6.add_patch(inner_semi)
-
-        min_humidity, max_humidity = 0, 100
-        humidity_range = max_humidity - min_humidity
-        for hum in range(0, max_humidity + 1, 10):
-            normalized_hum = (hum - min_humidity) / humidity_range
-            angle = 180 - (normalized_hum * 180)
-            rad = math.radians(angle)
-            length = 1.035 if hum % 20 == 0 else 0.945
-            x_outer = length * math.cos(rad)
-            y_outer = length * math.sin(rad)
-            x_inner = (length - 0.09) * math.cos(rad)
-            y_inner = (length - 0.09) * math.sin(rad)
-            self.ax6.plot([x_inner, x_outer], [y_inner, y_outer], color='#3c2f2f', 
-                         linewidth=1.08 if hum % 20 == 0 else 0.72)
-            if hum % 20 == 0:
-                label_x = 1.125 * math.cos(rad)
-                label_y = 1.125 * math.sin(rad)
-                self.ax6.text(label_x, label_y, str(hum), ha='center', va='center', fontsize=7.2, 
-                             family='serif', color='#3c2f2f')
-
-        humidity_clamped = min(max(humidity, min_humidity), max_humidity)
-        self.ax6.text(0, 0.27, f"{int(humidity_clamped)}%", ha='center', va='center', fontsize=10.8, 
-                     family='serif', color='black', zorder=10)
-        hum_angle = 180 - ((humidity_clamped - min_humidity) / humidity_range) * 180
-        hum_rad = math.radians(hum_angle)
-        hum_tip_x = 0.81 * math.cos(hum_rad)
-        hum_tip_y = 0.81 * math.sin(hum_rad)
-        self.ax6.arrow(0, 0, hum_tip_x, hum_tip_y, color='black', width=0.018, head_width=0.054, 
-                      head_length=0.09, length_includes_head=True)
-        self.ax6.text(0, -0.4, "Humidity", ha='center', va='center', fontsize=10, 
-                     family='serif', color='#3c2f2f')
-
-        # Water Temperature (ax7)
-        self.ax7.clear()
-        self.ax7.set_xlim(-1.215, 1.215)
-        self.ax7.set_ylim(-1.215, 1.215)
-        self.ax7.set_aspect('equal')
-        self.ax7.axis('off')
-
-        outer_semi = patches.Arc((0, 0), 2.43, 2.43, theta1=0, theta2=180, edgecolor='#3c2f2f', 
-                                facecolor='none', linewidth=1.35)
-        self.ax7.add_patch(outer_semi)
-        inner_semi = patches.Wedge((0, 0), 0.9, 0, 180, edgecolor='#3c2f2f', facecolor='#B3CDE0', linewidth=0.9)
-        self.ax7.add_patch(inner_semi)
-
-        min_temp, max_temp = 30, 80
-        temp_range = max_temp - min_temp
-        for temp in range(min_temp, max_temp + 1, 10):
-            normalized_temp = (temp - min_temp) / temp_range
-            angle = 180 - (normalized_temp * 180)
-            rad = math.radians(angle)
-            length = 1.035 if temp % 20 == 0 else 0.945
-            x_outer = length * math.cos(rad)
-            y_outer = length * math.sin(rad)
-            x_inner = (length - 0.09) * math.cos(rad)
-            y_inner = (length - 0.09) * math.sin(rad)
-            self.ax7.plot([x_inner, x_outer], [y_inner, y_outer], color='#3c2f2f', 
-                         linewidth=1.08 if temp % 20 == 0 else 0.72)
-            if temp % 20 == 0:
-                label_x = 1.125 * math.cos(rad)
-                label_y = 1.125 * math.sin(rad)
-                self.ax7.text(label_x, label_y, str(temp), ha='center', va='center', fontsize=7.2, 
-                             family='serif', color='#3c2f2f')
-
-        current_temp = get_current_water_temp() if water_temp is None else water_temp
-        avg_temp = get_average_water_temp()
-        current_temp_clamped = min(max(current_temp, min_temp), max_temp)
-        avg_temp_clamped = min(max(avg_temp, min_temp), max_temp)
-
-        self.ax7.text(0, 0.27, f"{int(current_temp_clamped)}°F", ha='center', va='center', fontsize=10.8, 
-                     family='serif', color='black', zorder=10)
-        temp_angle = 180 - ((current_temp_clamped - min_temp) / temp_range) * 180
-        temp_rad = math.radians(temp_angle)
-        temp_tip_x = 0.81 * math.cos(temp_rad)
-        temp_tip_y = 0.81 * math.sin(temp_rad)
-        self.ax7.arrow(0, 0, temp_tip_x, temp_tip_y, color='black', width=0.018, head_width=0.054, 
-                      head_length=0.09, length_includes_head=True)
-
-        avg_angle = 180 - ((avg_temp_clamped - min_temp) / temp_range) * 180
-        avg_rad = math.radians(avg_angle)
-        avg_tip_x = 0.72 * math.cos(avg_rad)
-        avg_tip_y = 0.72 * math.sin(avg_rad)
-        self.ax7.plot([0, avg_tip_x], [0, avg_tip_y], color='red', linewidth=2.5, zorder=5)
-
-        self.ax7.text(0, -0.4, "Water Temperature", ha='center', va='center', fontsize=10, 
-                     family='Georgia', color='#3c2f2f')
-
-        # Wave Height (ax8)
-        self.ax8.clear()
-        self.ax8.set_xlim(-1.215, 1.215)
-        self.ax8.set_ylim(-1.215, 1.215)
-        self.ax8.set_aspect('equal')
-        self.ax8.axis('off')
-
-        outer_semi = patches.Arc((0, 0), 2.43, 2.43, theta1=0, theta2=180, edgecolor='#3c2f2f', 
-                                facecolor='none', linewidth=1.35)
-        self.ax8.add_patch(outer_semi)
-        inner_semi = patches.Wedge((0, 0), 0.9, 0, 180, edgecolor='#3c2f2f', facecolor='#B3CDE0', linewidth=0.9)
-        self.ax8.add_patch(inner_semi)
-
-        min_wave, max_wave = 0, 15
-        wave_range = max_wave - min_wave
-        labeled_values = [0, 3, 6, 9, 12, 15]
-        for wave in range(0, max_wave + 1, 3):
-            normalized_wave = (wave - min_wave) / wave_range
-            angle = 180 - (normalized_wave * 180)
+        for word, start, end in (("Stormy", 165, 135), ("Clear", 45, 15)):
+            for angle, char in zip(np.linspace(start, end, len(word)), word):
+                rad = math.radians(angle)
+                self.ax5.text(radius * math.cos(rad), radius * math.sin(rad), char, ha='center', va='center', fontsize=7.2, 
+                             family=font, color=text, rotation=angle - 90, zorder=5)
+        self.ax5.text(0, -0.4, "Barometric Pressure", ha='center', va='center', fontsize=10, family=font, color=text)
+
+        # Humidity (ax6): 0-100%, labels every 20
+        self._draw_scale(self.ax6, range(0, 101, 10), 0, 100, lambda hum: hum % 20 == 0)
+        self.ax6.text(0, -0.4, "Humidity", ha='center', va='center', fontsize=10, family=font, color=text)
+
+        # Water Temperature (ax7): 30-80°F, labels every 20
+        self._draw_scale(self.ax7, range(30, 81, 10), 30, 80, lambda temp: temp % 20 == 0)
+        self.ax7.text(0, -0.4, "Water Temperature", ha='center', va='center', fontsize=10, family='Georgia', color=text)
+
+        # Wave Height (ax8): 0-15 ft, labels every 3
+        self._draw_scale(self.ax8, range(0, 16, 3), 0, 15, lambda wave: wave in [0, 3, 6, 9, 12, 15])
+        self.ax8.text(0, -0.4, "Wave Height", ha='center', va='center', fontsize=10, family=font, color=text)
+
+    # Function to draw a semicircular scale's ticks, with long ticks and labels where labeled(value)
+    def _draw_scale(self, ax, values, min_value, max_value, labeled):
+        for value in values:
+            angle = 180 - ((value - min_value) / (max_value - min_value)) * 180
             rad = math.radians(angle)
-            length = 1.035 if wave in labeled_values else 0.945
+            length = 1.035 if labeled(value) else 0.945
             x_outer = length * math.cos(rad)
             y_outer = length * math.sin(rad)
             x_inner = (length - 0.09) * math.cos(rad)
             y_inner = (length - 0.09) * math.sin(rad)
-            self.ax8.plot([x_inner, x_outer], [y_inner, y_outer], color='#3c2f2f', 
-                         linewidth=1.08 if wave in labeled_values else 0.72)
-            if wave in labeled_values:
-                label_x = 1.125 * math.cos(rad)
-                label_y = 1.125 * math.sin(rad)
-                self.ax8.text(label_x, label_y, str(wave), ha='center', va='center', fontsize=7.2, 
-                             family='serif', color='#3c2f2f')
-
-        self.ax8.text(0, 0.27, f"{wave_height:.1f} ft", ha='center', va='center', fontsize=10.8, 
-                     family='serif', color='black', zorder=10)
-        wave_height = min(max(wave_height, min_wave), max_wave)
-        wave_angle = 180 - ((wave_height - min_wave) / wave_range) * 180
-        wave_rad = math.radians(wave_angle)
-        wave_tip_x = 0.81 * math.cos(wave_rad)
-        wave_tip_y = 0.81 * math.sin(wave_rad)
-        self.ax8.arrow(0, 0, wave_tip_x, wave_tip_y, color='black', width=0.018, head_width=0.054, 
-                      head_length=0.09, length_includes_head=True)
-
-        swell_height = min(max(swell_height, min_wave), max_wave)
-        swell_angle = 180 - ((swell_height - min_wave) / wave_range) * 180
-        swell_rad = math.radians(swell_angle)
-        swell_tip_x = 0.72 * math.cos(swell_rad)
-        swell_tip_y = 0.72 * math.sin(swell_rad)
-        self.ax8.plot([0, swell_tip_x], [0, swell_tip_y], color='red', linewidth=2.5, zorder=5)
-
-        self.ax8.text(0, -0.4, "Wave Height", ha='center', va='center', fontsize=10, 
-                     family='serif', color='#3c2f2f')
+            ax.plot([x_inner, x_outer], [y_inner, y_outer], color=self.palette['border'], 
+                    linewidth=1.08 if labeled(value) else 0.72)
+            if labeled(value):
+                ax.text(1.125 * math.cos(rad), 1.125 * math.sin(rad), str(value), ha='center', va='center', fontsize=7.2, 
+                        family=self.font, color=self.palette['text'])
+
+    def draw_values(self, wind_direction, wind_speed, wind_gusts, temperature, precip_24h, baro_pressure, humidity, water_temp, wave_height, baro_pressure_3h_ago=None, swell_height=0.0, water_temp_average=None):
+        self._clear_values()
+        for _, _, draw, inputs in self._dials(wind_direction, wind_speed, wind_gusts, temperature, precip_24h, baro_pressure,
+                                              humidity, water_temp, wave_height, baro_pressure_3h_ago, swell_height, water_temp_average):
+            self._values.extend(draw(*inputs))
+
+    def _dials(self, wind_direction, wind_speed, wind_gusts, temperature, precip_24h, baro_pressure, humidity, water_temp, wave_height, baro_pressure_3h_ago=None, swell_height=0.0, water_temp_average=None):
+        """(name, axes, draw method, inputs) per dial; a dial's needles depend on its inputs only.
+        Callers pass every reading in (water temperatures included), so a render makes no requests."""
+        return [
+            ("wind_direction", self.ax1, self._draw_wind_direction, (wind_direction,)),
+            ("wind_speed", self.ax2, self._draw_wind_speed, (wind_speed, wind_gusts)),
+            ("temperature", self.ax3, self._draw_temperature, (temperature,)),
+            ("precipitation", self.ax4, self._draw_precipitation, (precip_24h,)),
+            ("pressure", self.ax5, self._draw_pressure, (baro_pressure, baro_pressure_3h_ago)),
+            ("humidity", self.ax6, self._draw_humidity, (humidity,)),
+            ("water_temp", self.ax7, self._draw_water_temp, (water_temp, water_temp_average)),
+            ("waves", self.ax8, self._draw_waves, (wave_height, swell_height)),
+        ]
+
+    # Wind Direction (ax1): needle, then the hub and text over it
+    def _draw_wind_direction(self, wind_direction):
+        rad = math.radians(90 - wind_direction)
+        return [
+            self.ax1.arrow(0, 0, 0.81 * math.cos(rad), 0.81 * math.sin(rad), color=self.palette['needle'], width=0.018, head_width=0.054, head_length=0.09, 
+                           length_includes_head=True),
+            self.ax1.add_patch(patches.Circle((0, 0), 0.27, edgecolor=self.palette['border'], facecolor=self.palette['gauge_bg'], linewidth=0.9)),
+            self.ax1.text(0, 0, degrees_to_cardinal(wind_direction), ha='center', va='center', fontsize=10.8, family=self.font, 
+                          color=self.palette['value'], zorder=10),
+            self.ax1.text(0, -0.4, "Wind Direction", ha='center', va='center', fontsize=10, 
+                          family=self.font, color=self.palette['text']),
+        ]
+
+    # Wind Speed (ax2): speed, and gusts in red
+    def _draw_wind_speed(self, wind_speed, wind_gusts):
+        return [
+            self.ax2.text(0, 0.36, f"{int(wind_speed)} MPH", ha='center', va='center', fontsize=10.8, 
+                          family=self.font, color=self.palette['value'], zorder=10),
+            self.ax2.text(0, 0.18, "Gusts", ha='center', va='center', fontsize=10.8, 
+                          family=self.font, color=self.palette['gust_needle'], zorder=10),
+            self._needle(self.ax2, wind_speed, 0, 100, 0.855, clamp=False),
+            self._needle(self.ax2, wind_gusts, 0, 100, 0.765, color=self.palette['gust_needle'], thin=True, clamp=False),
+        ]
+
+    # Temperature (ax3)
+    def _draw_temperature(self, temperature):
+        return [
+            self._value_text(self.ax3, f"{int(temperature)}°F"),
+            self._needle(self.ax3, temperature, -20, 120, 0.81, clamp=False),
+        ]
+
+    # Precipitation (ax4)
+    def _draw_precipitation(self, precip_24h):
+        return [
+            self._value_text(self.ax4, f"{precip_24h:.2f} in"),
+            self._needle(self.ax4, precip_24h, 0, 15, 0.81),
+        ]
+
+    # Barometric Pressure (ax5): now, and 3 hours ago in red
+    def _draw_pressure(self, baro_pressure, baro_pressure_3h_ago):
+        rad = math.radians(_baro_angle(baro_pressure))
+        artists = [
+            self._value_text(self.ax5, f"{baro_pressure:.2f}"),
+            self.ax5.arrow(0, 0, 0.81 * math.cos(rad), 0.81 * math.sin(rad), color=self.palette['needle'], width=0.018, head_width=0.054, 
+                           head_length=0.09, length_includes_head=True),
+        ]
+        if baro_pressure_3h_ago is not None:
+            rad = math.radians(_baro_angle(baro_pressure_3h_ago))
+            artists.append(self.ax5.arrow(0, 0, 0.72 * math.cos(rad), 0.72 * math.sin(rad), color=self.palette['secondary_needle'], width=0.0135, 
+                                          head_width=0.036, head_length=0.072, length_includes_head=True))
+        return artists
+
+    # Humidity (ax6)
+    def _draw_humidity(self, humidity):
+        humidity_clamped = min(max(humidity, 0), 100)
+        return [
+            self._value_text(self.ax6, f"{int(humidity_clamped)}%"),
+            self._needle(self.ax6, humidity_clamped, 0, 100, 0.81),
+        ]
+
+    # Water Temperature (ax7): current, and the monthly average as a red line; either may be unknown (None)
+    def _draw_water_temp(self, current_temp, avg_temp):
+        if current_temp is None:
+            artists = [self._value_text(self.ax7, "--°F")]
+        else:
+            current_temp_clamped = min(max(current_temp, 30), 80)
+            artists = [
+                self._value_text(self.ax7, f"{int(current_temp_clamped)}°F"),
+                self._needle(self.ax7, current_temp_clamped, 30, 80, 0.81),
+            ]
+        if avg_temp is not None:
+            artists.append(self._line(self.ax7, avg_temp, 30, 80))
+        return artists
+
+    # Wave Height (ax8): waves, and swell as a red line
+    def _draw_waves(self, wave_height, swell_height):
+        return [
+            self._value_text(self.ax8, f"{wave_height:.1f} ft"),
+            self._needle(self.ax8, wave_height, 0, 15, 0.81),
+            self._line(self.ax8, swell_height, 0, 15),
+        ]
+
+    # Function to add a dial's reading above its hub
+    def _value_text(self, ax, label):
+        return ax.text(0, 0.27, label, ha='center', va='center', fontsize=10.8, 
+                       family=self.font, color=self.palette['value'], zorder=10)
+
+    # Function to add a needle arrow for a value on a semicircular scale
+    def _needle(self, ax, value, min_value, max_value, length, color=None, thin=False, clamp=True):
+        rad = math.radians(_scale_angle(value, min_value, max_value, clamp))
+        width, head_width, head_length = (0.0135, 0.036, 0.072) if thin else (0.018, 0.054, 0.09)
+        return ax.arrow(0, 0, length * math.cos(rad), length * math.sin(rad), color=color or self.palette['needle'], width=width, 
+                        head_width=head_width, head_length=head_length, length_includes_head=True)
+
+    # Function to add a secondary (red line) needle for a value on a semicircular scale
+    def _line(self, ax, value, min_value, max_value):
+        rad = math.radians(_scale_angle(value, min_value, max_value))
+        line, = ax.plot([0, 0.72 * math.cos(rad)], [0, 0.72 * math.sin(rad)], color=self.palette['secondary_needle'], linewidth=2.5, zorder=5)
+        return line
+
+    def _clear_values(self):
+        for artist in self._values:
+            artist.remove()
+        self._values = []
 
     def update(self, wind_direction=None, wind_speed=None, wind_gusts=None, temperature=None, precip_24h=None, 
-               baro_pressure=None, humidity=None, water_temp=None, wave_height=None, swell_height=None, baro_pressure_3h_ago=None):
+               baro_pressure=None, humidity=None, water_temp=None, wave_height=None, swell_height=None, baro_pressure_3h_ago=None,
+               water_temp_average=None):
         if any(x is None for x in [wind_direction, wind_speed, wind_gusts, temperature, precip_24h, 
                                    baro_pressure, humidity, water_temp]):
             conditions = get_current_conditions()
-            wave_height, swell_height = get_windy_wave_data()
+            wave_height, swell_height = get_windy_wave_data() or (0.0, 0.0)
             wind_direction = conditions["wind_direction"]
             wind_speed = conditions["wind_speed"]
             wind_gusts = conditions["wind_gust"] if isinstance(conditions["wind_gust"], (int, float)) else 0
@@ -549,19 +478,272 @@ class CompassRoseGauge:
             baro_pressure = conditions.get("barometric_pressure", 30.0)
             humidity = conditions["humidity"]
             water_temp = get_current_water_temp()
-            baro_pressure_3h_ago = baro_pressure - 0.1 if baro_pressure_3h_ago is None else baro_pressure_3h_ago
+            if baro_pressure_3h_ago is None:
+                baro_pressure_3h_ago = _pressure_3h_ago(baro_pressure)
+        if water_temp_average is None:
+            water_temp_average = get_average_water_temp()
         self.draw_compass_rose(wind_direction, wind_speed, wind_gusts, temperature, precip_24h, baro_pressure, 
-                              humidity, water_temp, wave_height, baro_pressure_3h_ago, swell_height)
+                              humidity, water_temp, wave_height, baro_pressure_3h_ago, swell_height, water_temp_average)
         plt.draw()
 
     def show(self):
         plt.show()
 
+class SvgCompassRoseGauge:
+    """The same strip as a fitted CompassRoseGauge, as SVG. The faces are laid out once into a
+    template; render_svg() only substitutes needle rotations and value text, and the result
+    stays sharp at whatever size the client shows it."""
+
+    def __init__(self, color_palette=None, font=None):
+        self.palette = color_palette if color_palette else GAUGE_PALETTE
+        self.font = font if font else GAUGE_FONT
+        self.width = STRIP_WIDTH_INCHES * POINTS_PER_INCH
+        self.height = STRIP_HEIGHT_INCHES * POINTS_PER_INCH
+        self._parts = []
+        self._build()
+        self.template = string.Template("".join(self._parts))
+        self._parts = None
+
+    def render_svg(self, wind_direction, wind_speed, wind_gusts, temperature, precip_24h, baro_pressure, humidity, water_temp, wave_height, baro_pressure_3h_ago=None, swell_height=0.0, water_temp_average=None):
+        """SVG markup of the strip for these readings."""
+        current_temp = min(max(water_temp, 30), 80) if water_temp is not None else None
+        humidity_clamped = min(max(humidity, 0), 100)
+        fields = dict(
+            wind_direction_angle=_rotation(90 - wind_direction),
+            wind_cardinal=degrees_to_cardinal(wind_direction),
+            wind_speed_text=f"{int(wind_speed)} MPH",
+            wind_speed_angle=_rotation(_scale_angle(wind_speed, 0, 100, clamp=False)),
+            wind_gusts_angle=_rotation(_scale_angle(wind_gusts, 0, 100, clamp=False)),
+            temperature_text=f"{int(temperature)}°F",
+            temperature_angle=_rotation(_scale_angle(temperature, -20, 120, clamp=False)),
+            precip_text=f"{precip_24h:.2f} in",
+            precip_angle=_rotation(_scale_angle(precip_24h, 0, 15)),
+            pressure_text=f"{baro_pressure:.2f}",
+            pressure_angle=_rotation(_baro_angle(baro_pressure)),
+            pressure_3h_angle=_rotation(_baro_angle(baro_pressure_3h_ago if baro_pressure_3h_ago is not None else baro_pressure)),
+            pressure_3h_display="inline" if baro_pressure_3h_ago is not None else "none",
+            humidity_text=f"{int(humidity_clamped)}%",
+            humidity_angle=_rotation(_scale_angle(humidity_clamped, 0, 100)),
+            water_temp_text=f"{int(current_temp)}°F" if current_temp is not None else "--°F",
+            water_temp_angle=_rotation(_scale_angle(current_temp if current_temp is not None else 30, 30, 80)),
+            water_temp_display="inline" if current_temp is not None else "none",
+            water_avg_angle=_rotation(_scale_angle(water_temp_average if water_temp_average is not None else 30, 30, 80)),
+            water_avg_display="inline" if water_temp_average is not None else "none",
+            wave_text=f"{wave_height:.1f} ft",
+            wave_angle=_rotation(_scale_angle(wave_height, 0, 15)),
+            swell_angle=_rotation(_scale_angle(swell_height, 0, 15)),
+        )
+        return self.template.substitute({name: escape(value) for name, value in fields.items()})  # Text lands in markup
+
+    # Function to lay out the template: each dial's face, then its needles and text on top,
+    # in the order the matplotlib path draws them
+    def _build(self):
+        border, text, face, value = self.palette['border'], self.palette['text'], self.palette['gauge_bg'], self.palette['value']
+        self._parts.append(
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {self.width:.2f} {self.height:.2f}" '
+            f'width="{self.width:.2f}pt" height="{self.height:.2f}pt" font-family="{self.font}">'
+            f'<rect width="100%" height="100%" fill="{self.palette["figure_bg"]}"/>'
+        )
+
+        # Wind Direction (dial 0)
+        self._circle(0, DIAL_LIMIT, border, "none", 1.35)
+        self._circle(0, 0.9, border, face, 0.9)
+        directions = {"N": 0, "NE": 45, "E": 90, "SE": 135, "S": 180, "SW": 225, "W": 270, "NW": 315}
+        for label, angle in directions.items():
+            rad = math.radians(-angle + 90)
+            cardinal = label in ["N", "E", "S", "W"]
+            length = 1.035 if cardinal else 0.945
+            inner_length = (1.08 if cardinal else 0.99) * 0.72
+            self._line(0, inner_length * math.cos(rad), inner_length * math.sin(rad), length * math.cos(rad), length * math.sin(rad), border, 1.08)
+            radius = 1.125 if cardinal else 1.035
+            self._text(0, radius * math.cos(rad), radius * math.sin(rad), label, 9 if cardinal else 7.2, text)
+        for angle in range(0, 360, 15):
+            if angle % 45 != 0:
+                rad = math.radians(-angle + 90)
+                self._line(0, 1.035 * math.cos(rad), 1.035 * math.sin(rad), 1.08 * math.cos(rad), 1.08 * math.sin(rad), border, 0.72)
+        self._needle(0, "wind_direction_angle", 0.81)
+        self._circle(0, 0.27, border, face, 0.9)
+        self._text(0, 0, -0.4, "Wind Direction", 10, text)
+        self._text(0, 0, 0, "$wind_cardinal", 10.8, value)
+
+        # Semicircular dials (1-7): outer arc and filled face
+        for dial in range(1, 8):
+            self._arc(dial, DIAL_LIMIT, border, 1.35)
+            self._wedge(dial, 0.9, border, face, 0.9)
+
+        # Wind Speed (dial 1): speed, and gusts in red
+        self._scale(1, range(0, 101, 10), 0, 100, lambda speed: speed % 20 == 0)
+        self._text(1, 0, -0.4, "Wind Speed", 10, text)
+        self._needle(1, "wind_speed_angle", 0.855)
+        self._needle(1, "wind_gusts_angle", 0.765, color=self.palette['gust_needle'], thin=True)
+        self._text(1, 0, 0.36, "$wind_speed_text", 10.8, value)
+        self._text(1, 0, 0.18, "Gusts", 10.8, self.palette['gust_needle'])
+
+        # Temperature (dial 2)
+        self._scale(2, range(-20, 121, 10), -20, 120, lambda temp: temp % 20 == 0)
+        self._text(2, 0, -0.4, "Temperature", 10, text)
+        self._needle(2, "temperature_angle", 0.81)
+        self._text(2, 0, 0.27, "$temperature_text", 10.8, value)
+
+        # Precipitation (dial 3)
+        self._scale(3, range(0, 16), 0, 15, lambda precip: precip in [0, 3, 6, 9, 12, 15])
+        self._text(3, 0, -0.4, "Precipitation 24 hrs.", 10, text)
+        self._needle(3, "precip_angle", 0.81)
+        self._text(3, 0, 0.27, "$precip_text", 10.8, value)
+
+        # Barometric Pressure (dial 4): two scales meeting at "Change"; now, and 3 hours ago in red
+        for angle in np.linspace(180, 0, 9):
+            rad = math.radians(angle)
+            major = angle in [180, 90, 0]
+            length = 1.035 if major else 0.945
+            self._line(4, (length - 0.09) * math.cos(rad), (length - 0.09) * math.sin(rad), length * math.cos(rad), length * math.sin(rad),
+                       border, 1.08 if major else 0.72)
+        self._text(4, 0, -0.4, "Barometric Pressure", 10, text)
+        for word, start, end in (("Stormy", 165, 135), ("Clear", 45, 15)):
+            for angle, char in zip(np.linspace(start, end, len(word)), word):
+                rad = math.radians(angle)
+                self._text(4, math.cos(rad), math.sin(rad), char, 7.2, text, rotation=angle - 90)
+        for baro in [28, 30, 30.7]:
+            rad = math.radians(_baro_angle(baro))
+            radius, drop = (1.2, 0.1) if baro == 30.7 else (1.125, 0)
+            self._text(4, radius * math.cos(rad), radius * math.sin(rad) - drop, "Change" if baro == 30 else f"{baro:.1f}", 7.2, text)
+        self._needle(4, "pressure_angle", 0.81)
+        self._parts.append('<g display="$pressure_3h_display">')
+        self._needle(4, "pressure_3h_angle", 0.72, color=self.palette['secondary_needle'], thin=True)
+        self._parts.append('</g>')
+        self._text(4, 0, 0.27, "$pressure_text", 10.8, value)
+
+        # Humidity (dial 5)
+        self._scale(5, range(0, 101, 10), 0, 100, lambda hum: hum % 20 == 0)
+        self._text(5, 0, -0.4, "Humidity", 10, text)
+        self._needle(5, "humidity_angle", 0.81)
+        self._text(5, 0, 0.27, "$humidity_text", 10.8, value)
+
+        # Water Temperature (dial 6): current, and the monthly average as a red line
+        self._scale(6, range(30, 81, 10), 30, 80, lambda temp: temp % 20 == 0)
+        self._text(6, 0, -0.4, "Water Temperature", 10, text, family=f"Georgia, {self.font}")
+        self._parts.append('<g display="$water_temp_display">')
+        self._needle(6, "water_temp_angle", 0.81)
+        self._parts.append('</g><g display="$water_avg_display">')
+        self._hand(6, "water_avg_angle")
+        self._parts.append('</g>')
+        self._text(6, 0, 0.27, "$water_temp_text", 10.8, value)
+
+        # Wave Height (dial 7): waves, and swell as a red line
+        self._scale(7, range(0, 16, 3), 0, 15, lambda wave: wave in [0, 3, 6, 9, 12, 15])
+        self._text(7, 0, -0.4, "Wave Height", 10, text)
+        self._needle(7, "wave_angle", 0.81)
+        self._hand(7, "swell_angle")
+        self._text(7, 0, 0.27, "$wave_text", 10.8, value)
+
+        self._parts.append('</svg>')
+
+    # Function to map dial coordinates (data units, y up) to strip points (y down)
+    def _at(self, dial, x, y):
+        center_x = (TIGHT_PAD_INCHES + dial * (GAUGE_WIDTH_INCHES + GAUGE_GAP_INCHES) + GAUGE_WIDTH_INCHES / 2) * POINTS_PER_INCH
+        center_y = self.height / 2
+        return center_x + x * SVG_DIAL_SCALE, center_y - y * SVG_DIAL_SCALE
+
+    # Function to add a semicircular scale's ticks and labels, like CompassRoseGauge._draw_scale
+    def _scale(self, dial, values, min_value, max_value, labeled):
+        for value in values:
+            rad = math.radians(_scale_angle(value, min_value, max_value, clamp=False))
+            length = 1.035 if labeled(value) else 0.945
+            self._line(dial, (length - 0.09) * math.cos(rad), (length - 0.09) * math.sin(rad), length * math.cos(rad), length * math.sin(rad),
+                       self.palette['border'], 1.08 if labeled(value) else 0.72)
+            if labeled(value):
+                self._text(dial, 1.125 * math.cos(rad), 1.125 * math.sin(rad), str(value), 7.2, self.palette['text'])
+
+    def _line(self, dial, x0, y0, x1, y1, color, width):
+        (x0, y0), (x1, y1) = self._at(dial, x0, y0), self._at(dial, x1, y1)
+        self._parts.append(f'<line x1="{x0:.2f}" y1="{y0:.2f}" x2="{x1:.2f}" y2="{y1:.2f}" stroke="{color}" '
+                           f'stroke-width="{width}" stroke-linecap="square"/>')
+
+    def _circle(self, dial, radius, stroke, fill, width):
+        x, y = self._at(dial, 0, 0)
+        self._parts.append(f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{radius * SVG_DIAL_SCALE:.2f}" stroke="{stroke}" '
+                           f'fill="{fill}" stroke-width="{width}"/>')
+
+    # Function to add the upper half of a circle's outline
+    def _arc(self, dial, radius, stroke, width):
+        (x0, y), (x1, _) = self._at(dial, radius, 0), self._at(dial, -radius, 0)
+        r = radius * SVG_DIAL_SCALE
+        self._parts.append(f'<path d="M{x0:.2f},{y:.2f} A{r:.2f},{r:.2f} 0 0 0 {x1:.2f},{y:.2f}" stroke="{stroke}" '
+                           f'fill="none" stroke-width="{width}"/>')
+
+    # Function to add a filled upper half circle, closed along its diameter
+    def _wedge(self, dial, radius, stroke, fill, width):
+        (x0, y), (x1, _) = self._at(dial, radius, 0), self._at(dial, -radius, 0)
+        r = radius * SVG_DIAL_SCALE
+        self._parts.append(f'<path d="M{x0:.2f},{y:.2f} A{r:.2f},{r:.2f} 0 0 0 {x1:.2f},{y:.2f} Z" stroke="{stroke}" '
+                           f'fill="{fill}" stroke-width="{width}"/>')
+
+    # Function to add centered text; rotation is counterclockwise in degrees, like matplotlib's
+    def _text(self, dial, x, y, label, size, color, family=None, rotation=0):
+        x, y = self._at(dial, x, y)
+        extra = f' font-family="{family}"' if family else ""
+        if rotation:
+            extra += f' transform="rotate({-rotation:.2f} {x:.2f} {y:.2f})"'
+        self._parts.append(f'<text x="{x:.2f}" y="{y:.2f}" font-size="{size}" fill="{color}" text-anchor="middle" '
+                           f'dominant-baseline="central"{extra}>{label}</text>')
+
+    # Function to add a needle arrow from the hub, pointing at +x and turned by the named rotation;
+    # the same shape (and 1 pt edge) matplotlib's FancyArrow gives CompassRoseGauge._needle
+    def _needle(self, dial, rotation, length, color=None, thin=False):
+        color = color or self.palette['needle']
+        width, head_width, head_length = (0.0135, 0.036, 0.072) if thin else (0.018, 0.054, 0.09)
+        length, width, head_width, head_length = (v * SVG_DIAL_SCALE for v in (length, width, head_width, head_length))
+        neck = length - head_length
+        outline = [(0, width / 2), (neck, width / 2), (neck, head_width / 2), (length, 0),
+                   (neck, -head_width / 2), (neck, -width / 2), (0, -width / 2)]
+        x, y = self._at(dial, 0, 0)
+        points = " ".join(f"{px:.2f},{py:.2f}" for px, py in outline)
+        self._parts.append(f'<g transform="translate({x:.2f} {y:.2f}) rotate(${rotation})"><polygon points="{points}" '
+                           f'fill="{color}" stroke="{color}" stroke-width="1" stroke-linejoin="miter"/></g>')
+
+    # Function to add a secondary (red line) needle turned by the named rotation, like CompassRoseGauge._line
+    def _hand(self, dial, rotation):
+        x, y = self._at(dial, 0, 0)
+        self._parts.append(f'<g transform="translate({x:.2f} {y:.2f}) rotate(${rotation})"><line x1="0" y1="0" '
+                           f'x2="{0.72 * SVG_DIAL_SCALE:.2f}" y2="0" stroke="{self.palette["secondary_needle"]}" '
+                           f'stroke-width="2.5" stroke-linecap="square"/></g>')
+
+# Function to turn a dial angle (degrees counterclockwise from +x) into an SVG rotation (clockwise)
+def _rotation(angle):
+    return f"{-angle:.2f}"
+
+# Gauges with their faces already drawn, one per pixel width, palette and font
+_gauges = {}
+_gauges_lock = threading.Lock()
+
+# Function to render the gauge strip pixel_width pixels wide, encoded as image_format ("png" or "webp"),
+# reusing the cached faces and dials for its size and style
+def render_gauge_image(pixel_width, image_format="png", color_palette=None, font=None, **values):
+    palette = color_palette if color_palette else GAUGE_PALETTE
+    key = (pixel_width, tuple(sorted(palette.items())), font)
+    with _gauges_lock:  # pyplot figures aren't thread-safe; renders take turns
+        gauge = _gauges.get(key)
+        if gauge is None:
+            gauge = _gauges[key] = CompassRoseGauge(color_palette=palette, font=font, pixel_width=pixel_width)
+        return gauge.render_image(image_format=image_format, **values)
+
+# SVG templates, one per palette and font
+_svg_gauges = {}
+
+# Function to render the gauge strip as SVG markup from the cached template for its style
+def render_gauge_svg(color_palette=None, font=None, **values):
+    palette = color_palette if color_palette else GAUGE_PALETTE
+    key = (tuple(sorted(palette.items())), font)
+    gauge = _svg_gauges.get(key)
+    if gauge is None:
+        gauge = _svg_gauges[key] = SvgCompassRoseGauge(palette, font)  # A duplicate built by a racing thread is harmless
+    return gauge.render_svg(**values)
+
 if __name__ == "__main__":
     import threading
     if threading.current_thread() is threading.main_thread():
         conditions = get_current_conditions()
-        wave_height, swell_height = get_windy_wave_data()
+        wave_height, swell_height = get_windy_wave_data() or (0.0, 0.0)
         wind_direction = conditions["wind_direction"]
         wind_speed = conditions["wind_speed"]
         wind_gusts = conditions["wind_gust"] if isinstance(conditions["wind_gust"], (int, float)) else 0
@@ -570,11 +752,12 @@ if __name__ == "__main__":
         baro_pressure = conditions.get("barometric_pressure", 30.0)
         humidity = conditions["humidity"]
         water_temp = get_current_water_temp()
-        baro_pressure_3h_ago = baro_pressure - 0.1
+        water_temp_average = get_average_water_temp()
+        baro_pressure_3h_ago = _pressure_3h_ago(baro_pressure)
         
         gauge = CompassRoseGauge()
         gauge.draw_compass_rose(wind_direction, wind_speed, wind_gusts, temperature, precip_24h, baro_pressure, 
-                               humidity, water_temp, wave_height, baro_pressure_3h_ago, swell_height)
+                               humidity, water_temp, wave_height, baro_pressure_3h_ago, swell_height, water_temp_average)
         gauge.show()
     else:
         print("Error: This script must be run in the main thread.")
\ No newline at end of file
@@ -0,0 +1,159 @@
+# coops_client.py
+# One client for the NOAA CO-OPS data API. Fetches any product for a station and date range,
+# several products concurrently, and caches each product one UTC day at a time so a new
+# range only downloads the days that aren't already covered.
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import disk_cache
+import fanout
+import http_client
+import time_parse
+
+STATION_ID = "8461490"  # New London, CT
+DATAGETTER_URL = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
+MAX_DAYS_PER_REQUEST = 31  # CO-OPS caps 6-minute data at a month per request
+FINAL_TTL = 30 * 24 * 3600  # A finished day of observations, or any day of predictions, won't change
+SAMPLES_PER_DAY = 24 * 10  # A complete day of 6-minute data
+
+# product -> extra request params, the list holding the rows, the value field, and the
+# TTL of days that can still change (today's observations)
+PRODUCTS = {
+    "predictions": {"params": {"datum": "MLLW", "interval": "6"}, "rows": "predictions", "field": "v", "ttl": FINAL_TTL},
+    "water_level": {"params": {"datum": "MLLW"}, "rows": "data", "field": "v", "ttl": 360},
+    "water_temperature": {"params": {}, "rows": "data", "field": "v", "ttl": 1800},
+    "waves": {"params": {}, "rows": "data", "field": "wh", "ttl": 1800},
+}
+
+# fetch_many runs inside render_graph.prefetch and fanout workers (via get_tide_data),
+# so it gets a pool of its own rather than queueing behind its caller on the shared one
+_executor = ThreadPoolExecutor(max_workers=len(PRODUCTS), thread_name_prefix="coops")
+
+# Function to get a product's readings for whole UTC days, oldest first.
+# start_date/end_date are dates or datetimes (aware ones are reduced to their UTC date).
+# Returns (naive UTC datetime64 array, float array with NaN for missing readings)
+def fetch(product, start_date, end_date, station=STATION_ID, timeout=None):
+    spec = PRODUCTS[product]
+    cache = disk_cache.get_cache()
+    first, last = utc_day(start_date), utc_day(end_date)
+    if product != "predictions":
+        # Nothing has been observed after today
+        last = min(last, datetime.datetime.now(datetime.timezone.utc).date())
+    days = _days(first, last)
+
+    by_day = {}
+    missing = []
+    for day in days:
+        cached = None if disk_cache.forcing_refresh() else cache.get(_day_key(station, product, day))
+        if cached is None:
+            missing.append(day)
+        else:
+            by_day[day] = cached
+
+    for run_first, run_last in _runs(missing):
+        try:
+            times, values = request(product, station, run_first, run_last, timeout)
+        except Exception as e:
+            # Serve whatever we had for these days, however old
+            print(f"[DEBUG] CO-OPS {product} {run_first}..{run_last} failed: {e}")
+            stale = {day: cache.get(_day_key(station, product, day), allow_expired=True)
+                     for day in _days(run_first, run_last)}
+            if not any(entry is not None for entry in stale.values()):
+                raise
+            by_day.update((day, entry) for day, entry in stale.items() if entry is not None)
+            continue
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        day_of = times.astype("datetime64[D]")
+        for day in _days(run_first, run_last):
+            in_day = day_of == np.datetime64(day)
+            entry = (times[in_day], values[in_day])
+            # Yesterday's last hours can still be on their way just after midnight UTC: a past day is
+            # only final once it is complete, or older than yesterday
+            complete = in_day.sum() >= SAMPLES_PER_DAY or (day < today - datetime.timedelta(days=1) and in_day.any())
+            final = product == "predictions" or complete
+            cache.set(_day_key(station, product, day), entry, FINAL_TTL if final else spec["ttl"])
+            by_day[day] = entry
+        print(f"[DEBUG] CO-OPS {product}: fetched {run_first}..{run_last} ({len(times)} rows)")
+
+    parts = [by_day[day] for day in days if day in by_day]
+    if not parts:
+        return np.array([], dtype="datetime64[s]"), np.array([], dtype=float)
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+# Function to fetch several products for the same station and range at the same time.
+# Returns {product: (times, values)}; a product that fails comes back empty.
+def fetch_many(products, start_date, end_date, station=STATION_ID, timeout=None):
+    empty = (np.array([], dtype="datetime64[s]"), np.array([], dtype=float))
+    return fanout.fetch_all({
+        product: (lambda product=product: fetch(product, start_date, end_date, station, timeout), empty)
+        for product in products
+    }, executor=_executor)
+
+# Function to get a product's most recent reading as (aware UTC datetime, value), or None
+def latest(product, station=STATION_ID, timeout=None):
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    times, values = fetch(product, today - datetime.timedelta(days=1), today, station, timeout)
+    readings = np.flatnonzero(np.isfinite(values))
+    if not len(readings):
+        return None
+    i = readings[-1]
+    return time_parse.as_datetimes(times[i:i + 1])[0], float(values[i])
+
+# Function to request a range of whole days straight from CO-OPS, uncached (split into month-sized requests)
+def request(product, station, first, last, timeout=None):
+    spec = PRODUCTS[product]
+    times, values = [], []
+    chunk_first = first
+    while chunk_first <= last:
+        chunk_last = min(last, chunk_first + datetime.timedelta(days=MAX_DAYS_PER_REQUEST - 1))
+        params = {
+            "begin_date": f"{chunk_first:%Y%m%d} 00:00",
+            "end_date": f"{chunk_last:%Y%m%d} 23:59",
+            "station": station,
+            "product": product,
+            "time_zone": "gmt",
+            "units": "english",
+            "format": "json",
+            "application": "weather_dashboard",
+            **spec["params"]
+        }
+        response = http_client.get(DATAGETTER_URL, params=params, timeout=timeout)
+        response.raise_for_status()
+        data = response.json()
+        if "error" in data:
+            message = data["error"].get("message", "")
+            if "no data" not in message.lower():
+                raise ValueError(message)
+        rows = data.get(spec["rows"], [])
+        times.append(time_parse.parse_utc([row["t"] for row in rows]))
+        raw = np.asarray([row.get(spec["field"]) or "" for row in rows], dtype=str)
+        values.append(np.where(raw == "", "nan", raw).astype(float))
+        chunk_first = chunk_last + datetime.timedelta(days=1)
+    times, values = np.concatenate(times), np.concatenate(values)
+    order = np.argsort(times, kind="stable")
+    return times[order], values[order]
+
+# Function to group sorted days into runs of consecutive days: [(first, last), ...]
+def _runs(days):
+    runs = []
+    for day in days:
+        if runs and day == runs[-1][1] + datetime.timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+# Function to list the days from first to last inclusive
+def _days(first, last):
+    return [first + datetime.timedelta(days=i) for i in range((last - first).days + 1)]
+
+# Function to reduce a date or datetime to its UTC date (naive datetimes are taken as UTC already)
+def utc_day(value):
+    if not isinstance(value, datetime.datetime):
+        return value
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc)
+    return value.date()
+
+def _day_key(station, product, day):
+    return f"coops:{station}:{product}:{day:%Y%m%d}"
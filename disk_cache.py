@@ -0,0 +1,145 @@
+# disk_cache.py
+# SQLite-backed cache for raw upstream responses and derived results.
+# Survives Streamlit restarts and is shared by every worker process on the machine.
+import contextlib
+import functools
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.environ.get(
+    "GLP_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "glp_weather.sqlite")
+)
+MAX_BYTES = 50 * 1024 * 1024  # Evict least recently used entries beyond this
+EVICT_EVERY = 50  # Writes between eviction passes
+
+class DiskCache:
+    """Key/value store with a TTL per entry and size-based LRU eviction."""
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()  # sqlite3 connections can't be shared across threads
+        self._writes = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB, size INTEGER, "
+                "stored_at REAL, expires_at REAL, accessed_at REAL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")  # Readers don't block the writer across processes
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, key, allow_expired=False):
+        """Return (value, stored_at) or None when missing (or expired, unless allow_expired)."""
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT value, stored_at, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, stored_at, expires_at = row
+            if not allow_expired and expires_at < time.time():
+                return None
+            with conn:
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            return pickle.loads(value), stored_at
+        except Exception as e:
+            print(f"[DEBUG] Disk cache read error for {key}: {e}")
+            return None
+
+    def get(self, key, default=None, allow_expired=False):
+        entry = self.get_entry(key, allow_expired=allow_expired)
+        return entry[0] if entry else default
+
+    def set(self, key, value, ttl):
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            now = time.time()
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, stored_at, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, blob, len(blob), now, now + ttl, now)
+                )
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self.evict()
+        except Exception as e:
+            print(f"[DEBUG] Disk cache write error for {key}: {e}")
+
+    def delete(self, key):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def evict(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            # Drop least recently used entries until we're back under the limit
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+# Per-thread flag: inside force_refresh(), TTL-fresh entries are bypassed so the
+# background refresher revalidates upstream instead of re-reading its own cache
+_refresh_state = threading.local()
+
+@contextlib.contextmanager
+def force_refresh():
+    previous = getattr(_refresh_state, "forced", False)
+    _refresh_state.forced = True
+    try:
+        yield
+    finally:
+        _refresh_state.forced = previous
+
+# Function to check whether the current thread is forcing a refresh
+def forcing_refresh():
+    return getattr(_refresh_state, "forced", False)
+
+# Process-wide cache (opened lazily so importing this module never touches the disk)
+_cache = None
+_cache_lock = threading.Lock()
+
+# Function to get the shared cache
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache()
+    return _cache
+
+# Decorator to cache a function's result on disk, keyed by function name and arguments.
+# is_valid(result) can reject fallback values so they are never persisted.
+def memoize(ttl, is_valid=None):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = f"fn:{fn.__module__}.{fn.__qualname__}:{args!r}:{sorted(kwargs.items())!r}"
+            entry = None if forcing_refresh() else get_cache().get_entry(key)
+            if entry is not None:
+                return entry[0]
+            result = fn(*args, **kwargs)
+            if is_valid is None or is_valid(result):
+                get_cache().set(key, result, ttl)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,76 @@
+# fanout.py
+# Start independent data fetches at the same time on a bounded thread pool,
+# so a cold render costs about the slowest source instead of the sum of all of them.
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+except ImportError:  # Outside Streamlit (CLI tools, tests) there is no script context to carry
+    add_script_run_ctx = get_script_run_ctx = SCRIPT_RUN_CONTEXT_ATTR_NAME = None
+
+MAX_WORKERS = 8
+DEFAULT_DEADLINE = 20  # Seconds a source may take before its fallback is used
+
+# Shared pool so concurrent sessions can't pile up unbounded threads
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="fanout")
+
+# (executor, source name) -> future of a source that missed its deadline. It can't be cancelled once
+# running, so while it still is, later calls use the fallback instead of stacking another copy behind it
+_overdue = {}
+_overdue_lock = threading.Lock()
+
+# Function to run every source concurrently and collect the results by name
+# sources: {name: (fn, fallback)} or {name: (fn, fallback, deadline_seconds)}
+# Each worker runs in a copy of the caller's context, so it inherits the render budget,
+# and with the caller's Streamlit script context, so st.* calls and st.cache_data work there too.
+# Code that may itself be running on a fanout worker passes its own executor, so it never
+# waits on a pool it is holding a thread of.
+def fetch_all(sources, deadline=DEFAULT_DEADLINE, executor=None):
+    start = time.monotonic()
+    executor = executor or _executor
+    script_ctx = get_script_run_ctx(suppress_warning=True) if get_script_run_ctx else None
+    futures = {}
+    for name, spec in sources.items():
+        with _overdue_lock:
+            overdue = _overdue.get((executor, name))
+            if overdue is not None and overdue.done():
+                del _overdue[(executor, name)]
+                overdue = None
+        if overdue is not None:
+            print(f"[DEBUG] Fan-out: {name} is still running past an earlier deadline, using fallback")
+            continue
+        futures[name] = executor.submit(_run, contextvars.copy_context(), script_ctx, spec[0])
+    results = {}
+    for name, spec in sources.items():
+        _, fallback, *source_deadline = spec
+        future = futures.get(name)
+        if future is None:
+            results[name] = fallback
+            continue
+        remaining = (source_deadline[0] if source_deadline else deadline) - (time.monotonic() - start)
+        try:
+            results[name] = future.result(timeout=max(0, remaining))
+        except TimeoutError:
+            print(f"[DEBUG] Fan-out: {name} missed its deadline, using fallback")
+            with _overdue_lock:
+                _overdue[(executor, name)] = future
+            results[name] = fallback
+        except Exception as e:
+            print(f"[DEBUG] Fan-out: {name} failed: {e}")
+            results[name] = fallback
+    print(f"[DEBUG] Fan-out: {len(sources)} sources in {time.monotonic() - start:.2f}s")
+    return results
+
+# Function to run one source on a pool thread, attached to the caller's script context only while it runs
+def _run(context, script_ctx, fn):
+    if script_ctx is None:
+        return context.run(fn)
+    thread = threading.current_thread()
+    add_script_run_ctx(thread, script_ctx)
+    try:
+        return context.run(fn)
+    finally:
+        setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)  # Pool threads are shared across sessions
@@ -0,0 +1,234 @@
+# http_client.py
+# Shared HTTP client for every upstream fetcher (NWS, NOAA CO-OPS, Windy, Amtraker).
+# One process-wide requests.Session keeps TLS connections alive between calls.
+import contextlib
+import contextvars
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+import requests
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+import cassette
+import circuit_breaker
+import disk_cache
+import singleflight
+
+USER_AGENT = "weather_app"  # Identify our app to the APIs (NWS requires a User-Agent)
+DEFAULT_TIMEOUT = (5, 15)  # (connect, read) seconds
+POOL_MAXSIZE = 10  # Keep-alive connections per host
+DISK_TTL = 24 * 3600  # How long validators and bodies stay on disk for revalidation after a restart
+
+# Hosts we talk to on every render; each gets its own keep-alive pool
+POOLED_HOSTS = [
+    "api.weather.gov",
+    "api.tidesandcurrents.noaa.gov",
+    "api.windy.com",
+    "api-v3.amtraker.com",
+]
+
+# Per-host (connect, read) timeouts; other hosts use DEFAULT_TIMEOUT
+HOST_TIMEOUTS = {
+    "api.weather.gov": (3.05, 10),
+    "api.tidesandcurrents.noaa.gov": (3.05, 10),
+    "api.windy.com": (3.05, 8),
+    "api-v3.amtraker.com": (3.05, 8),
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+# Monotonic deadline of the render in progress (None outside a render budget).
+# A context variable, so fanout workers see the budget of the render that started them.
+_deadline = contextvars.ContextVar("render_deadline", default=None)
+
+class BudgetExceeded(requests.exceptions.Timeout):
+    pass
+
+# Revalidation cache: request key -> {"etag", "last_modified", "expires_at", "stored_at", "body"}
+# Backed by disk_cache so a restarted app starts with the same entries
+_revalidation_cache = {}
+_revalidation_lock = threading.Lock()
+
+class BudgetRetry(Retry):
+    """Retry policy that doesn't retry inside a render budget. Each attempt's timeout is already
+    clamped to what's left of the budget, so a second attempt (plus its backoff) would overrun it;
+    the caller falls back to its last good value instead. Redirects are still followed."""
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        redirect = response is not None and response.get_redirect_location()
+        if remaining_budget() is not None and not redirect:
+            reason = error or ResponseError(f"not retrying status {response.status if response else None} inside a render budget")
+            raise MaxRetryError(_pool, url, reason) from error
+        return retry
+
+# Function to build the retry policy shared by all hosts
+def _build_retry():
+    return BudgetRetry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(["GET", "HEAD", "POST"]),  # Windy point-forecast is a read-only POST
+        raise_on_status=False  # Hand the last response back so callers can check status_code
+    )
+
+# Function to build the pooled session
+def _build_session():
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": "gzip, deflate"
+    })
+    for host in POOLED_HOSTS:
+        adapter = cassette.CassetteAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=_build_retry())
+        session.mount(f"https://{host}/", adapter)
+    # Anything else (e.g. placeholder endpoints) still gets retries and pooling
+    default_adapter = cassette.CassetteAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE, max_retries=_build_retry())
+    session.mount("https://", default_adapter)
+    session.mount("http://", default_adapter)
+    return session
+
+# Function to get the process-wide session (created on first use)
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+# Context manager to cap every request made inside it (and in fanout workers it starts) to one budget
+@contextlib.contextmanager
+def render_budget(seconds):
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+# Function to get the seconds left in the current render budget (None if there is none)
+def remaining_budget():
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+# Function to pick the timeout for a request, clamped to what's left of the render budget.
+# Returns (timeout, clamped)
+def _timeout_for(host, timeout):
+    timeout = timeout or HOST_TIMEOUTS.get(host, DEFAULT_TIMEOUT)
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    remaining = remaining_budget()
+    if remaining is None or remaining >= max(connect, read):
+        return (connect, read), False
+    if remaining <= 0:
+        raise BudgetExceeded(f"Render budget spent before requesting {host}")
+    return (min(connect, remaining), min(read, remaining)), True
+
+# Function to send a request through the shared session, guarded by the host's circuit breaker
+def _send(method, url, timeout=None, **kwargs):
+    host = urlsplit(url).netloc
+    timeout, clamped = _timeout_for(host, timeout)
+    breaker = circuit_breaker.breaker(host)
+    if not breaker.allow():
+        raise circuit_breaker.CircuitOpenError(f"{host} is cooling down after repeated failures")
+    try:
+        response = get_session().request(method, url, timeout=timeout, **kwargs)
+    except requests.exceptions.Timeout:
+        if clamped:
+            breaker.release()  # Our budget was short, the host may be fine
+        else:
+            breaker.record_failure()
+        raise
+    except requests.exceptions.RequestException:
+        breaker.record_failure()
+        raise
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+# Function to send a GET through the shared session
+def get(url, params=None, headers=None, timeout=None, **kwargs):
+    return _send("GET", url, params=params, headers=headers, timeout=timeout, **kwargs)
+
+# Function to send a POST through the shared session
+def post(url, json=None, headers=None, timeout=None, **kwargs):
+    return _send("POST", url, json=json, headers=headers, timeout=timeout, **kwargs)
+
+# Function to build the cache key for a request
+def _cache_key(url, params):
+    return f"{url}?{urlencode(sorted((params or {}).items()), doseq=True)}"
+
+# Function to work out how long a response stays fresh from Cache-Control / Age
+def _expires_at(response):
+    cache_control = response.headers.get("Cache-Control", "").lower()
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return 0
+    for directive in cache_control.split(","):
+        name, _, value = directive.strip().partition("=")
+        if name == "max-age" and value.isdigit():
+            age = response.headers.get("Age", "0")
+            return time.time() + int(value) - (int(age) if age.isdigit() else 0)
+    return 0
+
+# Function to store a revalidation entry in memory and on disk
+def _remember(key, entry, ttl):
+    with _revalidation_lock:
+        _revalidation_cache[key] = entry
+    disk_cache.get_cache().set(f"http:{key}", entry, max(ttl or 0, DISK_TTL))
+
+# Function to GET a JSON document, revalidating with ETag / Last-Modified.
+# Fresh entries (per max-age, or younger than ttl seconds) are served without a request;
+# on 304 the parsed body is reused. Concurrent fetches of the same URL share one request.
+# If the upstream fails (error, open circuit, spent budget) the last good body is served instead.
+def get_json(url, params=None, headers=None, timeout=None, ttl=None):
+    key = _cache_key(url, params)
+    entry = _revalidation_cache.get(key)
+    if entry is None:
+        entry = disk_cache.get_cache().get(f"http:{key}")
+        if entry is not None:
+            with _revalidation_lock:
+                _revalidation_cache[key] = entry
+    now = time.time()
+    fresh = entry and (now < entry["expires_at"] or (ttl and now - entry["stored_at"] < ttl))
+    if fresh and not disk_cache.forcing_refresh():
+        return entry["body"]
+    try:
+        return singleflight.group.do(f"http:{key}", lambda: _fetch_json(key, entry, url, params, headers, timeout, ttl))
+    except Exception as e:
+        if entry is None:
+            raise
+        print(f"[DEBUG] {url} unavailable ({e}), serving response from {int((now - entry['stored_at']) // 60)} min ago")
+        return entry["body"]
+
+# Function to fetch (or revalidate) a JSON document and remember it
+def _fetch_json(key, entry, url, params, headers, timeout, ttl):
+    request_headers = dict(headers or {})
+    if entry:
+        if entry["etag"]:
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = get(url, params=params, headers=request_headers, timeout=timeout)
+    if response.status_code == 304 and entry:
+        entry = dict(entry, expires_at=_expires_at(response), stored_at=time.time())
+        _remember(key, entry, ttl)
+        print(f"[DEBUG] 304 Not Modified, reusing cached body: {url}")
+        return entry["body"]
+    response.raise_for_status()
+    body = response.json()
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    expires_at = _expires_at(response)
+    if etag or last_modified or expires_at or ttl:
+        _remember(key, {
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires_at": expires_at,
+            "stored_at": time.time(),
+            "body": body
+        }, ttl)
+    return body
@@ -0,0 +1,90 @@
+# json_stream.py
+# Incremental reader for JSON documents shaped {key: [item, ...], ...}, like the Amtraker
+# trains feed. Items are decoded one at a time as chunks arrive, so a caller can stop
+# reading as soon as it has its answer and never holds the whole object graph.
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+NUMBER_CHARS = "0123456789+-.eE"
+
+_decoder = json.JSONDecoder()
+
+class _Buffer:
+    """Sliding window of decoded text over a stream of byte chunks."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()  # Chunks can split a multi-byte character
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            raise ValueError("Unexpected end of JSON stream")
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            more = self._utf8.decode(b"", final=True)
+        else:
+            more = self._utf8.decode(chunk)
+        self.text = self.text[self.pos:] + more  # Drop what's been consumed
+        self.pos = 0
+
+    # Function to return the next non-whitespace character without consuming it
+    def peek(self):
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            self._fill()
+
+    # Function to consume one of the given structural characters
+    def expect(self, chars):
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in JSON stream, got {char!r}")
+        self.pos += 1
+        return char
+
+    # Function to decode the next complete JSON value, reading more chunks until it is whole
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                self._fill()  # Value runs past the end of the buffer
+                continue
+            if not self.eof and not isinstance(value, (dict, list, str)) and self._at_edge(end):
+                self._fill()  # A number or literal at the edge may continue in the next chunk ("2" + ".5")
+                continue
+            self.pos = end
+            return value
+
+    # Function to check whether everything from end to the end of the buffer could still be part of a number
+    def _at_edge(self, end):
+        return all(char in NUMBER_CHARS for char in self.text[end:])
+
+# Function to iterate (key, item) pairs of a {key: [item, ...], ...} document given as byte chunks
+def iter_items(chunks):
+    buffer = _Buffer(chunks)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        return
+    while True:
+        key = buffer.value()
+        buffer.expect(":")
+        buffer.expect("[")
+        if buffer.peek() == "]":
+            buffer.pos += 1
+        else:
+            while True:
+                yield key, buffer.value()
+                if buffer.expect(",]") == "]":
+                    break
+        if buffer.expect(",}") == "}":
+            return
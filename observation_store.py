@@ -0,0 +1,100 @@
+# observation_store.py
+# One copy of the KGON station feed per refresh, shared by current conditions,
+# precipitation totals and the barometric pressure history.
+import datetime
+import threading
+import time
+import numpy as np
+import pytz
+import disk_cache
+import http_client
+import time_parse
+
+OBS_URL = "https://api.weather.gov/stations/KGON/observations"  # Weather station KGON (Groton, CT)
+REFRESH_SECONDS = 300  # Re-fetch the feed at most every 5 minutes
+FORCED_REFRESH_SECONDS = 60  # Background refreshes may re-fetch sooner, but not once per consumer
+PA_TO_INHG = 0.000295301
+PRECIP_WINDOWS = {"1h": 1, "3h": 3, "6h": 6, "12h": 12, "24h": 24}
+
+class ObservationStore:
+    """Time-indexed KGON observations, oldest first, fetched once per refresh."""
+
+    def __init__(self, url=OBS_URL, refresh_seconds=REFRESH_SECONDS):
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._fetched_at = None
+        self._body = None  # Last JSON document parsed into the series
+        self.properties = []  # Raw observation properties, aligned with times
+        self.times = np.array([], dtype="datetime64[s]")  # UTC, ascending
+        self.pressure_pa = np.array([], dtype=float)  # NaN where the station reported nothing
+        self.precip_mm = np.array([], dtype=float)
+
+    def refresh(self, force=False):
+        with self._lock:
+            min_age = FORCED_REFRESH_SECONDS if disk_cache.forcing_refresh() else self.refresh_seconds
+            if not force and self._fetched_at is not None and time.monotonic() - self._fetched_at < min_age:
+                return
+            body = http_client.get_json(self.url, ttl=self.refresh_seconds)
+            self._fetched_at = time.monotonic()
+            if body is self._body:
+                return  # Revalidated (304 / still fresh): the parsed series is already current
+            self._load(body["features"])
+            self._body = body
+            print(f"[DEBUG] Observation store loaded {len(self.properties)} KGON observations")
+
+    def _load(self, features):
+        properties = [obs["properties"] for obs in features]
+        times = time_parse.parse_utc([props["timestamp"] for props in properties])
+        order = np.argsort(times, kind="stable")
+        self.properties = [properties[i] for i in order]
+        self.times = times[order]
+        self.pressure_pa = np.array([_value(props.get("barometricPressure")) for props in self.properties], dtype=float)
+        self.precip_mm = np.array([_value(props.get("precipitationLastHour")) for props in self.properties], dtype=float)
+
+    def latest(self):
+        self.refresh()
+        if not self.properties:
+            raise ValueError("No KGON observations available")
+        return self.properties[-1]
+
+    def precipitation_totals(self, now=None):
+        self.refresh()
+        now = _utc_datetime64(now)
+        hours_ago = (now - self.times) / np.timedelta64(1, "h")
+        precip = np.nan_to_num(self.precip_mm)
+        totals = {}
+        for key, hours in PRECIP_WINDOWS.items():
+            in_window = (hours_ago >= 0) & (hours_ago <= hours)  # Readings after now (clock skew) aren't counted
+            totals[key] = round(_hourly_total(self.times[in_window], precip[in_window]) / 25.4, 2)  # Convert mm to inches
+        return totals
+
+    def pressure_history(self, hours=48, now=None):
+        """Pressure over the last `hours` as (naive UTC datetime64 times, inHg array), oldest first."""
+        self.refresh()
+        now = _utc_datetime64(now)
+        start = now - np.timedelta64(int(hours * 3600), "s")
+        mask = (self.times >= start) & (self.times <= now) & ~np.isnan(self.pressure_pa)
+        return self.times[mask], np.round(self.pressure_pa[mask] * PA_TO_INHG, 2)
+
+# Function to pull a numeric value out of an NWS quantity ({"value": ..., "unitCode": ...})
+def _value(quantity):
+    if not quantity or quantity.get("value") is None:
+        return np.nan
+    return quantity["value"]
+
+# Function to total "precipitation last hour" readings, counting one per clock hour (the largest).
+# Special reports (SPECIs) between the routine hourly ones repeat part of the same hour's rain
+def _hourly_total(times, precip_mm):
+    if not len(times):
+        return 0.0
+    _, first = np.unique(times.astype("datetime64[h]"), return_index=True)  # times are ascending
+    return float(np.maximum.reduceat(precip_mm, first).sum())
+
+# Function to normalize "now" to a naive UTC datetime64
+def _utc_datetime64(now):
+    now = now or datetime.datetime.now(pytz.UTC)
+    return np.datetime64(now.astimezone(pytz.UTC).replace(tzinfo=None), "s")
+
+# Process-wide store shared by every consumer
+store = ObservationStore()
@@ -0,0 +1,131 @@
+# refresher.py
+# Stale-while-revalidate for the dashboard panels: a background thread re-fetches each
+# source shortly before its TTL runs out, and readers always get the last good value
+# right away, together with its age. The last good value of each source is also kept
+# on disk, so a restarted app shows it instead of hard-coded defaults when an upstream is down.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import disk_cache
+
+LEAD_FRACTION = 0.1  # Refresh when 90% of the TTL has elapsed
+RETRY_SECONDS = 60  # Retry a failed refresh sooner than its TTL
+MAX_SLEEP_SECONDS = 30
+MAX_WORKERS = 4  # Refreshes in flight at once, so one slow source (or host) can't hold up the rest
+LAST_GOOD_TTL = 7 * 24 * 3600  # How long a last good value may stand in for a failing source
+# Last good values are pickled, TideSeries and PressureSeries included. Bump this whenever a
+# panel's value type changes shape, so values written by older code are ignored instead of served.
+LAST_GOOD_SCHEMA = 3  # 3: drops water temperatures stored when the fetcher returned a made-up 45°F
+
+class Source:
+    def __init__(self, name, fn, ttl, is_valid=None):
+        self.name = name
+        self.fn = fn
+        self.ttl = ttl
+        self.is_valid = is_valid
+        self.value = None
+        self.fetched_at = None  # Wall-clock time of the last good value (None while serving a fallback)
+        self.next_refresh = 0
+        self.lock = threading.Lock()
+
+class Refresher:
+    """Registry of data sources kept warm by one daemon thread, which hands due refreshes to a small pool."""
+
+    def __init__(self):
+        self._sources = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="refresher")
+        self._in_flight = set()  # Names of sources being refreshed on the pool
+
+    def register(self, name, fn, ttl, is_valid=None):
+        # Idempotent: Streamlit re-runs the dashboard script, the first registration wins
+        with self._lock:
+            if name not in self._sources:
+                self._sources[name] = Source(name, fn, ttl, is_valid)
+
+    def get(self, name):
+        """Return (value, age_seconds). Only the very first read of a source blocks on a fetch.
+        The age is None when the value is the source's fallback, not something it fetched."""
+        source = self._sources[name]
+        if source.next_refresh == 0:
+            self._refresh(source, only_if_empty=True)
+        return source.value, None if source.fetched_at is None else time.time() - source.fetched_at
+
+    def last_good(self, name, default=None):
+        """Value to show when a read misses the render budget: in memory, else on disk, else default."""
+        source = self._sources.get(name)
+        if source is not None and source.fetched_at is not None:
+            return source.value
+        last_good = self._load_last_good(source) if source is not None else None
+        return last_good[0] if last_good else default
+
+    def _refresh(self, source, only_if_empty=False, force=False):
+        with source.lock:
+            if only_if_empty and source.next_refresh:
+                return  # Another reader tried it while we waited
+            try:
+                if force:
+                    with disk_cache.force_refresh():
+                        value = source.fn()
+                else:
+                    value = source.fn()
+                ok = source.is_valid is None or source.is_valid(value)
+            except Exception as e:
+                print(f"[DEBUG] Refresher: {source.name} failed: {e}")
+                value, ok = None, False
+            if ok:
+                source.value = value
+                source.fetched_at = time.time()
+                disk_cache.get_cache().set(_last_good_key(source.name), value, LAST_GOOD_TTL)
+            elif source.fetched_at is None:
+                # Nothing in memory yet: prefer the last good value on disk over the fallback
+                last_good = self._load_last_good(source)
+                source.value, source.fetched_at = last_good if last_good else (value, None)
+            source.next_refresh = time.time() + (source.ttl * (1 - LEAD_FRACTION) if ok else RETRY_SECONDS)
+
+    # Function to read a source's last good (value, stored_at) from disk, or None if missing or no longer valid
+    def _load_last_good(self, source):
+        last_good = disk_cache.get_cache().get_entry(_last_good_key(source.name))
+        if last_good is None:
+            return None
+        try:
+            if source.is_valid is None or source.is_valid(last_good[0]):
+                return last_good
+        except Exception as e:
+            print(f"[DEBUG] Refresher: ignoring unusable last good {source.name}: {e}")
+        return None
+
+    def _run(self):
+        while True:
+            now = time.time()
+            with self._lock:
+                due = [s for s in self._sources.values() if now >= s.next_refresh and s.name not in self._in_flight]
+                self._in_flight.update(s.name for s in due)
+            for source in due:
+                self._executor.submit(self._refresh_in_background, source)
+            with self._lock:
+                waiting = [s.next_refresh for s in self._sources.values() if s.name not in self._in_flight]
+            next_due = min(waiting, default=now + MAX_SLEEP_SECONDS)
+            time.sleep(min(max(next_due - time.time(), 1), MAX_SLEEP_SECONDS))
+
+    # Function to refresh one source on the pool; it isn't scheduled again until this returns
+    def _refresh_in_background(self, source):
+        try:
+            self._refresh(source, force=source.fetched_at is not None)
+            print(f"[DEBUG] Refresher: refreshed {source.name}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(source.name)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="refresher", daemon=True)
+                self._thread.start()
+
+def _last_good_key(name):
+    return f"panel:v{LAST_GOOD_SCHEMA}:{name}"
+
+# Process-wide refresher shared by every Streamlit session
+refresher = Refresher()
@@ -0,0 +1,33 @@
+# render_benchmark.py
+# Time dashboard renders against recorded fixtures, with no network. Record the fixtures first:
+#   GLP_HTTP_MODE=record streamlit run weather_dashboard.py
+# then:  python render_benchmark.py [runs]   (set GLP_REPLAY_LATENCY to simulate slow upstreams)
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("GLP_HTTP_MODE", "replay")
+# Fresh disk cache so the first render is a true cold start
+os.environ.setdefault("GLP_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "benchmark.sqlite"))
+
+from streamlit.testing.v1 import AppTest
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weather_dashboard.py")
+
+def time_render():
+    app = AppTest.from_file(DASHBOARD, default_timeout=300)
+    start = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - start
+    if app.exception:
+        print(f"Render raised: {app.exception[0].value}")
+    return elapsed
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    timings = [time_render() for _ in range(runs)]
+    print(f"Mode: {os.environ['GLP_HTTP_MODE']}, replay latency: {os.environ.get('GLP_REPLAY_LATENCY', '0')}s")
+    print(f"Cold render: {timings[0]:.2f}s")
+    for i, elapsed in enumerate(timings[1:], start=2):
+        print(f"Render {i}: {elapsed:.2f}s")
@@ -0,0 +1,67 @@
+# render_graph.py
+# Per-run dependency graph for the dashboard. Each piece of data (a panel, a series, a figure,
+# the gauge image) is declared once as a node with the nodes it's built from; it is computed
+# at most once per run, on first use, and every consumer gets the same value.
+import threading
+import fanout
+
+class Node:
+    def __init__(self, name, fn, deps, fallback):
+        self.name = name
+        self.fn = fn
+        self.deps = deps
+        self.fallback = fallback  # Value used when fn raises or misses the prefetch deadline
+        self.value = None
+        self.done = False
+        self.lock = threading.Lock()  # Held while computing, so concurrent consumers wait instead of recomputing
+
+class RenderGraph:
+    """Named nodes computed lazily, at most once per graph (one graph per Streamlit run)."""
+
+    def __init__(self):
+        self._nodes = {}
+        self._settle_lock = threading.Lock()
+
+    def add(self, name, fn, deps=(), fallback=None):
+        """Declare a node: fn receives the values of deps, in order."""
+        if name in self._nodes:
+            raise ValueError(f"Render graph node {name!r} declared twice")
+        self._nodes[name] = Node(name, fn, tuple(deps), fallback)
+
+    # Decorator form of add()
+    def node(self, name, deps=(), fallback=None):
+        def decorator(fn):
+            self.add(name, fn, deps, fallback)
+            return fn
+        return decorator
+
+    def get(self, name):
+        node = self._nodes[name]
+        if node.done:
+            return node.value
+        with node.lock:
+            if not node.done:
+                try:
+                    value = node.fn(*[self.get(dep) for dep in node.deps])
+                except Exception as e:
+                    print(f"[DEBUG] Render graph: {name} failed: {e}")
+                    value = node.fallback
+                self._settle(node, value)
+        return node.value
+
+    def prefetch(self, names, deadline=fanout.DEFAULT_DEADLINE):
+        """Compute independent nodes concurrently; any that miss the deadline settle on their fallback."""
+        results = fanout.fetch_all(
+            {name: (lambda name=name: self.get(name), self._nodes[name].fallback) for name in names},
+            deadline=deadline
+        )
+        for name, value in results.items():
+            self._settle(self._nodes[name], value)  # No-op for nodes that finished in time
+        return results
+
+    # Function to record a node's value once; a late worker can't replace a fallback already served
+    def _settle(self, node, value):
+        with self._settle_lock:
+            if not node.done:
+                node.value = value
+                node.done = True
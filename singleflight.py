@@ -0,0 +1,51 @@
+# singleflight.py
+# Request coalescing: concurrent callers asking for the same key wait on one in-flight
+# call instead of each sending an identical request upstream.
+import functools
+import threading
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Deduplicates concurrent calls per key; the first caller runs fn, the rest share its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+# Process-wide group shared by every Streamlit session
+group = SingleFlight()
+
+# Decorator to coalesce concurrent calls of a function with the same arguments
+def coalesce(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = f"fn:{fn.__module__}.{fn.__qualname__}:{args!r}:{sorted(kwargs.items())!r}"
+        return group.do(key, lambda: fn(*args, **kwargs))
+    return wrapper
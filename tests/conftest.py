@@ -0,0 +1,16 @@
+# conftest.py
+# Shared fixtures for the unit tests. The modules live at the top level of the repo, and
+# anything that talks to the process-wide disk cache gets a fresh one in a temp directory.
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import disk_cache
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    fresh = disk_cache.DiskCache(path=str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(disk_cache, "_cache", fresh)
+    return fresh
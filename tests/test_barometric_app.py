@@ -0,0 +1,30 @@
+import datetime
+import numpy as np
+import barometric_app
+
+UTC = datetime.timezone.utc
+NOW = datetime.datetime(2026, 10, 17, 12, 0, tzinfo=UTC)
+
+def _series(*readings):
+    # readings: (minutes before NOW, inHg)
+    times = [np.datetime64(NOW.replace(tzinfo=None) - datetime.timedelta(minutes=m), "s") for m, _ in readings]
+    return barometric_app.PressureSeries(times, [p for _, p in readings])
+
+def test_pressure_at_takes_the_nearest_reading():
+    series = _series((0, 30.10), (60, 30.05), (180, 29.90))
+    assert series.pressure_at(NOW - datetime.timedelta(minutes=70)) == 30.05
+    assert series.pressure_at(NOW - datetime.timedelta(minutes=170)) == 29.90
+
+def test_pressure_at_ignores_readings_too_far_away():
+    series = _series((0, 30.10), (300, 29.90))
+    assert series.pressure_at(NOW - datetime.timedelta(hours=3)) is None
+    assert series.pressure_at(NOW + datetime.timedelta(hours=1)) is None
+    assert barometric_app.PressureSeries([], []).pressure_at(NOW) is None
+
+def test_tendency_needs_a_reading_near_the_start():
+    series = _series((0, 30.10), (60, 30.05), (180, 29.90))
+    assert series.tendencies(now=NOW) == {"1h": 0.05, "3h": 0.2, "6h": None, "12h": None}
+
+def test_readings_are_sorted():
+    series = _series((180, 29.90), (0, 30.10), (60, 30.05))
+    assert series.current == 30.10 and series.trend() == "Rising"
@@ -0,0 +1,22 @@
+import cassette
+
+def test_parse_host_latency():
+    assert cassette._parse_host_latency("") == {}
+    assert cassette._parse_host_latency("api.weather.gov=0.4, waze=2") == {"api.weather.gov": 0.4, "waze": 2.0}
+    assert cassette._parse_host_latency("no_value=,=1") == {}
+
+def test_recorded_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(cassette, "CASSETTE_DIR", str(tmp_path))
+    calls = []
+
+    @cassette.recorded("waze")
+    def route(origin, destination):
+        calls.append((origin, destination))
+        return [12.5, 9.0]
+
+    monkeypatch.setattr(cassette, "MODE", "record")
+    assert route("a", "b") == [12.5, 9.0]
+    monkeypatch.setattr(cassette, "MODE", "replay")
+    monkeypatch.setattr(cassette, "HOST_LATENCY", {"waze": 0})
+    assert route("a", "b") == [12.5, 9.0]
+    assert calls == [("a", "b")]
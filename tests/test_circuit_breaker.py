@@ -0,0 +1,61 @@
+import pytest
+import circuit_breaker
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+def _fail():
+    raise RuntimeError("down")
+
+def _open(breaker):
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(RuntimeError):
+            breaker.call(_fail)
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("host", failure_threshold=3, cool_down=60)
+    _open(breaker)
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("host", failure_threshold=3, cool_down=60)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.allow()
+
+def test_half_open_allows_one_trial(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("host", failure_threshold=1, cool_down=60)
+    breaker.record_failure()
+    assert not breaker.allow()
+    now[0] += 61
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one probe while the trial is in flight
+    breaker.record_success()
+    assert breaker.allow() and breaker.opened_at is None
+
+def test_failed_trial_restarts_the_cool_down(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("host", failure_threshold=1, cool_down=60)
+    breaker.record_failure()
+    now[0] += 61
+    assert breaker.allow()
+    breaker.record_failure()
+    now[0] += 30
+    assert not breaker.allow()
+
+def test_release_frees_the_trial_without_a_verdict(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("host", failure_threshold=1, cool_down=60)
+    breaker.record_failure()
+    now[0] += 61
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+def test_breaker_is_shared_per_name():
+    assert circuit_breaker.breaker("test-host") is circuit_breaker.breaker("test-host")
@@ -0,0 +1,47 @@
+import io
+import xml.dom.minidom
+import pytest
+from PIL import Image
+import compass_rose_gauge
+
+READINGS = dict(wind_direction=200, wind_speed=23, wind_gusts=35, temperature=54, precip_24h=0.4, baro_pressure=29.92,
+                humidity=71, water_temp=55.0, wave_height=1.2, baro_pressure_3h_ago=29.97, swell_height=0.6,
+                water_temp_average=60.0)
+
+def _hidden_groups(svg):
+    return [g for g in xml.dom.minidom.parseString(svg).getElementsByTagName("g") if g.getAttribute("display") == "none"]
+
+def test_svg_is_well_formed_with_every_reading_shown():
+    svg = compass_rose_gauge.render_gauge_svg(**READINGS)
+    assert "$" not in svg  # Every placeholder substituted
+    assert _hidden_groups(svg) == []
+    assert "29.92" in svg and "55°F" in svg
+
+def test_svg_text_is_escaped(monkeypatch):
+    monkeypatch.setattr(compass_rose_gauge, "degrees_to_cardinal", lambda degrees: "<S&W>")
+    svg = compass_rose_gauge.render_gauge_svg(**READINGS)
+    assert "&lt;S&amp;W&gt;" in svg
+    xml.dom.minidom.parseString(svg)
+
+def test_svg_hides_needles_without_a_reading():
+    svg = compass_rose_gauge.render_gauge_svg(**dict(READINGS, baro_pressure_3h_ago=None))
+    (hidden,) = _hidden_groups(svg)
+    assert hidden.getElementsByTagName("polygon")  # The thin 3-hour pressure needle
+    svg = compass_rose_gauge.render_gauge_svg(**dict(READINGS, water_temp=None, water_temp_average=None))
+    assert len(_hidden_groups(svg)) == 2 and "--°F" in svg
+
+def _drawn_dials(gauge, readings):
+    before = set(gauge._tiles)
+    gauge.render_image(**readings)
+    return [name for name, _ in set(gauge._tiles) - before]
+
+def test_changed_reading_redraws_only_its_dial():
+    gauge = compass_rose_gauge.CompassRoseGauge(pixel_width=800)
+    assert len(_drawn_dials(gauge, READINGS)) == len(compass_rose_gauge.DIAL_NAMES)
+    assert _drawn_dials(gauge, READINGS) == []
+    assert _drawn_dials(gauge, dict(READINGS, temperature=61)) == ["temperature"]
+
+@pytest.mark.parametrize("pixel_width", [800, 2000])
+def test_png_comes_out_at_the_requested_width(pixel_width):
+    image = Image.open(io.BytesIO(compass_rose_gauge.render_gauge_image(pixel_width, **READINGS)))
+    assert image.format == "PNG" and image.width == pixel_width
@@ -0,0 +1,85 @@
+import datetime
+import numpy as np
+import pytest
+import coops_client
+
+UTC = datetime.timezone.utc
+EASTERN = datetime.timezone(datetime.timedelta(hours=-4))
+
+# Fake CO-OPS: one reading at 12:00 UTC on each requested day, valued by the day of the month
+@pytest.fixture
+def requests_made(cache, monkeypatch):
+    made = []
+    def request(product, station, first, last, timeout=None):
+        made.append((product, first, last))
+        days = coops_client._days(first, last)
+        times = np.array([np.datetime64(f"{day}T12:00", "s") for day in days])
+        return times, np.array([float(day.day) for day in days])
+    monkeypatch.setattr(coops_client, "request", request)
+    return made
+
+def test_only_uncached_days_are_requested(requests_made):
+    coops_client.fetch("predictions", datetime.date(2026, 3, 2), datetime.date(2026, 3, 3))
+    times, values = coops_client.fetch("predictions", datetime.date(2026, 3, 1), datetime.date(2026, 3, 5))
+    assert requests_made == [
+        ("predictions", datetime.date(2026, 3, 2), datetime.date(2026, 3, 3)),
+        ("predictions", datetime.date(2026, 3, 1), datetime.date(2026, 3, 1)),
+        ("predictions", datetime.date(2026, 3, 4), datetime.date(2026, 3, 5)),
+    ]
+    assert list(values) == [1, 2, 3, 4, 5]
+    assert np.all(np.diff(times) > np.timedelta64(0, "s"))
+
+def test_observations_stop_at_today(requests_made):
+    today = datetime.datetime.now(UTC).date()
+    coops_client.fetch("water_level", today, today + datetime.timedelta(days=3))
+    assert requests_made == [("water_level", today, today)]
+
+def test_failed_request_serves_stale_days(requests_made, cache, monkeypatch):
+    coops_client.fetch("predictions", datetime.date(2026, 3, 1), datetime.date(2026, 3, 1))
+    def down(*args, **kwargs):
+        raise RuntimeError("CO-OPS down")
+    monkeypatch.setattr(coops_client, "request", down)
+    with coops_client.disk_cache.force_refresh():
+        assert list(coops_client.fetch("predictions", datetime.date(2026, 3, 1), datetime.date(2026, 3, 1))[1]) == [1]
+    with pytest.raises(RuntimeError):
+        coops_client.fetch("predictions", datetime.date(2026, 4, 1), datetime.date(2026, 4, 1))
+
+def test_fetch_many_returns_empty_for_a_failed_product(requests_made, monkeypatch):
+    fetched = coops_client.fetch_many(["predictions", "waves"], datetime.date(2026, 3, 1), datetime.date(2026, 3, 1))
+    assert list(fetched["predictions"][1]) == [1] and list(fetched["waves"][1]) == [1]
+    monkeypatch.setattr(coops_client, "request", lambda *args, **kwargs: 1 / 0)
+    fetched = coops_client.fetch_many(["water_temperature"], datetime.date(2026, 3, 1), datetime.date(2026, 3, 1))
+    assert len(fetched["water_temperature"][0]) == 0
+
+def test_utc_day_of_local_evening_is_the_next_day():
+    assert coops_client.utc_day(datetime.datetime(2026, 3, 1, 21, 0, tzinfo=EASTERN)) == datetime.date(2026, 3, 2)
+    assert coops_client.utc_day(datetime.datetime(2026, 3, 1, 21, 0)) == datetime.date(2026, 3, 1)
+    assert coops_client.utc_day(datetime.date(2026, 3, 1)) == datetime.date(2026, 3, 1)
+
+def test_runs_group_consecutive_days():
+    days = [datetime.date(2026, 3, d) for d in (1, 2, 3, 5, 7, 8)]
+    assert coops_client._runs(days) == [
+        (datetime.date(2026, 3, 1), datetime.date(2026, 3, 3)),
+        (datetime.date(2026, 3, 5), datetime.date(2026, 3, 5)),
+        (datetime.date(2026, 3, 7), datetime.date(2026, 3, 8)),
+    ]
+
+def test_incomplete_yesterday_is_not_cached_for_a_month(cache, monkeypatch):
+    today = datetime.datetime.now(UTC).date()
+    yesterday = today - datetime.timedelta(days=1)
+    def request(product, station, first, last, timeout=None):
+        # The day before yesterday in full, yesterday only up to 20:00 UTC (just after midnight)
+        times = np.arange(np.datetime64(first.isoformat(), "s"), np.datetime64(f"{yesterday}T20:00", "s"), np.timedelta64(360, "s"))
+        return times, np.ones(len(times))
+    monkeypatch.setattr(coops_client, "request", request)
+    ttls = {}
+    set_entry = cache.set
+    def recording_set(key, value, ttl):
+        ttls[key.rsplit(":", 1)[1]] = ttl
+        return set_entry(key, value, ttl)
+    monkeypatch.setattr(cache, "set", recording_set)
+    coops_client.fetch("water_level", yesterday - datetime.timedelta(days=1), yesterday)
+    assert ttls == {
+        f"{yesterday - datetime.timedelta(days=1):%Y%m%d}": coops_client.FINAL_TTL,
+        f"{yesterday:%Y%m%d}": coops_client.PRODUCTS["water_level"]["ttl"],
+    }
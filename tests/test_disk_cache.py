@@ -0,0 +1,63 @@
+import time
+import disk_cache
+
+def test_set_get_round_trip(cache):
+    cache.set("k", {"a": [1, 2]}, ttl=60)
+    assert cache.get("k") == {"a": [1, 2]}
+    assert cache.get("missing", default="x") == "x"
+
+def test_expired_entries_only_with_allow_expired(cache):
+    cache.set("k", 1, ttl=-1)
+    assert cache.get("k") is None
+    assert cache.get("k", allow_expired=True) == 1
+
+def test_get_entry_returns_stored_at(cache):
+    before = time.time()
+    cache.set("k", "v", ttl=60)
+    value, stored_at = cache.get_entry("k")
+    assert value == "v" and before <= stored_at <= time.time()
+
+def test_unreadable_value_is_a_miss(cache):
+    conn = cache._connect()
+    with conn:
+        conn.execute("INSERT INTO entries VALUES ('bad', ?, 3, 0, ?, 0)", (b"not a pickle", time.time() + 60))
+    assert cache.get_entry("bad") is None
+
+def test_evict_drops_least_recently_used(tmp_path):
+    cache = disk_cache.DiskCache(path=str(tmp_path / "small.sqlite"), max_bytes=250)
+    for key in ("a", "b", "c"):
+        cache.set(key, "x" * 100, ttl=60)
+        time.sleep(0.01)
+    cache.get("a")  # Touch "a" so "b" is now the oldest
+    cache.evict()
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+def test_memoize_caches_valid_results_only(cache):
+    calls = []
+
+    @disk_cache.memoize(ttl=60, is_valid=lambda r: r is not None)
+    def square(x):
+        calls.append(x)
+        return x * x if x >= 0 else None
+
+    assert square(3) == 9 and square(3) == 9
+    assert calls == [3]
+    square(-1)
+    square(-1)
+    assert calls == [3, -1, -1]  # The fallback None was never persisted
+
+def test_force_refresh_bypasses_memoized_entry(cache):
+    calls = []
+
+    @disk_cache.memoize(ttl=60)
+    def value():
+        calls.append(1)
+        return len(calls)
+
+    assert value() == 1
+    with disk_cache.force_refresh():
+        assert disk_cache.forcing_refresh()
+        assert value() == 2
+    assert not disk_cache.forcing_refresh()
+    assert value() == 2
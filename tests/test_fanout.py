@@ -0,0 +1,63 @@
+import contextvars
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import fanout
+import http_client
+
+def _failing():
+    raise RuntimeError("upstream down")
+
+def test_results_by_name_with_fallbacks():
+    release = threading.Event()
+    results = fanout.fetch_all({
+        "fast": (lambda: 1, 0),
+        "broken": (_failing, "fallback"),
+        "slow": (lambda: release.wait(5) and "late", "too slow", 0.1),
+    }, deadline=5)
+    release.set()
+    assert results == {"fast": 1, "broken": "fallback", "slow": "too slow"}
+
+def test_workers_see_the_callers_context():
+    request_id = contextvars.ContextVar("request_id", default=None)
+    request_id.set("abc")
+    with http_client.render_budget(30):
+        results = fanout.fetch_all({
+            "request_id": (request_id.get, None),
+            "budget": (http_client.remaining_budget, None),
+        })
+    assert results["request_id"] == "abc"
+    assert 0 < results["budget"] <= 30
+
+def test_overdue_source_is_not_submitted_again():
+    executor = ThreadPoolExecutor(max_workers=2)
+    release = threading.Event()
+    calls = []
+    def stuck():
+        calls.append(1)
+        release.wait(5)
+        return "late"
+    try:
+        assert fanout.fetch_all({"stuck": (stuck, "fallback")}, deadline=0.05, executor=executor) == {"stuck": "fallback"}
+        assert fanout.fetch_all({"stuck": (stuck, "fallback")}, deadline=0.05, executor=executor) == {"stuck": "fallback"}
+        assert calls == [1]
+        release.set()
+        time.sleep(0.05)
+        assert fanout.fetch_all({"stuck": (stuck, "fallback")}, deadline=1, executor=executor) == {"stuck": "late"}
+        assert calls == [1, 1]
+    finally:
+        release.set()
+        executor.shutdown(wait=True)
+
+@pytest.mark.skipif(fanout.add_script_run_ctx is None, reason="streamlit not installed")
+def test_script_context_is_attached_only_while_the_source_runs():
+    script_ctx = types.SimpleNamespace(pages_manager=types.SimpleNamespace(main_script_hash="dashboard"))
+    attached = lambda: getattr(threading.current_thread(), fanout.SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        assert executor.submit(fanout._run, contextvars.copy_context(), script_ctx, attached).result() is script_ctx
+        assert executor.submit(attached).result() is None  # The pool thread is handed back detached
+    finally:
+        executor.shutdown(wait=True)
@@ -0,0 +1,54 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, ReadTimeoutError
+import http_client
+
+def _timeout_error():
+    return ReadTimeoutError(None, "/", "read timed out")
+
+def test_retries_outside_a_budget():
+    retry = http_client._build_retry().increment(method="GET", url="/", error=_timeout_error())
+    assert retry.total == 2
+
+def test_no_retry_inside_a_budget():
+    with http_client.render_budget(10):
+        with pytest.raises(MaxRetryError):
+            http_client._build_retry().increment(method="GET", url="/", error=_timeout_error())
+
+def test_timeout_is_clamped_to_the_budget():
+    with http_client.render_budget(2):
+        (connect, read), clamped = http_client._timeout_for("api.weather.gov", None)
+    assert clamped and connect <= 2 and read <= 2
+    assert http_client._timeout_for("api.weather.gov", None) == (http_client.HOST_TIMEOUTS["api.weather.gov"], False)
+
+def test_spent_budget_raises_before_sending():
+    with http_client.render_budget(-1):
+        with pytest.raises(http_client.BudgetExceeded):
+            http_client._timeout_for("api.weather.gov", None)
+
+def test_retryable_status_inside_a_budget_is_not_retried():
+    hits = []
+
+    class Unavailable(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Unavailable)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        session = requests.Session()
+        session.mount("http://", requests.adapters.HTTPAdapter(max_retries=http_client._build_retry()))
+        with http_client.render_budget(10):
+            response = session.get(f"http://127.0.0.1:{server.server_port}/", timeout=5)
+    finally:
+        server.shutdown()
+    assert response.status_code == 503  # The last response comes back for the caller to check
+    assert len(hits) == 1
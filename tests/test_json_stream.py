@@ -0,0 +1,42 @@
+import json
+import pytest
+import json_stream
+
+DOCUMENT = {
+    "174": [{"trainNum": "174", "delay": -1.5e-1, "ok": True, "note": None, "name": "Northeast Régional ✓"}],
+    "empty": [],
+    "numbers": [2.5, -3, 10, 1e5, 0.125, 7],
+    "nested": [{"stations": [{"code": "NLC", "sch": "2026-10-17T09:00:00-04:00"}]}, [1, [2.75]]],
+}
+
+def _expected():
+    return [(key, item) for key, items in DOCUMENT.items() for item in items]
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64 * 1024])
+def test_items_match_json_loads_for_any_chunking(size):
+    data = json.dumps(DOCUMENT, ensure_ascii=False).encode("utf-8")
+    assert list(json_stream.iter_items(_chunks(data, size))) == _expected()
+
+def test_number_split_across_chunks():
+    chunks = [b'{"n": [2', b'.5, 1', b'e', b'3, -', b'4]}']
+    assert list(json_stream.iter_items(chunks)) == [("n", 2.5), ("n", 1000.0), ("n", -4)]
+
+def test_number_at_end_of_stream_is_consumed():
+    with pytest.raises(ValueError):
+        list(json_stream.iter_items([b'{"n": [2']))  # Truncated document, not a hang or wrong value
+
+def test_caller_can_stop_early():
+    read = []
+    def chunks():
+        for chunk in (b'{"a": [1, ', b'2], ', b'"b": [3]}'):
+            read.append(chunk)
+            yield chunk
+    items = json_stream.iter_items(chunks())
+    assert next(items) == ("a", 1)
+    assert len(read) == 1  # The ", " after 1 already shows the number is complete
+
+def test_empty_object():
+    assert list(json_stream.iter_items([b"{ }"])) == []
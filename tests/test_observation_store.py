@@ -0,0 +1,66 @@
+import datetime
+import numpy as np
+import pytest
+import observation_store
+
+NOW = datetime.datetime(2026, 10, 17, 12, 0, tzinfo=datetime.timezone.utc)
+
+def _feature(minutes_ago, precip_mm=None, pressure_pa=None):
+    stamp = (NOW - datetime.timedelta(minutes=minutes_ago)).isoformat()
+    return {"properties": {
+        "timestamp": stamp,
+        "precipitationLastHour": {"value": precip_mm, "unitCode": "wmoUnit:mm"},
+        "barometricPressure": {"value": pressure_pa, "unitCode": "wmoUnit:Pa"},
+    }}
+
+@pytest.fixture
+def feed(monkeypatch):
+    body = {"features": []}
+    calls = []
+    def get_json(url, ttl=None):
+        calls.append(url)
+        return body
+    monkeypatch.setattr(observation_store.http_client, "get_json", get_json)
+    return body, calls
+
+def test_latest_is_the_newest_observation(feed):
+    body, _ = feed
+    body["features"] = [_feature(4), _feature(64), _feature(124)]  # NWS lists newest first
+    store = observation_store.ObservationStore()
+    assert store.latest()["timestamp"] == (NOW - datetime.timedelta(minutes=4)).isoformat()
+
+def test_speci_reports_dont_double_count_an_hour(feed):
+    body, _ = feed
+    body["features"] = [
+        _feature(4, 2.54),   # 11:56 routine: 11:00-11:56
+        _feature(40, 1.27),  # 11:20 SPECI: part of the same hour's rain
+        _feature(64, 5.08),  # 10:56 routine
+        _feature(90, 2.0),   # 10:30 SPECI
+        _feature(30 * 60, 25.4),  # Outside every window
+    ]
+    totals = observation_store.ObservationStore().precipitation_totals(now=NOW)
+    assert totals["1h"] == 0.1
+    assert totals["3h"] == totals["24h"] == 0.3
+
+def test_future_and_missing_readings_are_ignored(feed):
+    body, _ = feed
+    body["features"] = [_feature(-30, 25.4), _feature(4, None), _feature(64, 2.54)]
+    assert observation_store.ObservationStore().precipitation_totals(now=NOW)["3h"] == 0.1
+
+def test_pressure_history_window_in_inhg(feed):
+    body, _ = feed
+    body["features"] = [_feature(4, pressure_pa=101325), _feature(64), _feature(60 * 50, pressure_pa=100000)]
+    times, pressures = observation_store.ObservationStore().pressure_history(hours=48, now=NOW)
+    assert list(pressures) == [29.92]
+    assert times[0] == np.datetime64("2026-10-17T11:56:00")
+
+def test_refresh_fetches_once_per_interval_and_reuses_a_revalidated_body(feed):
+    body, calls = feed
+    body["features"] = [_feature(4)]
+    store = observation_store.ObservationStore()
+    store.latest()
+    store.latest()
+    assert len(calls) == 1
+    loaded = store.properties
+    store.refresh(force=True)  # Same body back (304): not parsed again
+    assert len(calls) == 2 and store.properties is loaded
@@ -0,0 +1,83 @@
+import threading
+import time
+import refresher as refresher_module
+from refresher import Refresher
+
+def _failing():
+    raise RuntimeError("upstream down")
+
+def test_get_fetches_once_and_reports_age(cache):
+    calls = []
+    r = Refresher()
+    r.register("panel", lambda: calls.append(1) or len(calls), ttl=300)
+    value, age = r.get("panel")
+    assert value == 1 and 0 <= age < 5
+    assert r.get("panel")[0] == 1
+    assert calls == [1]
+
+def test_restart_serves_last_good_from_disk(cache):
+    r = Refresher()
+    r.register("panel", lambda: 42, ttl=300)
+    r.get("panel")
+    restarted = Refresher()
+    restarted.register("panel", _failing, ttl=300)
+    assert restarted.last_good("panel", default=0) == 42
+    assert restarted.get("panel")[0] == 42
+
+def test_invalid_values_never_become_last_good(cache):
+    r = Refresher()
+    r.register("water_temp", lambda: 61.0, ttl=300, is_valid=lambda t: t is not None)
+    r.get("water_temp")
+    restarted = Refresher()
+    restarted.register("water_temp", lambda: None, ttl=300, is_valid=lambda t: t is not None)
+    assert restarted.get("water_temp")[0] == 61.0
+    restarted._refresh(restarted._sources["water_temp"], force=True)
+    assert cache.get(refresher_module._last_good_key("water_temp")) == 61.0
+
+def test_last_good_from_an_older_schema_is_ignored(cache):
+    cache.set("panel:tide_series", "pickled by older code", ttl=300)
+    r = Refresher()
+    r.register("tide_series", _failing, ttl=300)
+    assert r.last_good("tide_series", default="default") == "default"
+
+def test_last_good_failing_is_valid_is_ignored(cache):
+    cache.set(refresher_module._last_good_key("series"), {"shape": "old"}, ttl=300)
+    r = Refresher()
+    r.register("series", _failing, ttl=300, is_valid=lambda s: s["times"] is not None)
+    assert r.last_good("series", default=None) is None
+    assert r.get("series")[0] is None
+
+def test_failed_refresh_keeps_the_value_in_memory(cache):
+    values = iter([1])
+    r = Refresher()
+    r.register("panel", lambda: next(values), ttl=300)
+    r.get("panel")
+    r._refresh(r._sources["panel"], force=True)  # StopIteration: the upstream failed
+    assert r.get("panel")[0] == 1
+    assert r._sources["panel"].next_refresh - r._sources["panel"].fetched_at <= refresher_module.RETRY_SECONDS + 5
+
+def test_fallback_has_no_age_and_is_not_refetched_on_read(cache):
+    calls = []
+    r = Refresher()
+    r.register("conditions", lambda: calls.append(1) or {"timestamp": "N/A"}, ttl=300, is_valid=lambda c: c["timestamp"] != "N/A")
+    assert r.get("conditions") == ({"timestamp": "N/A"}, None)
+    assert r.get("conditions")[1] is None
+    assert calls == [1]  # Later reads wait for the background retry instead of blocking
+    assert r.last_good("conditions", default="default") == "default"
+
+def test_slow_source_does_not_hold_up_the_others(cache):
+    release = threading.Event()
+    slow_calls = []
+    r = Refresher()
+    r.register("tide_archive", lambda: slow_calls.append(1) or release.wait(10), ttl=3600)
+    r.register("conditions", lambda: "fresh", ttl=3600)
+    r.start()
+    try:
+        deadline = time.time() + 5
+        while r._sources["conditions"].fetched_at is None and time.time() < deadline:
+            time.sleep(0.05)
+        assert r._sources["conditions"].value == "fresh"
+        time.sleep(1.5)  # At least one more pass of the scheduler
+        assert slow_calls == [1]  # Still running, so not submitted again
+    finally:
+        release.set()
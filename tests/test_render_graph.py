@@ -0,0 +1,53 @@
+import threading
+import time
+import pytest
+from render_graph import RenderGraph
+
+def test_nodes_are_computed_once_with_their_deps():
+    calls = []
+    graph = RenderGraph()
+    graph.add("a", lambda: calls.append("a") or 2)
+    graph.add("b", lambda a: calls.append("b") or a * 10, deps=["a"])
+    graph.add("c", lambda a, b: a + b, deps=["a", "b"])
+    assert graph.get("c") == 22
+    assert graph.get("b") == 20
+    assert calls == ["a", "b"]
+
+def test_failing_node_settles_on_its_fallback():
+    graph = RenderGraph()
+
+    @graph.node("broken", fallback="n/a")
+    def broken():
+        raise RuntimeError("upstream down")
+
+    graph.add("label", lambda value: f"<{value}>", deps=["broken"])
+    assert graph.get("label") == "<n/a>"
+
+def test_declaring_a_node_twice_raises():
+    graph = RenderGraph()
+    graph.add("a", lambda: 1)
+    with pytest.raises(ValueError):
+        graph.add("a", lambda: 2)
+
+def test_concurrent_consumers_share_one_computation():
+    calls = []
+    graph = RenderGraph()
+    graph.add("slow", lambda: calls.append(1) or time.sleep(0.1) or "done")
+    threads = [threading.Thread(target=graph.get, args=("slow",)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert graph.get("slow") == "done" and calls == [1]
+
+def test_prefetch_deadline_fixes_the_fallback_for_the_run():
+    release = threading.Event()
+    graph = RenderGraph()
+    graph.add("fast", lambda: "fast")
+    graph.add("slow", lambda: release.wait(5) and "late", fallback="fallback")
+    graph.add("uses_slow", lambda slow: slow, deps=["slow"])
+    assert graph.prefetch(["fast", "slow"], deadline=0.2) == {"fast": "fast", "slow": "fallback"}
+    release.set()
+    time.sleep(0.1)  # Let the late worker finish; it must not replace the value already served
+    assert graph.get("slow") == "fallback"
+    assert graph.get("uses_slow") == "fallback"
@@ -0,0 +1,61 @@
+import threading
+import time
+import pytest
+import singleflight
+
+def _run_concurrently(count, fn):
+    results, errors = [], []
+    def worker():
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+def test_concurrent_callers_share_one_call():
+    group = singleflight.SingleFlight()
+    calls = []
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "body"
+    results, errors = _run_concurrently(5, lambda: group.do("key", slow))
+    assert results == ["body"] * 5 and not errors
+    assert len(calls) == 1
+
+def test_error_reaches_every_waiter_and_is_not_cached():
+    group = singleflight.SingleFlight()
+    def failing():
+        time.sleep(0.2)
+        raise ValueError("boom")
+    results, errors = _run_concurrently(3, lambda: group.do("key", failing))
+    assert not results and len(errors) == 3
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert group.do("key", lambda: "recovered") == "recovered"
+
+def test_different_keys_run_separately():
+    group = singleflight.SingleFlight()
+    assert group.do("a", lambda: 1) == 1
+    assert group.do("b", lambda: 2) == 2
+
+def test_coalesce_keys_on_arguments():
+    calls = []
+
+    @singleflight.coalesce
+    def fetch(x):
+        calls.append(x)
+        return x
+
+    assert fetch(1) == 1 and fetch(2) == 2
+    assert calls == [1, 2]  # Sequential calls aren't deduplicated, only overlapping ones
+
+def test_exception_in_leader_does_not_leave_key_stuck():
+    group = singleflight.SingleFlight()
+    with pytest.raises(RuntimeError):
+        group.do("key", lambda: (_ for _ in ()).throw(RuntimeError("x")))
+    assert group._calls == {}
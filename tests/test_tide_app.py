@@ -0,0 +1,96 @@
+import datetime
+import numpy as np
+import pytest
+import tide_app
+
+PERIOD = 12.4206 * 3600  # M2, seconds
+PEAK = 1000.0  # Seconds after the start: a high between two 6-minute samples
+
+def _sinusoid(hours=26):
+    seconds = np.arange(0, hours * 3600, 360, dtype=float)
+    return seconds, 2.0 + 1.5 * np.cos(2 * np.pi * (seconds - PEAK) / PERIOD)
+
+@pytest.mark.parametrize("plateau", [2, 3])
+def test_flat_topped_peak_is_reported_once(plateau):
+    heights = np.array([0, 1, 2] + [3] * plateau + [2, 1, 0, 1, 2], dtype=float)
+    high_times, high_heights, low_times, _ = tide_app.find_tide_extrema(np.arange(len(heights), dtype=float), heights, window=2)
+    assert len(high_times) == 1 and high_heights[0] == pytest.approx(3.0, abs=0.2)
+    assert 3 <= high_times[0] <= 2 + plateau
+    assert list(low_times) == [5.0 + plateau]
+
+def test_window_drops_ripples():
+    seconds, heights = _sinusoid()
+    rippled = heights.copy()
+    rippled[100:103] += [0.05, -0.05, 0.05]  # A wiggle on a falling limb
+    assert len(tide_app.find_tide_extrema(seconds, rippled, window=0)[0]) > len(tide_app.find_tide_extrema(seconds, heights)[0])
+    highs, _, lows, _ = tide_app.find_tide_extrema(seconds, rippled)
+    assert len(highs) == 3 and len(lows) == 2
+
+def test_parabola_refines_peaks_off_the_grid():
+    seconds, heights = _sinusoid()
+    high_times, high_heights, low_times, low_heights = tide_app.find_tide_extrema(seconds, heights)
+    assert high_times[:2] == pytest.approx([PEAK, PEAK + PERIOD], abs=5)
+    assert high_heights == pytest.approx(3.5, abs=1e-3)
+    assert low_times[0] == pytest.approx(PEAK + PERIOD / 2, abs=5)
+    assert low_heights == pytest.approx(0.5, abs=1e-3)
+
+def test_datetime_input_gives_datetime_peaks():
+    seconds, heights = _sinusoid()
+    times = np.datetime64("2026-10-17T00:00", "s") + seconds.astype("timedelta64[s]")
+    high_times = tide_app.find_tide_extrema(times, heights)[0]
+    assert high_times.dtype == times.dtype
+    assert abs(high_times[0] - np.datetime64("2026-10-17T00:16:40")) <= np.timedelta64(5, "s")
+
+def test_too_few_samples():
+    assert all(len(part) == 0 for part in tide_app.find_tide_extrema(np.arange(2.0), np.array([1.0, 2.0])))
+
+START = datetime.datetime(2026, 10, 17, tzinfo=datetime.timezone.utc)
+
+def _series(hours=26):
+    seconds, heights = _sinusoid(hours)
+    times = np.datetime64("2026-10-17T00:00", "s") + seconds.astype("timedelta64[s]")
+    return tide_app.TideSeries(times, heights)
+
+def _at(seconds):
+    return START + datetime.timedelta(seconds=seconds)
+
+def test_height_at_interpolates_between_samples():
+    series = tide_app.TideSeries(np.array(["2026-10-17T00:00", "2026-10-17T00:06"], dtype="datetime64[s]"), [1.0, 2.0])
+    assert series.height_at(_at(90)) == pytest.approx(1.25)
+    assert series.height_at(_at(-600)) == 1.0 and series.height_at(_at(3600)) == 2.0  # Clamped at the ends
+
+def test_next_extrema_filters_by_kind():
+    series = _series()
+    events = series.next_extrema(_at(0), count=3)
+    assert [label for _, _, label in events] == ["high", "low", "high"]
+    assert abs((events[0][0] - _at(PEAK)).total_seconds()) < 5
+    lows = series.next_extrema(_at(0), count=2, kind="low")
+    assert [label for _, _, label in lows] == ["low", "low"]
+    assert series.next_high(_at(PEAK + 10)) == events[2][0]
+    assert series.next_low(_at(26 * 3600)) is None
+
+def test_trend_between_and_after_the_extrema():
+    series = _series(hours=8)  # High at ~17 min, low at ~6.5 h, then rising to the end
+    assert series.trend(_at(0)) == "Rising"
+    assert series.trend(_at(3 * 3600)) == "Falling"
+    last_low = series.extrema()[-1]
+    assert not last_low[2]
+    assert series.trend(last_low[0] + datetime.timedelta(minutes=30)) == "Rising"  # Past the last turning point
+
+def test_trend_after_the_last_extremum_follows_the_final_slope():
+    falling = tide_app.TideSeries(np.array(["2026-10-17T00:00", "2026-10-17T00:06", "2026-10-17T00:12"], dtype="datetime64[s]"), [3.0, 2.0, 1.0])
+    assert falling.extrema() == [] and falling.trend(_at(60)) == "Falling"
+
+def test_observations_off_the_grid_are_dropped():
+    pred_times = np.array(["2026-10-17T00:00", "2026-10-17T00:06", "2026-10-17T00:12"], dtype="datetime64[s]")
+    obs_times = np.array(["2026-10-17T00:00", "2026-10-17T00:03", "2026-10-17T00:12", "2026-10-17T00:18"], dtype="datetime64[s]")
+    observed, residual = tide_app.align_observations(pred_times, [1.0, 1.5, 2.0], obs_times, [1.25, 9.0, 1.75, 9.0])
+    assert np.array_equal(observed, [1.25, np.nan, 1.75], equal_nan=True)
+    assert np.array_equal(residual, [0.25, np.nan, -0.25], equal_nan=True)
+
+def test_latest_residual_is_the_newest_observation():
+    series = tide_app.TideSeries(np.array(["2026-10-17T00:00", "2026-10-17T00:06", "2026-10-17T00:12"], dtype="datetime64[s]"), [1.0, 1.5, 2.0])
+    assert series.latest_residual() is None
+    series.observe(np.array(["2026-10-17T00:00", "2026-10-17T00:06"], dtype="datetime64[s]"), [1.1, 1.8])
+    when, surge = series.latest_residual()
+    assert when == _at(360) and surge == pytest.approx(0.3)
@@ -0,0 +1,54 @@
+import datetime
+import numpy as np
+import pytest
+import tide_archive
+
+# Fake CO-OPS predictions: the height is the minute of the year / 1000, so slices are easy to check
+def _fake_request(calls, drop=0):
+    def request(product, station, first, last, timeout=None):
+        calls.append((product, first.year))
+        start = np.datetime64(f"{first.year}-01-01T00:00", "m")
+        times = np.arange(start, np.datetime64(f"{first.year + 1}-01-01T00:00", "m"), tide_archive.STEP)
+        values = ((times - start) // np.timedelta64(1, "m")).astype(np.float32) / 1000
+        return times[drop:].astype("datetime64[s]"), values[drop:]
+    return request
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(tide_archive, "ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setattr(tide_archive, "_years", {})
+    calls = []
+    monkeypatch.setattr(tide_archive.coops_client, "request", _fake_request(calls))
+    return calls
+
+def test_window_never_builds_by_default(archive):
+    with pytest.raises(FileNotFoundError):
+        tide_archive.window(datetime.datetime(2026, 3, 1), datetime.datetime(2026, 3, 2))
+    assert archive == []
+
+def test_build_missing_builds_once(archive):
+    assert tide_archive.build_missing([2026]) == [2026]
+    assert tide_archive.build_missing([2026]) == [2026]
+    assert archive == [("predictions", 2026)]
+
+def test_window_slices_on_the_grid_across_a_year_end(archive):
+    tide_archive.build_missing([2026, 2027])
+    times, heights = tide_archive.window(datetime.datetime(2026, 12, 31, 23, 50), datetime.datetime(2027, 1, 1, 0, 6))
+    assert times[0] == np.datetime64("2026-12-31T23:54:00")
+    assert times[-1] == np.datetime64("2027-01-01T00:06:00")
+    assert len(times) == len(heights) == 3
+    assert heights[-1] == pytest.approx(0.006)
+
+def test_aware_datetimes_are_converted_to_utc(archive):
+    tide_archive.build_missing([2026])
+    eastern = datetime.timezone(datetime.timedelta(hours=-5))
+    times, heights = tide_archive.window(datetime.datetime(2026, 1, 1, 0, 0, tzinfo=eastern), datetime.datetime(2026, 1, 1, 0, 0, tzinfo=eastern))
+    assert times[0] == np.datetime64("2026-01-01T05:00:00")
+    assert heights[0] == pytest.approx(0.3)
+
+def test_incomplete_year_is_not_written(archive, monkeypatch):
+    monkeypatch.setattr(tide_archive.coops_client, "request", _fake_request(archive, drop=10))
+    with pytest.raises(ValueError):
+        tide_archive.build_missing([2026])
+    with pytest.raises(FileNotFoundError):
+        tide_archive.load_year(2026)
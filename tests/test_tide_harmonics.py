@@ -0,0 +1,66 @@
+import json
+import os
+import numpy as np
+import pytest
+import tide_harmonics
+
+def _at(*stamps):
+    return np.array(stamps, dtype="datetime64[s]")
+
+def test_s2_peaks_at_greenwich_noon_and_midnight():
+    # S2 has no nodal correction, and V = 2T is 0 mod 360 whenever the mean Sun crosses Greenwich
+    model = tide_harmonics.HarmonicModel(["S2"], [1.0], [0.0])
+    heights = model.predict(_at("2026-10-17T00:00", "2026-10-17T03:00", "2026-10-17T12:00"))
+    assert heights == pytest.approx([1.0, 0.0, 1.0], abs=1e-6)
+
+def test_m2_repeats_every_lunar_half_day():
+    model = tide_harmonics.HarmonicModel(["M2"], [1.5], [100.0])
+    start = np.datetime64("2026-10-17T05:00", "s")
+    period = np.timedelta64(int(12.4206012 * 3600), "s")
+    first, later = model.predict(np.array([start, start + period]))
+    assert later == pytest.approx(first, abs=1e-3)
+    assert abs(first) <= 1.5 * 1.04  # f for M2 stays within a few percent of 1
+
+def test_chunks_match_a_single_pass(monkeypatch):
+    model = tide_harmonics.HarmonicModel(["M2", "K1", "M4"], [1.2, 0.3, 0.1], [10.0, 200.0, 45.0], datum_offset=1.4)
+    times = np.arange(np.datetime64("2026-01-01T00:00", "s"), np.datetime64("2026-01-02T00:00", "s"), np.timedelta64(360, "s"))
+    whole = model.predict(times)
+    monkeypatch.setattr(tide_harmonics, "CHUNK_SAMPLES", 7)
+    assert model.predict(times) == pytest.approx(whole)
+
+def test_unknown_constituents_are_skipped():
+    model = tide_harmonics.HarmonicModel(["M2", "XYZ"], [1.0, 5.0], [0.0, 0.0])
+    assert model.names == ["M2"]
+
+CONSTANTS = {
+    "harcon": {"HarmonicConstituents": [
+        {"name": "M2", "amplitude": 1.0, "phase_GMT": 0.0},
+        {"name": "SA", "amplitude": 0, "phase_GMT": 0.0},  # Zero amplitudes are dropped
+    ]},
+    "datums": {"datums": [{"name": "MSL", "value": 2.0}, {"name": "MLLW", "value": 0.5}, {"name": "STND", "value": None}]},
+}
+
+def test_checked_in_constants_need_no_request(tmp_path, monkeypatch):
+    monkeypatch.setattr(tide_harmonics, "CONSTANTS_DIR", str(tmp_path))
+    (tmp_path / "1234567.json").write_text(json.dumps(CONSTANTS))
+    def offline(*args, **kwargs):
+        raise RuntimeError("api.tidesandcurrents.noaa.gov is cooling down")
+    monkeypatch.setattr(tide_harmonics.http_client, "get_json", offline)
+    model = tide_harmonics.load_model("1234567")
+    assert model.names == ["M2"] and model.datum_offset == 1.5
+
+def test_missing_constants_are_fetched(tmp_path, monkeypatch):
+    monkeypatch.setattr(tide_harmonics, "CONSTANTS_DIR", str(tmp_path))
+    monkeypatch.setattr(tide_harmonics.http_client, "get_json",
+                        lambda url, **kwargs: CONSTANTS["harcon" if url.endswith("harcon.json") else "datums"])
+    assert tide_harmonics.load_model("1234567").names == ["M2"]
+
+# CO-OPS' own predictions for New London, saved with the constants by `python tide_harmonics.py`
+@pytest.mark.skipif(not os.path.exists(tide_harmonics.constants_path()), reason="station constants not checked in")
+def test_matches_published_predictions_for_new_london():
+    with open(tide_harmonics.constants_path()) as f:
+        constants = json.load(f)
+    published = constants["reference_predictions"]
+    model = tide_harmonics.model_from_constants(constants)
+    heights = model.predict(np.array([p["t"] for p in published], dtype="datetime64[s]"))
+    assert np.abs(heights - [p["v"] for p in published]).max() < 0.1  # Feet
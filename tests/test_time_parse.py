@@ -0,0 +1,49 @@
+import datetime
+import numpy as np
+import pytz
+import time_parse
+
+def _utc(*stamps):
+    return np.array(stamps, dtype="datetime64[s]")
+
+def test_trailing_z_is_utc():
+    assert (time_parse.parse_utc(["2025-04-09T09:00:00Z", "2025-12-31T23:59:59Z"]) == _utc("2025-04-09T09:00:00", "2025-12-31T23:59:59")).all()
+
+def test_offsets_are_applied():
+    parsed = time_parse.parse_utc(["2025-04-09T09:00:00-04:00", "2025-04-09T09:00:00+05:30", "2025-01-01T01:00:00+00:00"])
+    assert (parsed == _utc("2025-04-09T13:00:00", "2025-04-09T03:30:00", "2025-01-01T01:00:00")).all()
+
+def test_offset_can_cross_midnight_and_year_end():
+    assert time_parse.parse_utc(["2025-12-31T22:00:00-05:00"])[0] == np.datetime64("2026-01-01T03:00:00")
+
+def test_fractional_seconds_are_dropped():
+    parsed = time_parse.parse_utc(["2025-04-09T09:00:00.750-04:00", "2025-04-09T13:00:00.5Z"])
+    assert (parsed == _utc("2025-04-09T13:00:00", "2025-04-09T13:00:00")).all()
+
+def test_coops_strings_are_taken_as_utc():
+    assert (time_parse.parse_utc(["2025-04-09 09:00", "2025-04-09 09:06"]) == _utc("2025-04-09T09:00", "2025-04-09T09:06")).all()
+
+def test_mixed_column_falls_back_per_string():
+    # The basic ISO form isn't something numpy parses, so the whole column goes through fromisoformat
+    parsed = time_parse.parse_utc(["2025-04-09T09:00:00-04:00", "20250409T090000Z", "2025-04-09 09:06"])
+    assert (parsed == _utc("2025-04-09T13:00:00", "2025-04-09T09:00:00", "2025-04-09T09:06:00")).all()
+
+def test_empty_column():
+    parsed = time_parse.parse_utc([])
+    assert parsed.dtype == np.dtype("datetime64[s]") and len(parsed) == 0
+
+EASTERN = pytz.timezone("America/New_York")
+
+def test_to_local_across_spring_forward():
+    # 2026-03-08 02:00 EST -> 03:00 EDT, at 07:00 UTC
+    local = time_parse.to_local(_utc("2026-03-08T06:59:00", "2026-03-08T07:00:00"), EASTERN)
+    assert (local == _utc("2026-03-08T01:59:00", "2026-03-08T03:00:00")).all()
+
+def test_to_local_across_fall_back():
+    # 2026-11-01 02:00 EDT -> 01:00 EST, at 06:00 UTC: 01:30 happens twice
+    local = time_parse.to_local(_utc("2026-11-01T05:30:00", "2026-11-01T06:30:00"), EASTERN)
+    assert (local == _utc("2026-11-01T01:30:00", "2026-11-01T01:30:00")).all()
+
+def test_as_datetimes_are_aware_utc():
+    (value,) = time_parse.as_datetimes(_utc("2025-04-09T13:00:00"))
+    assert value == datetime.datetime(2025, 4, 9, 13, tzinfo=datetime.timezone.utc)
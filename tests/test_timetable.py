@@ -0,0 +1,73 @@
+import datetime
+import json
+import timetable
+
+def _train(num, stops):
+    return {"trainNum": num, "routeName": "Northeast Regional",
+            "stations": [{"code": code, "schDep": sch, "dep": None} for code, sch in stops]}
+
+TRAINS = [
+    _train("171", [("BOS", "2026-10-17T09:00:00-04:00"), ("MYS", "2026-10-17T10:30:00-04:00"), ("NYP", "2026-10-17T13:00:00-04:00")]),
+    _train("172", [("NYP", "2026-10-17T08:00:00-04:00"), ("MYS", "2026-10-17T10:45:00-04:00"), ("BOS", "2026-10-17T12:20:00-04:00")]),
+    _train("174", [("NYP", "2026-10-17T11:00:00-04:00"), ("MYS", "2026-10-17T13:40:00-04:00"), ("BOS", None)]),
+]
+
+def _at(hhmm):
+    return datetime.datetime.fromisoformat(f"2026-10-17T{hhmm}:00-04:00")
+
+def test_departures_sorted_and_after_a_time():
+    table = timetable.Timetable(TRAINS)
+    assert [d.train_num for d in table.next_departures("MYS", after=_at("08:00"), count=5)] == ["171", "172", "174"]
+    assert [d.train_num for d in table.next_departures("MYS", after=_at("10:30"), count=5)] == ["172", "174"]
+
+def test_destination_filters_on_later_stops():
+    table = timetable.Timetable(TRAINS)
+    assert [d.train_num for d in table.next_departures("MYS", "BOS", after=_at("08:00"), count=5)] == ["172", "174"]
+    assert [d.train_num for d in table.next_departures("MYS", "NYP", after=_at("08:00"), count=5)] == ["171"]
+    assert table.next_departures("MYS", "XXX", after=_at("08:00")) == []
+
+def test_stops_without_a_scheduled_departure_are_skipped():
+    table = timetable.Timetable(TRAINS)
+    assert [d.train_num for d in table.next_departures("BOS", after=_at("00:00"), count=5)] == ["171", "172"]
+    assert table.next_departures("NOWHERE") == []
+
+class _Response:
+    def __init__(self, status, body=b"", headers=None):
+        self.status_code = status
+        self._body = body
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def iter_content(self, chunk_size):
+        return [self._body[i:i + 7] for i in range(0, len(self._body), 7)]
+
+def _feed():
+    return json.dumps({"171": [TRAINS[0]], "172": [TRAINS[1]]}).encode()
+
+def test_store_recompiles_only_when_the_feed_changes(monkeypatch):
+    responses = [_Response(200, _feed(), {"ETag": '"v1"'}), _Response(200, _feed()), _Response(304)]
+    sent_headers = []
+    def fake_get(url, headers=None, stream=False):
+        sent_headers.append(headers)
+        return responses.pop(0)
+    monkeypatch.setattr(timetable.http_client, "get", fake_get)
+    store = timetable.TimetableStore(refresh_seconds=3600)
+    store.refresh()
+    compiled = store.timetable
+    assert sorted(compiled.stations()) == ["BOS", "MYS", "NYP"]
+    store.refresh()  # Within refresh_seconds: no request
+    assert len(sent_headers) == 1
+    store.refresh(force=True)  # Same bytes: the compiled timetable is kept
+    assert store.timetable is compiled
+    assert sent_headers[1] == {"If-None-Match": '"v1"'}
+    store.refresh(force=True)  # 304
+    assert store.timetable is compiled and not responses
@@ -0,0 +1,10 @@
+import pytest
+import weather_data
+
+def test_conditions_raise_instead_of_returning_defaults(cache, monkeypatch):
+    def down():
+        raise RuntimeError("api.weather.gov is cooling down")
+    monkeypatch.setattr(weather_data.observation_store.store, "latest", down)
+    with pytest.raises(RuntimeError):
+        weather_data.get_current_conditions()
+    assert cache.get("fn:weather_data.get_current_conditions:():[]") is None
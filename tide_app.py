@@ -1,6 +1,7 @@
-import requests
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
+import coops_client
+import tide_harmonics
+import tide_archive
+import time_parse
 import datetime
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
@@ -9,166 +10,292 @@ import numpy as np
 import matplotlib
 matplotlib.use('Agg')
 
-def get_tide_plot():
+PREDICTIONS_TIMEOUT = (3.05, 5)  # CO-OPS slower than this: predict locally instead
+
+# Function to find high and low tides in a sampled series, in one vectorized pass.
+# times are epoch seconds or datetime64, evenly or unevenly spaced; heights in feet.
+# Each turning point is refined with a parabola through it and its two neighbours, so the
+# peak time and height aren't snapped to the sample grid. A turning point only counts if
+# it's the highest (lowest) sample within `window` samples either side, which drops ripples.
+# Returns (high_times, high_heights, low_times, low_heights) with times in the input's type.
+def find_tide_extrema(times, heights, window=5):
+    times = np.asarray(times)
+    heights = np.asarray(heights, dtype=float)
+    is_datetime = np.issubdtype(times.dtype, np.datetime64)
+    seconds = times.astype("datetime64[ms]").astype(np.int64) / 1000.0 if is_datetime else times.astype(float)
+    if len(heights) < 3:
+        empty = times[:0]
+        return empty, heights[:0], empty, heights[:0]
+
+    # Direction of each step; flat steps take the direction before them so plateaus count once
+    slope = np.sign(np.diff(heights))
+    nonzero = np.where(slope != 0, np.arange(len(slope)), 0)
+    slope = slope[np.maximum.accumulate(nonzero)]
+    turns = np.flatnonzero(slope[:-1] != slope[1:]) + 1
+    turns = turns[slope[turns - 1] != 0]
+    is_high = slope[turns - 1] > 0
+
+    if window:
+        padded = np.pad(heights, window, mode="edge")
+        spans = np.lib.stride_tricks.sliding_window_view(padded, 2 * window + 1)[turns]
+        keep = np.where(is_high, heights[turns] >= spans.max(axis=1), heights[turns] <= spans.min(axis=1))
+        turns, is_high = turns[keep], is_high[keep]
+
+    # Vertex of the parabola through (i-1, i, i+1)
+    before, peak, after = heights[turns - 1], heights[turns], heights[turns + 1]
+    curvature = before - 2 * peak + after
+    offset = np.divide(0.5 * (before - after), curvature, out=np.zeros_like(curvature), where=curvature != 0)
+    peak_heights = peak - 0.25 * (before - after) * offset
+    step = np.where(offset < 0, seconds[turns] - seconds[turns - 1], seconds[turns + 1] - seconds[turns])
+    peak_seconds = seconds[turns] + offset * step
+
+    if is_datetime:
+        peak_times = np.round(peak_seconds * 1000).astype(np.int64).astype("datetime64[ms]").astype(times.dtype)
+    else:
+        peak_times = peak_seconds
+    return peak_times[is_high], peak_heights[is_high], peak_times[~is_high], peak_heights[~is_high]
+
+class TideSeries:
+    """Tide heights at sorted instants, with the highs and lows found once up front.
+    Every query is a binary search; times come back as aware UTC datetimes."""
+
+    def __init__(self, times, heights):
+        # times: naive UTC datetime64 (as from time_parse) or aware datetimes
+        times = np.asarray(times)
+        if np.issubdtype(times.dtype, np.datetime64):
+            self.seconds = times.astype("datetime64[s]").astype(np.int64).astype(float)
+        else:
+            self.seconds = np.array([t.timestamp() for t in times], dtype=float)
+        self.heights = np.asarray(heights, dtype=float)
+        high_times, high_heights, low_times, low_heights = find_tide_extrema(self.seconds, self.heights)
+        order = np.argsort(np.concatenate([high_times, low_times]), kind="stable")
+        self.extrema_seconds = np.concatenate([high_times, low_times])[order]
+        self.extrema_heights = np.concatenate([high_heights, low_heights])[order]
+        self.extrema_is_high = np.concatenate([np.ones(len(high_times), bool), np.zeros(len(low_times), bool)])[order]
+        self.observed = np.full(len(self.seconds), np.nan)  # Observed water level per sample, NaN if none
+        self.residual = np.full(len(self.seconds), np.nan)  # Observed minus predicted (surge)
+
+    def __len__(self):
+        return len(self.seconds)
+
+    @property
+    def times(self):
+        return [datetime.datetime.fromtimestamp(t, pytz.UTC) for t in self.seconds]
+
+    def height_at(self, when):
+        """Height at any instant, linearly interpolated between the bracketing samples."""
+        t = when.timestamp()
+        i = int(np.searchsorted(self.seconds, t))
+        if i == 0:
+            return float(self.heights[0])
+        if i == len(self.seconds):
+            return float(self.heights[-1])
+        t0, t1 = self.seconds[i - 1], self.seconds[i]
+        return float(self.heights[i - 1] + (self.heights[i] - self.heights[i - 1]) * (t - t0) / (t1 - t0))
+
+    def is_rising(self, when):
+        # Rising until the next high; past the last turning point, use the final slope
+        i = int(np.searchsorted(self.extrema_seconds, when.timestamp(), side="right"))
+        if i < len(self.extrema_seconds):
+            return bool(self.extrema_is_high[i])
+        return len(self.heights) > 1 and self.heights[-1] > self.heights[-2]
+
+    def trend(self, when):
+        return "Rising" if self.is_rising(when) else "Falling"
+
+    def next_extrema(self, when, count=2, kind=None):
+        """Next `count` turning points after `when` as (datetime, height, "high"/"low"); kind filters."""
+        i = int(np.searchsorted(self.extrema_seconds, when.timestamp(), side="right"))
+        events = []
+        while i < len(self.extrema_seconds) and len(events) < count:
+            label = "high" if self.extrema_is_high[i] else "low"
+            if kind is None or kind == label:
+                when_i = datetime.datetime.fromtimestamp(self.extrema_seconds[i], pytz.UTC)
+                events.append((when_i, float(self.extrema_heights[i]), label))
+            i += 1
+        return events
+
+    def next_high(self, when):
+        events = self.next_extrema(when, 1, "high")
+        return events[0][0] if events else None
+
+    def next_low(self, when):
+        events = self.next_extrema(when, 1, "low")
+        return events[0][0] if events else None
+
+    def observe(self, times, heights):
+        """Line observed water levels (naive UTC datetime64) up with the predictions."""
+        seconds = np.asarray(times, dtype="datetime64[s]").astype(np.int64).astype(float)
+        self.observed, self.residual = align_observations(self.seconds, self.heights, seconds, heights)
+
+    def latest_residual(self):
+        """(aware UTC datetime, surge in feet) at the newest observation, or None."""
+        observed = np.flatnonzero(np.isfinite(self.residual))
+        if not len(observed):
+            return None
+        i = observed[-1]
+        return datetime.datetime.fromtimestamp(self.seconds[i], pytz.UTC), float(self.residual[i])
+
+    def extrema(self):
+        """Every turning point as (datetime, height, is_high), oldest first."""
+        return [(datetime.datetime.fromtimestamp(t, pytz.UTC), float(h), bool(high))
+                for t, h, high in zip(self.extrema_seconds, self.extrema_heights, self.extrema_is_high)]
+
+# Function to get 6-minute predicted and observed tides (MLLW, feet) for whole UTC days, oldest first.
+# Predictions come from the year-long archive when it covers the window, else from CO-OPS
+# alongside the observations in one concurrent batch, else from the local harmonic engine.
+# Returns (times, heights, observed_times, observed_heights) as naive UTC datetime64 / float arrays
+def get_tide_data(start_date, end_date):
+    start_date, end_date = coops_client.utc_day(start_date), coops_client.utc_day(end_date)
+    start = datetime.datetime.combine(start_date, datetime.time())  # Naive UTC, the whole days CO-OPS returns
+    end = datetime.datetime.combine(end_date, datetime.time(23, 54))
+    products = ["water_level"]
+    try:
+        times, heights = tide_archive.window(start, end, build=False)  # Built by the refresher, never inside a render
+        heights = np.round(heights.astype(float), 3)
+    except Exception as e:
+        print(f"[DEBUG] Tide archive unavailable ({e}), fetching the window")
+        times = None
+        products.append("predictions")
+    fetched = coops_client.fetch_many(products, start_date, end_date, timeout=PREDICTIONS_TIMEOUT)
+    if times is None:
+        times, heights = fetched["predictions"]
+        if not len(times):
+            print("[DEBUG] CO-OPS predictions unavailable, using harmonic constants")
+            times, heights = tide_harmonics.get_model().predict_range(start, end)
+            heights = np.round(heights, 3)
+    return (times, heights) + fetched["water_level"]
+
+# Function to line observations up with predictions on the prediction time grid in one step.
+# Both are on 6-minute marks, so each observation either lands exactly on a prediction or is dropped.
+# Returns (observed, residual) arrays the length of the predictions, NaN where nothing was observed
+def align_observations(pred_times, pred_heights, obs_times, obs_heights):
+    pred_times, obs_times = np.asarray(pred_times), np.asarray(obs_times)
+    observed = np.full(len(pred_times), np.nan)
+    slots = np.searchsorted(pred_times, obs_times)
+    inside = slots < len(pred_times)
+    slots, obs_times, obs_heights = slots[inside], obs_times[inside], np.asarray(obs_heights, dtype=float)[inside]
+    exact = pred_times[slots] == obs_times
+    observed[slots[exact]] = obs_heights[exact]
+    return observed, observed - np.asarray(pred_heights, dtype=float)
+
+# Function to get the tide series for the plot window (a day back, four ahead), or None
+def get_tide_series():
+    local_now = datetime.datetime.now(pytz.timezone('America/New_York'))
+    start_date = local_now - datetime.timedelta(days=1)
+    end_date = local_now + datetime.timedelta(days=4)
+    try:
+        times, heights, observed_times, observed_heights = get_tide_data(start_date, end_date)
+        series = TideSeries(times, heights)
+        series.observe(observed_times, observed_heights)
+        return series
+    except Exception as e:
+        print(f"Error in get_tide_series: {e}")
+        return None
+
+# Function to plot a tide series (fetched here if not given). Returns (fig, series)
+def get_tide_plot(series=None):
     utc_now = datetime.datetime.now(pytz.UTC)
     local_tz = pytz.timezone('America/New_York')
     local_now = utc_now.astimezone(local_tz)
-    start_date = local_now - datetime.timedelta(days=1)
-    end_date = local_now + datetime.timedelta(days=4)
-    
-    url = (
-        f"https://api.tidesandcurrents.noaa.gov/api/prod/datagetter?"
-        f"begin_date={start_date.strftime('%Y%m%d')}&end_date={end_date.strftime('%Y%m%d')}&"
-        f"station=8461490&product=predictions&datum=MLLW&time_zone=gmt&interval=6&units=english&format=json"
-    )
-    print(f"Request URL: {url}")
-    
+    series = series if series is not None else get_tide_series()
+
     try:
-        session = requests.Session()
-        retry = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount("https://", adapter)
-        response = session.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        predictions = data.get("predictions", [])
-
-        times = []
-        heights = []
-        for pred in predictions:
-            timestamp = pred["t"]
-            time = datetime.datetime.strptime(timestamp, "%Y-%m-%d %H:%M").replace(tzinfo=pytz.UTC)
-            height = float(pred["v"])
-            times.append(time)
-            heights.append(height)
-
-        if not times:
-            print("No valid tide data available.")
-            raise ValueError("Empty predictions list")
-
-        print(f"First data point: {times[0].astimezone(local_tz).strftime('%Y-%m-%d %I:%M %p %Z')}")
-        print(f"Last data point: {times[-1].astimezone(local_tz).strftime('%Y-%m-%d %I:%M %p %Z')}")
-
-        tide_data = sorted(zip(times, heights), key=lambda x: x[0])
-        times, heights = zip(*tide_data)
-        times = list(times)
-        heights = list(heights)
-        times_local = [t.astimezone(local_tz) for t in times]
-
-        current_height = None
-        trend = None
-        for i, time in enumerate(times):
-            if time >= utc_now:
-                if i > 0:
-                    current_height = heights[i-1]
-                    trend = "Rising" if i > 1 and heights[i-1] > heights[i-2] else "Falling"
-                else:
-                    current_height = heights[0]
-                    trend = "Rising" if heights[1] > heights[0] else "Falling"
-                break
-        if current_height is None:
-            current_height = heights[-1]
-            trend = "Rising" if len(heights) > 1 and heights[-1] > heights[-2] else "Falling"
-
-        heights_array = np.array(heights)
-        highs = []
-        lows = []
-        window = 5
-        expected_tides = 10
-        for i in range(window, len(heights) - window):
-            if heights[i] == max(heights[i-window:i+window+1]):
-                highs.append((times[i], heights[i]))
-            if heights[i] == min(heights[i-window:i+window+1]):
-                lows.append((times[i], heights[i]))
-
-        if len(highs) < expected_tides or len(lows) < expected_tides:
-            highs = []
-            lows = []
-            for i in range(1, len(heights) - 1):
-                if heights[i] > heights[i-1] and heights[i] > heights[i+1]:
-                    highs.append((times[i], heights[i]))
-                if heights[i] < heights[i-1] and heights[i] < heights[i+1]:
-                    lows.append((times[i], heights[i]))
-
-        next_high = None
-        next_low = None
-        for time, height in highs:
-            if time > utc_now:
-                next_high = (time, height)
-                break
-        for time, height in lows:
-            if time > utc_now:
-                next_low = (time, height)
-                break
-
-        tidal_period = datetime.timedelta(hours=12, minutes=25)
-        if not next_high and highs:
-            next_high = (highs[0][0] + tidal_period, highs[0][1])
-            while next_high[0] <= utc_now:
-                next_high = (next_high[0] + tidal_period, next_high[1])
-        if not next_low and lows:
-            next_low = (lows[0][0] + tidal_period, lows[0][1])
-            while next_low[0] <= utc_now:
-                next_low = (next_low[0] + tidal_period, next_low[1])
-
-        next_high_time = next_high[0].astimezone(local_tz).strftime('%a %I:%M %p').replace(' 0', ' ').lstrip('0') if next_high else "N/A"
-        next_low_time = next_low[0].astimezone(local_tz).strftime('%a %I:%M %p').replace(' 0', ' ').lstrip('0') if next_low else "N/A"
-
-        plt.close('all')
-        fig, ax = plt.subplots(figsize=(5, 3))
+        if series is None or not len(series):
+            raise ValueError("No tide series")
+        times = series.seconds.astype(np.int64).astype("datetime64[s]")
+        heights = series.heights
+
+        # Plot in naive local wall time, converted for the whole series at once
+        times_local = time_parse.to_local(times, local_tz)
+        first_local, last_local = times_local[[0, -1]].astype(datetime.datetime)
+        print(f"First data point: {first_local.strftime('%Y-%m-%d %I:%M %p')}")
+        print(f"Last data point: {last_local.strftime('%Y-%m-%d %I:%M %p')}")
+
+        highs = [(time, height) for time, height, is_high in series.extrema() if is_high]
+        lows = [(time, height) for time, height, is_high in series.extrema() if not is_high]
+        has_observed = bool(np.isfinite(series.observed).any())
+
+        if has_observed:
+            fig, (ax, surge_ax) = plt.subplots(2, 1, figsize=(5, 3), sharex=True, gridspec_kw={"height_ratios": [3, 1]})
+        else:
+            fig, ax = plt.subplots(figsize=(5, 3))
+            surge_ax = None
         ax.plot(times_local, heights, color='black', linestyle='-', linewidth=1)
-        ax.axvline(local_now, color='red', linestyle='--', linewidth=1)
+        if has_observed:
+            ax.plot(times_local, series.observed, color='black', linestyle=':', linewidth=1)
+        ax.axvline(local_now.replace(tzinfo=None), color='red', linestyle='--', linewidth=1)
 
-        min_height = min(heights) - 0.5
-        max_height = max(heights) + 0.5
+        min_height = np.nanmin([heights.min(), np.nanmin(series.observed) if has_observed else np.inf]) - 0.5
+        max_height = np.nanmax([heights.max(), np.nanmax(series.observed) if has_observed else -np.inf]) + 0.5
         for high_time, high_height in highs:
-            high_time_local = high_time.astimezone(local_tz)
+            high_time_local = high_time.astimezone(local_tz).replace(tzinfo=None)
             time_str = high_time_local.strftime('%I:%M %p').lstrip('0')
             y_pos = min(high_height + 0.3, max_height - 0.2)
             ax.text(high_time_local, y_pos, time_str, ha='center', va='bottom', color='#000000', fontsize=4)
         for low_time, low_height in lows:
-            low_time_local = low_time.astimezone(local_tz)
+            low_time_local = low_time.astimezone(local_tz).replace(tzinfo=None)
             time_str = low_time_local.strftime('%I:%M %p').lstrip('0')
             y_pos = max(low_height - 0.3, min_height + 0.2)
             ax.text(low_time_local, y_pos, time_str, ha='center', va='top', color='#000000', fontsize=4)
 
-        start_time = times_local[0].replace(hour=0, minute=0, second=0, microsecond=0)
-        end_time = times_local[-1].replace(hour=23, minute=59, second=59, microsecond=999999)
+        start_time = first_local.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_time = last_local.replace(hour=23, minute=59, second=59, microsecond=999999)
         current_day = start_time
         day_count = 0
         while current_day < end_time:
             next_day = current_day + datetime.timedelta(days=1)
             if day_count % 2 == 0:
-                ax.axvspan(current_day, next_day, facecolor='#d0d0d0', alpha=0.3)
+                for axis in fig.get_axes():
+                    axis.axvspan(current_day, next_day, facecolor='#d0d0d0', alpha=0.3)
             current_day = next_day
             day_count += 1
 
-        ax.set_xlim(times_local[0], times_local[-1])
-        tick_times = [times_local[0] + datetime.timedelta(days=i) for i in range(int((times_local[-1] - times_local[0]).days) + 1)]
-        ax.set_xticks(tick_times)
-        ax.set_xticklabels([t.strftime('%a') for t in tick_times], rotation=25)
+        if surge_ax is not None:
+            # Surge panel: how far the observed level runs above or below the prediction
+            surge_ax.plot(times_local, series.residual, color='black', linestyle='-', linewidth=1)
+            surge_ax.axhline(0, color='#606060', linestyle='-', linewidth=0.5)
+            surge_ax.axvline(local_now.replace(tzinfo=None), color='red', linestyle='--', linewidth=1)
+            surge_ax.set_ylabel("Surge (ft)", color='#000000', fontsize=6)
+            surge_ax.tick_params(labelsize=6)
+
+        bottom_ax = surge_ax if surge_ax is not None else ax
+        ax.set_xlim(first_local, last_local)
+        tick_times = [first_local + datetime.timedelta(days=i) for i in range(int((last_local - first_local).days) + 1)]
+        bottom_ax.set_xticks(tick_times)
+        bottom_ax.set_xticklabels([t.strftime('%a') for t in tick_times], rotation=25)
         ax.set_ylim(min_height, max_height)
 
-        ax.set_facecolor('#A0B0D0')
-        for spine in ax.spines.values():
-            spine.set_color('#000000')
-        ax.tick_params(colors='#000000')
-        ax.grid(color='#A0A0A0', linestyle='--', alpha=0.5)
+        for axis in fig.get_axes():
+            axis.set_facecolor('#A0B0D0')
+            for spine in axis.spines.values():
+                spine.set_color('#000000')
+            axis.tick_params(colors='#000000')
+            axis.grid(color='#A0A0A0', linestyle='--', alpha=0.5)
+            axis.set_xlabel("")
         ax.set_title("Tide Height", color='#000000')
-        ax.set_xlabel("")
         ax.set_ylabel("Height (ft)", color='#000000')
-        plt.tight_layout()
+        fig.tight_layout()  # Figure-level so concurrent fetches don't lay out each other's plots
 
-        return fig, current_height, trend, next_high_time, next_low_time
+        return fig, series
     except Exception as e:
         print(f"Error in get_tide_plot: {e}")
         fig, ax = plt.subplots(figsize=(5, 3))
         ax.text(0.5, 0.5, "Tide Data Unavailable\nCheck Connection or Try Later", ha='center', va='center', color='black')
         ax.set_axis_off()
-        return fig, 0.0, "N/A", "N/A", "N/A"
+        return fig, None
+
+# Function to get just the tide numbers (no figure) from a series (fetched here if not given).
+# Returns (current_height, trend, next_high, next_low) with aware UTC datetimes
+def get_tide_summary(series=None):
+    series = series if series is not None else get_tide_series()
+    if series is None:
+        return 0.0, "N/A", None, None
+    now = datetime.datetime.now(pytz.UTC)
+    return round(series.height_at(now), 2), series.trend(now), series.next_high(now), series.next_low(now)
 
 if __name__ == "__main__":
-    fig, current_height, trend, next_high_time, next_low_time = get_tide_plot()
+    fig, series = get_tide_plot()
     if fig:
         plt.show()
     else:
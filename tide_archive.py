@@ -0,0 +1,112 @@
+# tide_archive.py
+# Year-long tide prediction archive: a full year of 6-minute CO-OPS predictions per station,
+# fetched once, stored as a float32 .npy file and memory-mapped. Any window is then a slice
+# of that file, with no request and no parsing. Files are only built here or by the dashboard's
+# refresher (build_missing), never while a page is rendering.
+#   python tide_archive.py            # build this year and next
+#   python tide_archive.py 2027 2028  # build specific years
+import datetime
+import os
+import sys
+import threading
+import numpy as np
+import coops_client
+
+STATION_ID = "8461490"  # New London, CT
+DATUM = coops_client.PRODUCTS["predictions"]["params"]["datum"]
+STEP = np.timedelta64(6, "m")
+ARCHIVE_DIR = os.environ.get(
+    "GLP_TIDE_ARCHIVE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "tides")
+)
+
+_years = {}  # (station, year) -> memory-mapped heights
+_years_lock = threading.Lock()
+
+# Function to get the archive file of a station's year
+def archive_path(year, station=STATION_ID):
+    return os.path.join(ARCHIVE_DIR, f"{station}_{year}_{DATUM.lower()}.npy")
+
+# Function to get the first instant (UTC) of a year
+def _year_start(year):
+    return np.datetime64(f"{year}-01-01T00:00", "m")
+
+# Function to build (or rebuild) a station's year file from CO-OPS
+def build_year(year, station=STATION_ID):
+    samples = int((_year_start(year + 1) - _year_start(year)) // STEP)
+    heights = np.full(samples, np.nan, dtype=np.float32)
+    times, values = coops_client.request("predictions", station, datetime.date(year, 1, 1), datetime.date(year, 12, 31))
+    index = ((times.astype("datetime64[m]") - _year_start(year)) // STEP).astype(np.int64)
+    on_grid = (index >= 0) & (index < samples)
+    heights[index[on_grid]] = values[on_grid]
+    missing = int(np.isnan(heights).sum())
+    if missing:
+        raise ValueError(f"{missing} predictions missing for {station} {year}")
+    path = archive_path(year, station)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        np.save(f, heights)
+    os.replace(temp_path, path)  # Readers never see a half-written file
+    print(f"[DEBUG] Tide archive: wrote {samples} predictions to {path}")
+
+# Function to build the given years (default: this year and next) that have no file yet.
+# Returns the years on disk; raises after trying every year if any build failed.
+def build_missing(years=None, station=STATION_ID):
+    this_year = datetime.datetime.now(datetime.timezone.utc).year
+    years = years or [this_year, this_year + 1]
+    error = None
+    for year in years:
+        if not os.path.exists(archive_path(year, station)):
+            try:
+                build_year(year, station)
+            except Exception as e:
+                print(f"[DEBUG] Tide archive: building {station} {year} failed: {e}")
+                error = error or e
+    if error:
+        raise error
+    return [year for year in years if os.path.exists(archive_path(year, station))]
+
+# Function to get a station's year as a memory-mapped array (FileNotFoundError if it isn't built yet)
+def load_year(year, station=STATION_ID, build=False):
+    key = (station, year)
+    if key not in _years:
+        with _years_lock:
+            if key not in _years:
+                path = archive_path(year, station)
+                if not os.path.exists(path):
+                    if not build:
+                        raise FileNotFoundError(path)
+                    build_year(year, station)
+                _years[key] = np.load(path, mmap_mode="r")
+    return _years[key]
+
+# Function to slice predictions between two instants (inclusive) from the archive.
+# Returns (naive UTC datetime64[s] times, heights); windows may cross a year boundary.
+def window(start, end, station=STATION_ID, build=False):
+    start = np.datetime64(_naive_utc(start), "m")
+    end = np.datetime64(_naive_utc(end), "m")
+    first = start + (-(start - _year_start(start.astype(object).year)) % STEP)  # Round up to the grid
+    times = np.arange(first, end + np.timedelta64(1, "m"), STEP)
+    parts = []
+    for year in range(first.astype(object).year, end.astype(object).year + 1):
+        in_year = times[(times >= _year_start(year)) & (times < _year_start(year + 1))]
+        if len(in_year):
+            offset = int((in_year[0] - _year_start(year)) // STEP)
+            parts.append(load_year(year, station, build)[offset:offset + len(in_year)])
+    heights = parts[0] if len(parts) == 1 else np.concatenate(parts)
+    return times.astype("datetime64[s]"), heights
+
+# Function to turn an aware datetime into naive UTC (numpy has no time zones)
+def _naive_utc(value):
+    if getattr(value, "tzinfo", None) is not None:
+        return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+if __name__ == "__main__":
+    years = [int(arg) for arg in sys.argv[1:]]
+    if years:
+        for year in years:
+            build_year(year)  # Explicit years are rebuilt even if they exist
+    else:
+        build_missing()
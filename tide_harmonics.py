@@ -0,0 +1,262 @@
+# tide_harmonics.py
+# Offline tide predictions for a CO-OPS station from its published harmonic constituents:
+#   h(t) = Z0 + sum f * A * cos(V(t) + u(t) - G)
+# V comes from the mean longitudes of the Moon and Sun (Meeus), f and u are Schureman's
+# nodal corrections, and G is NOAA's Greenwich phase. Everything is vectorized over time,
+# so days or years of predictions take milliseconds once the constants are loaded.
+# This is the fallback for when CO-OPS is down, so a station's constants can be checked in:
+#   python tide_harmonics.py           # snapshot New London's constants into tide_constants/
+#   python tide_harmonics.py 8467150   # or another station's
+import datetime
+import json
+import os
+import sys
+import threading
+import numpy as np
+import coops_client
+import http_client
+
+STATION_ID = "8461490"  # New London, CT
+MDAPI_URL = "https://api.tidesandcurrents.noaa.gov/mdapi/prod/webapi/stations"
+CONSTANTS_TTL = 30 * 24 * 3600  # Harmonic constants only change when NOAA re-analyses the station
+CONSTANTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tide_constants")
+CHUNK_SAMPLES = 50000  # Bound the (constituents x samples) work arrays for long ranges
+
+OBLIQUITY = np.radians(23.4393)  # Of the ecliptic
+LUNAR_INCLINATION = np.radians(5.145)  # Of the Moon's orbit to the ecliptic
+
+# Coefficients of V on (T, s, h, p, N, p1, 90 degrees) and the nodal group giving f and u
+BASE_CONSTITUENTS = {
+    "Z0": ((0, 0, 0, 0, 0, 0, 0), None),
+    "SA": ((0, 0, 1, 0, 0, 0, 0), None),
+    "SSA": ((0, 0, 2, 0, 0, 0, 0), None),
+    "MM": ((0, 1, 0, -1, 0, 0, 0), "Mm"),
+    "MF": ((0, 2, 0, 0, 0, 0, 0), "Mf"),
+    "2Q1": ((1, -4, 1, 2, 0, 0, 1), "O1"),
+    "Q1": ((1, -3, 1, 1, 0, 0, 1), "O1"),
+    "RHO": ((1, -3, 3, -1, 0, 0, 1), "O1"),
+    "O1": ((1, -2, 1, 0, 0, 0, 1), "O1"),
+    "M1": ((1, -1, 1, 1, 0, 0, -1), "M1"),
+    "P1": ((1, 0, -1, 0, 0, 0, 1), None),
+    "S1": ((1, 0, 0, 0, 0, 0, 0), None),
+    "K1": ((1, 0, 1, 0, 0, 0, -1), "K1"),
+    "J1": ((1, 1, 1, -1, 0, 0, -1), "J1"),
+    "OO1": ((1, 2, 1, 0, 0, 0, -1), "OO1"),
+    "2N2": ((2, -4, 2, 2, 0, 0, 0), "M2"),
+    "MU2": ((2, -4, 4, 0, 0, 0, 0), "M2"),
+    "N2": ((2, -3, 2, 1, 0, 0, 0), "M2"),
+    "NU2": ((2, -3, 4, -1, 0, 0, 0), "M2"),
+    "M2": ((2, -2, 2, 0, 0, 0, 0), "M2"),
+    "LAM2": ((2, -1, 0, 1, 0, 0, 2), "M2"),
+    "L2": ((2, -1, 2, -1, 0, 0, 2), "L2"),
+    "T2": ((2, 0, -1, 0, 0, 1, 0), None),
+    "S2": ((2, 0, 0, 0, 0, 0, 0), None),
+    "R2": ((2, 0, 1, 0, 0, -1, 2), None),
+    "K2": ((2, 0, 2, 0, 0, 0, 0), "K2"),
+    "M3": ((3, -3, 3, 0, 0, 0, 2), "M3"),
+}
+
+# Shallow-water and compound constituents as sums of base constituents
+COMPOUND_CONSTITUENTS = {
+    "MSF": {"S2": 1, "M2": -1},
+    "2SM2": {"S2": 2, "M2": -1},
+    "MK3": {"M2": 1, "K1": 1},
+    "2MK3": {"M2": 2, "K1": -1},
+    "MN4": {"M2": 1, "N2": 1},
+    "M4": {"M2": 2},
+    "MS4": {"M2": 1, "S2": 1},
+    "S4": {"S2": 2},
+    "M6": {"M2": 3},
+    "S6": {"S2": 3},
+    "M8": {"M2": 4},
+}
+
+# Function to get the astronomical arguments (degrees) at epoch seconds:
+# T (hour angle of the mean Sun), s, h, p, N, p1 mean longitudes, and a constant 90
+def astronomical_arguments(seconds):
+    seconds = np.asarray(seconds, dtype=float)
+    centuries = (seconds / 86400.0 + 2440587.5 - 2451545.0) / 36525.0  # Julian centuries from J2000
+    hours = np.mod(seconds / 3600.0, 24.0)
+    return np.stack([
+        180.0 + 15.0 * hours,
+        218.3164477 + 481267.88123421 * centuries - 0.0015786 * centuries ** 2,
+        280.46646 + 36000.76983 * centuries + 0.0003032 * centuries ** 2,
+        83.3532465 + 4069.0137287 * centuries - 0.0103200 * centuries ** 2,
+        125.04452 - 1934.136261 * centuries + 0.0020708 * centuries ** 2,
+        282.93735 + 1.71946 * centuries + 0.00046 * centuries ** 2,
+        np.full_like(centuries, 90.0),
+    ])
+
+# Function to compute Schureman's nodal factors f and phase corrections u (degrees) per group
+def nodal_corrections(node, perigee):
+    node = np.radians(node)
+    incl = np.arccos(np.cos(OBLIQUITY) * np.cos(LUNAR_INCLINATION)
+                     - np.sin(OBLIQUITY) * np.sin(LUNAR_INCLINATION) * np.cos(node))
+    half_sum = np.arctan(np.cos(0.5 * (OBLIQUITY - LUNAR_INCLINATION)) / np.cos(0.5 * (OBLIQUITY + LUNAR_INCLINATION)) * np.tan(0.5 * node))
+    half_diff = np.arctan(np.sin(0.5 * (OBLIQUITY - LUNAR_INCLINATION)) / np.sin(0.5 * (OBLIQUITY + LUNAR_INCLINATION)) * np.tan(0.5 * node))
+    xi = node - half_sum - half_diff
+    nu = half_sum - half_diff
+    nu_prime = np.arctan2(np.sin(2 * incl) * np.sin(nu), np.sin(2 * incl) * np.cos(nu) + 0.3347)
+    two_nu_second = np.arctan2(np.sin(incl) ** 2 * np.sin(2 * nu), np.sin(incl) ** 2 * np.cos(2 * nu) + 0.0727)
+    big_p = np.radians(perigee) - xi
+
+    f_o1 = np.sin(incl) * np.cos(0.5 * incl) ** 2 / 0.3800
+    f_m2 = np.cos(0.5 * incl) ** 4 / 0.9154
+    tan_half = np.tan(0.5 * incl)
+    inv_qa = np.sqrt(0.25 + 1.5 * np.cos(incl) / np.cos(0.5 * incl) ** 2 * np.cos(2 * big_p)
+                     + 2.25 * np.cos(incl) ** 2 / np.cos(0.5 * incl) ** 4)
+    q = np.arctan2((5 * np.cos(incl) - 1) * np.sin(big_p), (7 * np.cos(incl) + 1) * np.cos(big_p))
+    inv_ra = np.sqrt(1 - 12 * tan_half ** 2 * np.cos(2 * big_p) + 36 * tan_half ** 4)
+    r = np.arctan2(np.sin(2 * big_p), 1 / (6 * tan_half ** 2) - np.cos(2 * big_p))
+
+    groups = {
+        "Mm": ((2 / 3 - np.sin(incl) ** 2) / 0.5021, 0 * xi),
+        "Mf": (np.sin(incl) ** 2 / 0.1578, -2 * xi),
+        "O1": (f_o1, 2 * xi - nu),
+        "M1": (f_o1 * inv_qa, xi - nu + q),
+        "K1": (np.sqrt(0.8965 * np.sin(2 * incl) ** 2 + 0.6001 * np.sin(2 * incl) * np.cos(nu) + 0.1006), -nu_prime),
+        "J1": (np.sin(2 * incl) / 0.7214, -nu),
+        "OO1": (np.sin(incl) * np.sin(0.5 * incl) ** 2 / 0.0164, -2 * xi - nu),
+        "M2": (f_m2, 2 * xi - 2 * nu),
+        "L2": (f_m2 * inv_ra, 2 * xi - 2 * nu - r),
+        "K2": (np.sqrt(19.0444 * np.sin(incl) ** 4 + 2.7702 * np.sin(incl) ** 2 * np.cos(2 * nu) + 0.0981), -two_nu_second),
+        "M3": (f_m2 ** 1.5, 3 * xi - 3 * nu),
+    }
+    return {name: (f, np.degrees(u)) for name, (f, u) in groups.items()}
+
+# Function to express a constituent as {base constituent: multiple}
+def _members(name):
+    if name in BASE_CONSTITUENTS:
+        return {name: 1}
+    return COMPOUND_CONSTITUENTS.get(name)
+
+class HarmonicModel:
+    """Harmonic constants of one station, ready to predict heights above a chart datum."""
+
+    def __init__(self, names, amplitudes, phases, datum_offset=0.0):
+        self.names = []
+        self.members = []
+        kept_amplitudes, kept_phases = [], []
+        for name, amplitude, phase in zip(names, amplitudes, phases):
+            members = _members(name.upper())
+            if members is None:
+                print(f"[DEBUG] Tide harmonics: skipping unknown constituent {name}")
+                continue
+            self.names.append(name.upper())
+            self.members.append(members)
+            kept_amplitudes.append(amplitude)
+            kept_phases.append(phase)
+        self.amplitudes = np.array(kept_amplitudes, dtype=float)
+        self.phases = np.array(kept_phases, dtype=float)  # Greenwich epoch G, degrees
+        self.datum_offset = datum_offset  # Mean sea level above the chart datum (Z0)
+        # V coefficients of every constituent, one row each
+        self.coefficients = np.array([
+            sum(multiple * np.array(BASE_CONSTITUENTS[base][0], dtype=float) for base, multiple in members.items())
+            for members in self.members
+        ]).reshape(len(self.members), 7)
+
+    def predict(self, times):
+        """Heights at the given times (datetime64 or epoch seconds), in the constants' units."""
+        times = np.asarray(times)
+        if np.issubdtype(times.dtype, np.datetime64):
+            seconds = times.astype("datetime64[s]").astype(np.int64).astype(float)
+        else:
+            seconds = times.astype(float)
+        heights = np.empty(len(seconds))
+        for start in range(0, len(seconds), CHUNK_SAMPLES):
+            chunk = seconds[start:start + CHUNK_SAMPLES]
+            heights[start:start + CHUNK_SAMPLES] = self._predict_chunk(chunk)
+        return heights
+
+    def _predict_chunk(self, seconds):
+        args = astronomical_arguments(seconds)
+        nodal = nodal_corrections(args[4], args[3])
+        f = np.ones((len(self.members), len(seconds)))
+        u = np.zeros((len(self.members), len(seconds)))
+        for i, members in enumerate(self.members):
+            for base, multiple in members.items():
+                group = BASE_CONSTITUENTS[base][1]
+                if group is not None:
+                    f[i] *= nodal[group][0] ** abs(multiple)
+                    u[i] += multiple * nodal[group][1]
+        phase = np.radians(self.coefficients @ args + u - self.phases[:, None])
+        return self.datum_offset + (self.amplitudes[:, None] * f * np.cos(phase)).sum(axis=0)
+
+    def predict_range(self, start, end, step_minutes=6):
+        """(datetime64[s] times, heights) every step_minutes from start to end inclusive."""
+        start = np.datetime64(_naive_utc(start), "s")
+        end = np.datetime64(_naive_utc(end), "s")
+        times = np.arange(start, end + np.timedelta64(1, "s"), np.timedelta64(step_minutes * 60, "s"))
+        return times, self.predict(times)
+
+# Function to turn an aware datetime into naive UTC (numpy has no time zones)
+def _naive_utc(value):
+    if getattr(value, "tzinfo", None) is not None:
+        return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+# Function to get the path of a station's checked-in constants
+def constants_path(station=STATION_ID):
+    return os.path.join(CONSTANTS_DIR, f"{station}.json")
+
+# Function to fetch a station's harmonic constituents and datums from the CO-OPS metadata API (cached on disk for a month)
+def fetch_constants(station=STATION_ID):
+    return {
+        "harcon": http_client.get_json(f"{MDAPI_URL}/{station}/harcon.json", params={"units": "english"}, ttl=CONSTANTS_TTL),
+        "datums": http_client.get_json(f"{MDAPI_URL}/{station}/datums.json", params={"units": "english"}, ttl=CONSTANTS_TTL),
+    }
+
+# Function to write a station's constants next to the code, to be committed, along with a day of
+# CO-OPS' own hourly predictions from them (MLLW) that tests/test_tide_harmonics.py checks the engine against
+def save_constants(station=STATION_ID):
+    constants = fetch_constants(station)
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    times, heights = coops_client.request("predictions", station, today, today)
+    hourly = times.astype("datetime64[m]").astype(np.int64) % 60 == 0
+    constants["reference_predictions"] = [
+        {"t": str(t), "v": float(v)} for t, v in zip(times[hourly].astype("datetime64[m]"), heights[hourly])
+    ]
+    os.makedirs(CONSTANTS_DIR, exist_ok=True)
+    with open(constants_path(station), "w") as f:
+        json.dump(constants, f, indent=1, sort_keys=True)
+    print(f"[DEBUG] Tide harmonics: saved constants for station {station} to {constants_path(station)}")
+
+# Function to build a model from {"harcon": ..., "datums": ...} as the metadata API returns them
+def model_from_constants(constants, datum="MLLW"):
+    levels = {d["name"]: d["value"] for d in constants["datums"].get("datums", []) if d.get("value") is not None}
+    constituents = [c for c in constants["harcon"]["HarmonicConstituents"] if c.get("amplitude")]
+    return HarmonicModel(
+        [c["name"] for c in constituents],
+        [c["amplitude"] for c in constituents],
+        [c["phase_GMT"] for c in constituents],
+        datum_offset=levels["MSL"] - levels[datum]
+    )
+
+# Function to load a station's model: from its checked-in constants if there are any (no request),
+# else from the metadata API, which is the host that's down when this fallback is needed
+def load_model(station=STATION_ID, datum="MLLW"):
+    path = constants_path(station)
+    if os.path.exists(path):
+        with open(path) as f:
+            constants = json.load(f)
+    else:
+        constants = fetch_constants(station)
+    model = model_from_constants(constants, datum)
+    print(f"[DEBUG] Tide harmonics: loaded {len(model.names)} constituents for station {station}")
+    return model
+
+_models = {}
+_models_lock = threading.Lock()
+
+# Function to get the shared model for a station (loaded on first use)
+def get_model(station=STATION_ID, datum="MLLW"):
+    key = (station, datum)
+    if key not in _models:
+        with _models_lock:
+            if key not in _models:
+                _models[key] = load_model(station, datum)
+    return _models[key]
+
+if __name__ == "__main__":
+    for station in sys.argv[1:] or [STATION_ID]:
+        save_constants(station)
@@ -0,0 +1,69 @@
+# time_parse.py
+# Vectorized timestamp parsing for the NOAA and NWS time series. A whole column of ISO-8601
+# strings becomes one datetime64 array in a single call, and converting it to local wall
+# time costs one time zone lookup per distinct hour instead of one per sample.
+import datetime
+import numpy as np
+import pytz
+
+# Function to parse ISO-8601 timestamps into a naive UTC datetime64[s] array.
+# Handles CO-OPS "2025-04-09 09:00", NWS "2025-04-09T09:00:00-04:00" and "...Z";
+# strings without an offset are taken as UTC.
+def parse_utc(values):
+    strings = np.asarray(values, dtype=str)
+    if strings.size == 0:
+        return np.array([], dtype="datetime64[s]")
+    try:
+        return _parse_columns(strings.ravel())
+    except ValueError:
+        # Mixed or unusual formats: fall back to one string at a time
+        return np.array([_parse_one(s) for s in strings.ravel()], dtype="datetime64[s]")
+
+# Function to split off and apply UTC offsets on the character grid of the whole column at once
+def _parse_columns(strings):
+    lengths = np.char.str_len(strings)
+    width = strings.dtype.itemsize // 4
+    chars = np.ascontiguousarray(strings).view("U1").reshape(len(strings), width).copy()
+    rows = np.arange(len(strings))
+
+    has_z = chars[rows, lengths - 1] == "Z"
+    sign = chars[rows, np.maximum(lengths - 6, 0)]
+    has_offset = ~has_z & (lengths >= 22) & ((sign == "+") | (sign == "-")) \
+        & (chars[rows, np.maximum(lengths - 3, 0)] == ":")
+
+    # "+HH:MM" -> minutes, reading digits straight from the code points
+    digits = chars.view(np.uint32).astype(np.int64) - ord("0")
+    tail = np.maximum(lengths - 5, 0)
+    offset_minutes = (digits[rows, tail] * 10 + digits[rows, tail + 1]) * 60 \
+        + digits[rows, tail + 3] * 10 + digits[rows, tail + 4]
+    offset_minutes = np.where(has_offset, np.where(sign == "-", -offset_minutes, offset_minutes), 0)
+
+    # Blank out the offset / "Z" so numpy can parse what's left
+    cut = np.where(has_offset, lengths - 6, np.where(has_z, lengths - 1, lengths))
+    chars[np.arange(width) >= cut[:, None]] = ""
+    local = chars.view(f"U{width}").ravel().astype("datetime64[ms]").astype("datetime64[s]")
+    return local - offset_minutes.astype("timedelta64[m]")
+
+# Function to parse a single timestamp to naive UTC
+def _parse_one(value):
+    parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(pytz.UTC).replace(tzinfo=None)
+    return parsed
+
+# Function to convert naive UTC datetime64 values to naive local wall time in bulk.
+# Offsets only change on the hour, so each distinct hour is looked up once.
+def to_local(times, tz):
+    times = np.asarray(times, dtype="datetime64[s]")
+    if times.size == 0:
+        return times
+    hours, inverse = np.unique(times.astype("datetime64[h]"), return_inverse=True)
+    offsets = np.array([
+        int(pytz.UTC.localize(hour).astimezone(tz).utcoffset().total_seconds())
+        for hour in hours.astype(datetime.datetime)
+    ], dtype="timedelta64[s]")
+    return times + offsets[inverse.reshape(times.shape)]
+
+# Function to turn naive UTC datetime64 values into aware UTC datetimes
+def as_datetimes(times):
+    return [t.replace(tzinfo=pytz.UTC) for t in np.asarray(times, dtype="datetime64[s]").astype(datetime.datetime)]
@@ -0,0 +1,131 @@
+# timetable.py
+# Station-indexed timetable compiled from the Amtraker trains feed: for every station its
+# departures sorted by scheduled time, so "next N trains from A to B" is a bisect.
+import bisect
+import datetime
+import hashlib
+import threading
+import time
+import disk_cache
+import http_client
+import json_stream
+
+TRAINS_URL = "https://api-v3.amtraker.com/v3/trains"
+REFRESH_SECONDS = 60  # Re-check the feed at most once a minute
+
+class Departure:
+    __slots__ = ("train_num", "route", "station", "scheduled", "actual", "downstream")
+
+    def __init__(self, train_num, route, station, scheduled, actual, downstream):
+        self.train_num = train_num
+        self.route = route
+        self.station = station
+        self.scheduled = scheduled  # Aware datetime of the scheduled departure
+        self.actual = actual  # Aware datetime of the actual/estimated departure, or None
+        self.downstream = downstream  # Station codes the train calls at afterwards, in order
+
+    def __repr__(self):
+        return f"Departure({self.train_num} {self.route} from {self.station} at {self.scheduled.isoformat()})"
+
+class Timetable:
+    """Departures per station code, sorted by scheduled time."""
+
+    def __init__(self, trains):
+        by_station = {}
+        for train in trains:
+            stations = train.get("stations", [])
+            codes = tuple(stop["code"] for stop in stations)
+            for i, stop in enumerate(stations):
+                scheduled = _parse_time(stop.get("schDep"))
+                if scheduled is None:
+                    continue
+                by_station.setdefault(stop["code"], []).append(Departure(
+                    train.get("trainNum"), train.get("routeName"), stop["code"],
+                    scheduled, _parse_time(stop.get("dep")), codes[i + 1:]
+                ))
+        self._index = {}  # station, or (origin, destination) -> (timestamps, departures)
+        for code, departures in by_station.items():
+            departures.sort(key=lambda d: d.scheduled)
+            self._index[code] = ([d.scheduled.timestamp() for d in departures], departures)
+        self._lock = threading.Lock()
+
+    def stations(self):
+        return [key for key in self._index if isinstance(key, str)]
+
+    def _lookup(self, origin, destination):
+        if destination is None:
+            return self._index.get(origin, ([], []))
+        key = (origin, destination)
+        if key not in self._index:
+            # First query of this pair: filter the origin's departures once, then it's a bisect too
+            _, departures = self._index.get(origin, ([], []))
+            departures = [d for d in departures if destination in d.downstream]
+            with self._lock:
+                self._index[key] = ([d.scheduled.timestamp() for d in departures], departures)
+        return self._index[key]
+
+    def next_departures(self, origin, destination=None, after=None, count=1):
+        """Next `count` departures from origin (calling at destination later, if given) after a time."""
+        times, departures = self._lookup(origin, destination)
+        after = after or datetime.datetime.now(datetime.timezone.utc)
+        start = bisect.bisect_right(times, after.timestamp())
+        return departures[start:start + count]
+
+class TimetableStore:
+    """Latest Timetable, recompiled only when the feed content changes."""
+
+    def __init__(self, url=TRAINS_URL, refresh_seconds=REFRESH_SECONDS):
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._fetched_at = None
+        self._etag = None
+        self._last_modified = None
+        self._digest = None  # SHA-1 of the feed the timetable was built from
+        self.timetable = Timetable([])
+
+    def refresh(self, force=False):
+        with self._lock:
+            if not force and not disk_cache.forcing_refresh() and self._fetched_at is not None \
+                    and time.monotonic() - self._fetched_at < self.refresh_seconds:
+                return
+            headers = {}
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+            with http_client.get(self.url, headers=headers, stream=True) as response:
+                if response.status_code == 304:
+                    self._fetched_at = time.monotonic()
+                    return
+                response.raise_for_status()
+                digest = hashlib.sha1()
+                chunks = []
+                for chunk in response.iter_content(chunk_size=json_stream.CHUNK_SIZE):
+                    digest.update(chunk)
+                    chunks.append(chunk)
+                self._etag = response.headers.get("ETag")
+                self._last_modified = response.headers.get("Last-Modified")
+            self._fetched_at = time.monotonic()
+            if digest.hexdigest() == self._digest:
+                return  # Same feed as last time: keep the compiled timetable
+            # Decode one train at a time straight into the index; the full object graph never exists
+            self.timetable = Timetable(train for _, train in json_stream.iter_items(chunks))
+            self._digest = digest.hexdigest()
+            print(f"[DEBUG] Timetable compiled for {len(self.timetable.stations())} stations")
+
+    def next_departures(self, origin, destination=None, after=None, count=1):
+        self.refresh()
+        return self.timetable.next_departures(origin, destination, after, count)
+
+# Function to parse an Amtraker timestamp ("2025-04-09T09:00:00-05:00"); None if missing
+def _parse_time(value):
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+# Process-wide store shared by every Streamlit session
+store = TimetableStore()
@@ -1,4 +1,8 @@
-import requests
+import cassette
+import circuit_breaker
+import disk_cache
+import singleflight
+import timetable
 from datetime import datetime, timedelta
 import pytz
 import WazeRouteCalculator
@@ -9,21 +13,37 @@ CHATHAM_ADDRESS = "82 Canterbury Road, Chatham, NJ 07928"
 MYSTIC_STATION_CODE = "MYS"
 BOSTON_STATION_CODE = "BOS"
 REGION = "US"
-CURRENT_TIME = datetime.now(pytz.timezone('US/Eastern'))
-TODAY = CURRENT_TIME.date().isoformat()
+DRIVE_TIME_TTL = 600  # Seconds a Waze route estimate stays fresh
+FALLBACK_DRIVE_TIME = "2 hours and 55 minutes"  # Typical time, when Waze is unavailable
+
+# Waze route lookup (recorded/replayed like the HTTP APIs, since Waze uses its own requests)
+@cassette.recorded("waze")
+def get_route_info(origin, destination, region):
+    route = WazeRouteCalculator.WazeRouteCalculator(origin, destination, region)
+    return route.calc_route_info()
+
+# Drive time in minutes between two addresses, cached per route (Waze takes 1-3 s per lookup)
+@disk_cache.memoize(ttl=DRIVE_TIME_TTL)
+@singleflight.coalesce
+def get_route_minutes(origin=GROTON_ADDRESS, destination=CHATHAM_ADDRESS, region=REGION):
+    minutes, _ = circuit_breaker.breaker("waze").call(get_route_info, origin, destination, region)
+    return minutes
+
+# Function to format a drive time in minutes, e.g. "2 hours and 55 minutes"
+def format_drive_time(minutes):
+    if minutes is None:
+        return FALLBACK_DRIVE_TIME
+    return f"{int(minutes // 60)} hours and {int(minutes % 60)} minutes"
 
 # Drive time from GLP to Chatham
 def get_drive_time():
     try:
-        route = WazeRouteCalculator.WazeRouteCalculator(GROTON_ADDRESS, CHATHAM_ADDRESS, REGION)
-        time, _ = route.calc_route_info()
-        hours = int(time // 60)
-        minutes = int(time % 60)
-        return f"{hours} hours and {minutes} minutes"
+        return format_drive_time(get_route_minutes(GROTON_ADDRESS, CHATHAM_ADDRESS))
     except Exception:
-        return "2 hours and 55 minutes"  # Fallback based on typical time
+        return FALLBACK_DRIVE_TIME
 
 # Next train from Mystic to Boston
+@singleflight.coalesce
 def get_next_train():
     static_schedule = [
         {"departure_time": "1:47 PM"},
@@ -31,32 +51,22 @@ def get_next_train():
         {"departure_time": "8:11 PM"},
         {"departure_time": "10:44 PM"}
     ]
+    # Evaluated per call: this runs for the life of the app, not once at import
+    current_time = datetime.now(pytz.timezone('US/Eastern'))
     try:
-        url = "https://api-v3.amtraker.com/v3/trains"
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        trains = response.json()
-        for train_list in trains.values():
-            for train in train_list:
-                stations = train.get("stations", [])
-                mystic_stop = next((s for s in stations if s["code"] == MYSTIC_STATION_CODE), None)
-                if mystic_stop and BOSTON_STATION_CODE in [s["code"] for s in stations]:
-                    mystic_idx = next(i for i, s in enumerate(stations) if s["code"] == MYSTIC_STATION_CODE)
-                    boston_idx = next(i for i, s in enumerate(stations) if s["code"] == BOSTON_STATION_CODE)
-                    if boston_idx > mystic_idx:
-                        dep_time_str = mystic_stop.get("schDep")
-                        if dep_time_str:
-                            dep_time = datetime.strptime(dep_time_str, "%Y-%m-%dT%H:%M:%S%z").astimezone(pytz.timezone('US/Eastern'))
-                            if dep_time > CURRENT_TIME and dep_time.date() == CURRENT_TIME.date():
-                                return dep_time.strftime("%I:%M %p").lstrip("0")
+        departures = timetable.store.next_departures(MYSTIC_STATION_CODE, BOSTON_STATION_CODE, after=current_time)
+        if departures:
+            dep_time = departures[0].scheduled.astimezone(pytz.timezone('US/Eastern'))
+            if dep_time.date() == current_time.date():
+                return dep_time.strftime("%I:%M %p").lstrip("0")
     except Exception as e:
         print(f"API Error: {e}")  # Optional logging for debugging
     # Fallback to static schedule
     for static in static_schedule:
         dep_time = pytz.timezone('US/Eastern').localize(
-            datetime.strptime(f"{TODAY} {static['departure_time']}", "%Y-%m-%d %I:%M %p")
+            datetime.strptime(f"{current_time.date().isoformat()} {static['departure_time']}", "%Y-%m-%d %I:%M %p")
         )
-        if dep_time > CURRENT_TIME:
+        if dep_time > current_time:
             return static["departure_time"]
     return "N/A"
 
@@ -2,6 +2,8 @@ import streamlit as st
 import barometric_app
 import moon_app
 import tide_app
+import tide_archive
+import tide_harmonics
 import matplotlib
 matplotlib.use('Agg', force=True)
 import matplotlib.pyplot as plt
@@ -9,17 +11,30 @@ import matplotlib.font_manager as fm
 import plotly.graph_objects as go
 import datetime
 import pytz
-from io import BytesIO
-import requests
+import http_client
+import render_graph
+from refresher import refresher
 from weather_data import (degrees_to_cardinal, format_time_diff, image_to_base64, 
                          get_moon_phase, get_current_conditions, get_wave_height, 
-                         get_forecast, get_sun_times, get_next_full_moon, get_current_water_temp)
-from compass_rose_gauge import CompassRoseGauge, get_windy_wave_data
-from travel_time import get_drive_time, get_next_train
+                         get_forecast, get_sun_times, get_next_full_moon, get_current_water_temp,
+                         get_average_water_temp,
+                         get_marine_alerts)
+from compass_rose_gauge import get_windy_wave_data, render_gauge_image, render_gauge_svg
+from travel_time import DRIVE_TIME_TTL, format_drive_time, get_route_minutes, get_next_train
 import os
 import importlib
 import sys
 
+RENDER_BUDGET = 12  # Seconds a render may spend waiting on upstream data
+GAUGE_WIDTH_PX = 2000  # The gauge strip is rendered at exactly the width it's shown at
+# Gauge strip backend, GLP_GAUGE_BACKEND:
+#   "svg" (default): a text template, sharp at any size and cheap to fill in, but its labels are set
+#         in whatever serif font the viewing browser has
+#   "png": the matplotlib raster, identical on every client because the fonts are rasterized here,
+#         assembled from cached dial faces and needle tiles
+# tests/test_compass_rose_gauge.py covers both.
+GAUGE_BACKEND = os.environ.get("GLP_GAUGE_BACKEND", "svg")
+
 # Default style config
 TITLE_FONT = "Arial"
 FONT_PATH = ""
@@ -119,54 +134,76 @@ with st.sidebar:
         apply_styles()
         st.success("Styles updated!")
 
-# Fetch travel data
-@st.cache_data(ttl=60)
-def get_travel_data(_timestamp):
-    try:
-        drive_time = get_drive_time()
-        next_train = get_next_train()
-        return drive_time, next_train
-    except Exception as e:
-        st.error(f"Error fetching travel data: {e}")
-        return "N/A", "N/A"
-
-timestamp = datetime.datetime.now().timestamp()
-drive_time, next_train = get_travel_data(timestamp)
-
-# Fetch conditions
-@st.cache_data(ttl=3600)
-def cached_current_conditions():
-    return get_current_conditions()
-conditions = cached_current_conditions()
-
-# Fetch wave height
-@st.cache_data(ttl=3600)
-def cached_wave_height():
-    return get_wave_height()
-wave_height, wave_timestamp = cached_wave_height()
-
-# Fetch tide data
-_, _, _, next_high_time, next_low_time = tide_app.get_tide_plot()
-
-# Fetch barometric pressure
-@st.cache_data(ttl=3600)
-def get_historical_baro_pressure():
-    fig, current_pressure, trend, pressure_3h_ago = barometric_app.get_barometric_plot_with_history()
-    if pressure_3h_ago is None:
-        pressure_3h_ago = current_pressure - 0.1
-    print(f"Current Pressure: {current_pressure:.2f} inHg, 3h Ago: {pressure_3h_ago:.2f} inHg")
-    return pressure_3h_ago
-
-baro_pressure_3h_ago = get_historical_baro_pressure()
-fig, baro_pressure, _, _ = barometric_app.get_barometric_plot_with_history()
-
-# Cache gauge rendering
-@st.cache_data(ttl=3600)
+# Keep every data panel warm in the background; reads return the last good value instantly
+refresher.register("conditions", get_current_conditions, ttl=300, is_valid=bool)
+refresher.register("wave", get_wave_height, ttl=3600, is_valid=lambda w: w[1] != "N/A")
+refresher.register("tide_series", tide_app.get_tide_series, ttl=600, is_valid=lambda s: s is not None)
+refresher.register("pressure_series", barometric_app.get_pressure_series, ttl=300, is_valid=len)
+refresher.register("water_temp", get_current_water_temp, ttl=1800, is_valid=lambda t: t is not None)
+refresher.register("water_temp_average", get_average_water_temp, ttl=6 * 3600)  # Monthly figure from water_temps.csv
+refresher.register("windy_waves", get_windy_wave_data, ttl=3600, is_valid=lambda w: w is not None)
+refresher.register("forecast", get_forecast, ttl=1800, is_valid=bool)
+refresher.register("drive_time", get_route_minutes, ttl=DRIVE_TIME_TTL)
+refresher.register("next_train", get_next_train, ttl=60)
+refresher.register("alerts", get_marine_alerts, ttl=300, is_valid=lambda a: not a[0]["description"].startswith("NWS "))
+refresher.register("tide_archive", tide_archive.build_missing, ttl=24 * 3600, is_valid=bool)  # Background only, never read
+refresher.register("tide_harmonics", tide_harmonics.get_model, ttl=tide_harmonics.CONSTANTS_TTL, is_valid=bool)  # Loads the fallback while CO-OPS is up
+refresher.start()
+
+panel_ages = {}
+def read_panel(name):
+    value, age = refresher.get(name)
+    panel_ages[name] = age
+    return value if age is not None else PANEL_DEFAULTS[name]  # Never fetched: the panel's own default
+
+# Function to caption how old a panel's value is; fallbacks have no age and get no caption
+def caption_panel_age(name, label):
+    if panel_ages.get(name) is not None:
+        st.caption(f"{label} updated {int(panel_ages[name] // 60)} min ago")
+
+# Every piece of data the page shows, declared once and computed at most once per run
+graph = render_graph.RenderGraph()
+PANEL_DEFAULTS = {
+    "drive_time": None,
+    "next_train": "N/A",
+    "conditions": {},
+    "wave": (0, "N/A"),
+    "tide_series": None,
+    "pressure_series": None,
+    "water_temp": None,
+    "water_temp_average": None,
+    "windy_waves": (0.0, 0.0),
+    "forecast": [],
+    "alerts": [{"description": "NWS alerts unavailable.", "flag": ""}],
+}
+for name, default in PANEL_DEFAULTS.items():
+    # Panels fall back to their last good value (or default) if they miss the budget
+    graph.add(name, lambda name=name: read_panel(name), fallback=refresher.last_good(name, default))
+graph.add("sun_times", get_sun_times, fallback=(None, None))
+graph.add("tide_summary", lambda series: tide_app.get_tide_summary(series) if series is not None else (0.0, "N/A", None, None),
+          deps=["tide_series"], fallback=(0.0, "N/A", None, None))
+graph.add("tide_figure", lambda series: tide_app.get_tide_plot(series) if series is not None else (None, None),
+          deps=["tide_series"], fallback=(None, None))
+graph.add("pressure_summary", lambda series: barometric_app.get_pressure_summary(series) if series is not None else (None, None, None),
+          deps=["pressure_series"], fallback=(None, None, None))
+graph.add("baro_figure", lambda series: barometric_app.get_barometric_plot_with_history(series) if series is not None else (None, None, None, None),
+          deps=["pressure_series"], fallback=(None, None, None, None))
+
+# Fetch every independent source at once, all within one render budget
+with http_client.render_budget(RENDER_BUDGET):
+    graph.prefetch(list(PANEL_DEFAULTS) + ["sun_times"], deadline=RENDER_BUDGET)
+drive_time = format_drive_time(graph.get("drive_time"))
+next_train = graph.get("next_train")
+conditions = graph.get("conditions")
+wave_height, wave_timestamp = graph.get("wave")
+_, _, next_high, next_low = graph.get("tide_summary")
+advisories = graph.get("alerts")
+
+# Function to render the gauge strip. Not wrapped in st.cache_data: the SVG template is cheap to fill in
+# and the PNG path already reuses its cached dial faces and per-dial tiles, so only changed dials redraw
 def render_gauge(wind_direction, wind_speed, wind_gusts, temperature, precip_24h, 
-                 baro_pressure, baro_pressure_3h_ago, humidity, water_temp, wave_height, swell_height):
-    gauge = CompassRoseGauge(width=50, height=18.75)
-    gauge.fig.set_dpi(150)
-    gauge.draw_compass_rose(
+                 baro_pressure, baro_pressure_3h_ago, humidity, water_temp, wave_height, swell_height, water_temp_average):
+    values = dict(
         wind_direction=wind_direction,
         wind_speed=wind_speed,
         wind_gusts=wind_gusts,
@@ -177,12 +214,13 @@ def render_gauge(wind_direction, wind_speed, wind_gusts, temperature, precip_24h
         humidity=humidity,
         water_temp=water_temp,
         wave_height=wave_height,
-        swell_height=swell_height
+        swell_height=swell_height,
+        water_temp_average=water_temp_average
     )
-    buf = BytesIO()
-    gauge.fig.savefig(buf, format="png", dpi=150, bbox_inches='tight')
-    buf.seek(0)
-    return buf
+    if GAUGE_BACKEND == "svg":
+        return render_gauge_svg(**values)
+    # Only the needles are drawn here; the dial faces are cached as a raster after the first render
+    return render_gauge_image(GAUGE_WIDTH_PX, **values)
 
 # Prepare gauge data with type conversion
 def to_float(value, default=0):
@@ -191,26 +229,36 @@ def to_float(value, default=0):
     except (ValueError, TypeError):
         return default
 
-wind_direction = to_float(conditions.get("wind_direction", 0))
-wind_speed = to_float(conditions.get("wind_speed", 0))
-wind_gusts = to_float(conditions.get("wind_gust", 0))
-temperature = to_float(conditions.get("temperature", 0))
-precip_24h = to_float(conditions.get("precipitation_totals", {}).get("24h", 0))
-humidity = to_float(conditions.get("humidity", 0))
-water_temp = to_float(get_current_water_temp())
-wave_height_value, swell_height_value = get_windy_wave_data()
-wave_height_value = to_float(wave_height_value)
-swell_height_value = to_float(swell_height_value)
-baro_pressure = to_float(baro_pressure)
-baro_pressure_3h_ago = to_float(baro_pressure_3h_ago)
+# Gauge image from the conditions, pressure, water temperature and wave panels
+@graph.node("gauge_image", deps=["conditions", "pressure_summary", "water_temp", "water_temp_average", "windy_waves"])
+def gauge_image(conditions, pressure_summary, water_temp, water_temp_average, windy_waves):
+    baro_pressure, _, baro_pressure_3h_ago = pressure_summary
+    if baro_pressure is not None and baro_pressure_3h_ago is None:
+        baro_pressure_3h_ago = baro_pressure - 0.1
+    wave_height_value, swell_height_value = windy_waves or (0.0, 0.0)
+    return render_gauge(
+        to_float(conditions.get("wind_direction", 0)),
+        to_float(conditions.get("wind_speed", 0)),
+        to_float(conditions.get("wind_gust", 0)),
+        to_float(conditions.get("temperature", 0)),
+        to_float(conditions.get("precipitation_totals", {}).get("24h", 0)),
+        to_float(baro_pressure),
+        to_float(baro_pressure_3h_ago),
+        to_float(conditions.get("humidity", 0)),
+        to_float(water_temp, None),  # None: the dial shows "--" instead of a made-up reading
+        to_float(wave_height_value),
+        to_float(swell_height_value),
+        to_float(water_temp_average, None)
+    )
 
 # Render gauge
-gauge_buf = render_gauge(
-    wind_direction, wind_speed, wind_gusts, temperature, precip_24h,
-    baro_pressure, baro_pressure_3h_ago, humidity, water_temp, wave_height_value, swell_height_value
-)
+gauge_buf = graph.get("gauge_image")
 st.markdown('<div class="gauge-container">', unsafe_allow_html=True)
-st.image(gauge_buf, width=2000)
+if GAUGE_BACKEND == "svg":
+    st.image(gauge_buf, width=GAUGE_WIDTH_PX)  # SVG markup is passed through as-is
+else:
+    st.image(gauge_buf, width=GAUGE_WIDTH_PX, output_format="PNG")  # Without it an opaque PNG is re-encoded as JPEG
+caption_panel_age("conditions", "Conditions")
 st.markdown('</div>', unsafe_allow_html=True)
 
 # Start main content
@@ -372,8 +420,8 @@ def get_weather_summary(forecast_periods, conditions, sunrise, sunset):
     return title, summary, icon_condition
 
 # Get weather summary and icon
-forecast_periods = get_forecast()
-sunrise, sunset = get_sun_times()
+forecast_periods = graph.get("forecast")
+sunrise, sunset = graph.get("sun_times")
 weather_title, weather_summary, icon_condition = get_weather_summary(forecast_periods, conditions, sunrise, sunset)
 weather_icon = get_weather_icon(icon_condition, weather_icon_map)
 
@@ -388,7 +436,6 @@ st.markdown(
 
 # Sunrise/Sunset, Tides, Moon, Travel
 now = datetime.datetime.now(pytz.timezone('US/Eastern'))
-today_str = now.strftime('%Y-%m-%d')
 
 sunrise_str = sunset_str = next_event = first_time = second_time = None
 if sunrise and sunset:
@@ -404,46 +451,13 @@ else:
 
 high_icon = image_to_base64("icons/7984977_high_tide_icon.png")
 low_icon = image_to_base64("icons/7984975_low_tide_icon.png")
-first_tide_label = first_tide_time = first_tide_icon = second_tide_label = second_tide_time = second_tide_icon = None
-
-if next_high_time != "N/A" and next_low_time != "N/A":
-    try:
-        high_time = datetime.datetime.strptime(f"{today_str} {next_high_time}", '%Y-%m-%d %a %I:%M %p')
-        low_time = datetime.datetime.strptime(f"{today_str} {next_low_time}", '%Y-%m-%d %a %I:%M %p')
-        high_dt = pytz.timezone('US/Eastern').localize(high_time)
-        low_dt = pytz.timezone('US/Eastern').localize(low_time)
-        if high_dt < now:
-            high_dt += datetime.timedelta(days=1)
-        if low_dt < now:
-            low_dt += datetime.timedelta(days=1)
-        if high_dt < low_dt:
-            first_tide_label = "High Tide"
-            first_tide_time = high_dt.strftime('%I:%M %p').lstrip('0')
-            first_tide_icon = high_icon
-            second_tide_label = "Low Tide"
-            second_tide_time = low_dt.strftime('%I:%M %p').lstrip('0')
-            second_tide_icon = low_icon
-        else:
-            first_tide_label = "Low Tide"
-            first_tide_time = low_dt.strftime('%I:%M %p').lstrip('0')
-            first_tide_icon = low_icon
-            second_tide_label = "High Tide"
-            second_tide_time = high_dt.strftime('%I:%M %p').lstrip('0')
-            second_tide_icon = high_icon
-    except ValueError as e:
-        first_tide_label = "High Tide"
-        first_tide_time = next_high_time
-        first_tide_icon = high_icon
-        second_tide_label = "Low Tide"
-        second_tide_time = next_low_time
-        second_tide_icon = low_icon
-else:
-    first_tide_label = "High Tide"
-    first_tide_time = "N/A"
-    first_tide_icon = high_icon
-    second_tide_label = "Low Tide"
-    second_tide_time = "N/A"
-    second_tide_icon = low_icon
+# Next high and low, soonest first when both are known
+tide_events = [(next_high, "High Tide", high_icon), (next_low, "Low Tide", low_icon)]
+if next_high and next_low:
+    tide_events.sort(key=lambda event: event[0])
+(first_tide_dt, first_tide_label, first_tide_icon), (second_tide_dt, second_tide_label, second_tide_icon) = tide_events
+first_tide_time = first_tide_dt.astimezone(now.tzinfo).strftime('%I:%M %p').lstrip('0') if first_tide_dt else "N/A"
+second_tide_time = second_tide_dt.astimezone(now.tzinfo).strftime('%I:%M %p').lstrip('0') if second_tide_dt else "N/A"
 
 moon_phase_name = get_moon_phase(now)
 moon_phase_icon_map = {
@@ -496,6 +510,7 @@ sun_tide_moon_html += '</div>'
 sun_tide_moon_html += '</div>'
 
 st.markdown(sun_tide_moon_html, unsafe_allow_html=True)
+caption_panel_age("drive_time", "Drive time")  # Served from the refresher, up to DRIVE_TIME_TTL old
 
 # Upcoming Weather
 st.markdown('<div class="card">', unsafe_allow_html=True)
@@ -538,64 +553,9 @@ else:
 st.markdown('</div>', unsafe_allow_html=True)
 
 # Weather Advisory
-def get_nws_alerts(zone_id="ANZ332"):
-    url = f"https://api.weather.gov/alerts/active/zone/{zone_id}"
-    headers = {
-        "User-Agent": "WeatherDashboard (your.email@example.com)",
-        "Accept": "application/geo+json"
-    }
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            alerts = data.get("features", [])
-            formatted_alerts = []
-            for alert in alerts:
-                props = alert.get("properties", {})
-                event = props.get("event", "Unknown")
-                severity = props.get("severity", "Unknown")
-                description = props.get("description", "").split("\n")
-                flag_map = {
-                    "Small Craft Advisory": "icons/small_craft.png",
-                    "Gale Warning": "icons/gale.png",
-                    "Storm Warning": "icons/storm.png",
-                    "Hurricane Warning": "icons/hurricane.png"
-                }
-                flag_file = flag_map.get(event, "icons/small_craft.png")
-                try:
-                    flag_base64 = image_to_base64(flag_file)
-                except Exception as e:
-                    flag_base64 = ""
-                    print(f"Failed to load flag {flag_file}: {e}")
-                details = ""
-                for line in description:
-                    if line.startswith("* WHAT"):
-                        details = line.replace("* WHAT...", "").strip()
-                    elif line.startswith("* WHEN"):
-                        details += f" until {line.replace('* WHEN...', '').strip()}"
-                expires = props.get("expires", "Unknown")
-                try:
-                    expires_dt = datetime.datetime.fromisoformat(expires.replace("Z", "+00:00"))
-                    expires_str = expires_dt.astimezone(pytz.timezone('US/Eastern')).strftime("%I:%M %p EDT").lstrip("0")
-                    details = details.replace("until further notice", f"until {expires_str}")
-                except:
-                    expires_str = "Unknown"
-                formatted_alerts.append({
-                    "event": event,
-                    "severity": severity,
-                    "description": details,
-                    "flag": flag_base64
-                })
-            return formatted_alerts if formatted_alerts else [{"description": "No active alerts.", "flag": ""}]
-        else:
-            return [{"description": f"NWS API Error: {response.status_code}", "flag": ""}]
-    except Exception as e:
-        return [{"description": f"NWS Request Failed: {e}", "flag": ""}]
-
 with st.container():
     st.markdown('<div class="card">', unsafe_allow_html=True)
     st.markdown("<h2>Weather Advisory</h2>", unsafe_allow_html=True)
-    advisories = get_nws_alerts()
     for advisory in advisories:
         flag = advisory.get("flag", "")
         event = advisory.get("event", "")
@@ -620,7 +580,7 @@ with row1_col1:
     with st.container():
         st.markdown('<div class="card">', unsafe_allow_html=True)
         st.markdown("<h2>Barometric Pressure</h2>", unsafe_allow_html=True)
-        fig, current_pressure, trend, _ = barometric_app.get_barometric_plot_with_history()
+        fig, current_pressure, trend, _ = graph.get("baro_figure")
         if fig:
             fig.patch.set_facecolor(PALETTE['app_bg'])
             for ax in fig.get_axes():
@@ -651,6 +611,7 @@ with row1_col1:
             )
             st.markdown('<div class="chart-container">', unsafe_allow_html=True)
             st.pyplot(fig)
+            plt.close(fig)  # Free the figure once it has been sent
             st.markdown('</div>', unsafe_allow_html=True)
         else:
             st.error("Failed to load barometric data")
@@ -661,7 +622,7 @@ with row1_col2:
     with st.container():
         st.markdown('<div class="card">', unsafe_allow_html=True)
         st.markdown("<h2>Tides</h2>", unsafe_allow_html=True)
-        fig, current_height, trend, next_high_time, next_low_time = tide_app.get_tide_plot()
+        fig, series = graph.get("tide_figure")
         if fig:
             fig.patch.set_facecolor(PALETTE['app_bg'])
             for ax in fig.get_axes():
@@ -682,47 +643,30 @@ with row1_col2:
                     ax.title.set_color(PALETTE['title'])
                     ax.title.set_fontfamily(TITLE_FONT)
             now = datetime.datetime.now(pytz.timezone('US/Eastern'))
-            today_str = now.strftime('%Y-%m-%d')
-            try:
-                high_time = datetime.datetime.strptime(f"{today_str} {next_high_time}", '%Y-%m-%d %a %I:%M %p')
-                low_time = datetime.datetime.strptime(f"{today_str} {next_low_time}", '%Y-%m-%d %a %I:%M %p')
-                high_dt = pytz.timezone('US/Eastern').localize(high_time)
-                low_dt = pytz.timezone('US/Eastern').localize(low_time)
-                if high_dt < now:
-                    high_dt += datetime.timedelta(days=1)
-                if low_dt < now:
-                    low_dt += datetime.timedelta(days=1)
-                next_tide_label = "Next High" if high_dt < low_dt else "Next Low"
-                next_tide_time = high_dt.strftime('%a %I:%M %p') if high_dt < low_dt else low_dt.strftime('%a %I:%M %p')
-                other_tide_label = "Next Low" if high_dt < low_dt else "Next High"
-                other_tide_time = low_dt.strftime('%a %I:%M %p') if high_dt < low_dt else high_dt.strftime('%a %I:%M %p')
-                next_tide_diff = format_time_diff(high_dt if high_dt < low_dt else low_dt, now)
-                other_tide_diff = format_time_diff(low_dt if high_dt < low_dt else high_dt, now)
-                st.markdown(
-                    f"""
-                    <div class="metric-box">
-                        <h3>Current Tide</h3>
-                        <div class="metric-extra">{to_float(current_height):.2f} ft ({trend})</div>
-                        <div class="metric-extra">{next_tide_label}: {next_tide_time} ({next_tide_diff})</div>
-                        <div class="metric-extra">{other_tide_label}: {other_tide_time} ({other_tide_diff})</div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-            except ValueError as e:
-                st.markdown(
-                    f"""
-                    <div class="metric-box">
-                        <h3>Current Tide</h3>
-                        <div class="metric-extra">{to_float(current_height):.2f} ft ({trend})</div>
-                        <div class="metric-extra">Next High: {next_high_time}</div>
-                        <div class="metric-extra">Next Low: {next_low_time}</div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
+            events = series.next_extrema(now, 2) if series is not None else []
+            tide_lines = "".join(
+                f'<div class="metric-extra">Next {kind.title()}: {when.astimezone(now.tzinfo).strftime("%a %I:%M %p")} '
+                f'({format_time_diff(when, now)})</div>'
+                for when, _, kind in events
+            ) or '<div class="metric-extra">Next High: N/A</div><div class="metric-extra">Next Low: N/A</div>'
+            current_height = series.height_at(now) if series is not None else 0.0
+            trend = series.trend(now) if series is not None else "N/A"
+            surge = series.latest_residual() if series is not None else None
+            surge_line = f'<div class="metric-extra">Surge: {surge[1]:+.2f} ft</div>' if surge else ""
+            st.markdown(
+                f"""
+                <div class="metric-box">
+                    <h3>Current Tide</h3>
+                    <div class="metric-extra">{to_float(current_height):.2f} ft ({trend})</div>
+                    {surge_line}
+                    {tide_lines}
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
             st.markdown('<div class="chart-container">', unsafe_allow_html=True)
             st.pyplot(fig)
+            plt.close(fig)  # Free the figure once it has been sent
             st.markdown('</div>', unsafe_allow_html=True)
         else:
             st.error("Failed to load tide data")
@@ -1,10 +1,16 @@
 # weather_data.py
-import requests
+import http_client
+import coops_client
+import observation_store
+import disk_cache
+import singleflight
+import time_parse
 import datetime
 import pytz
 import base64
 import os
 import csv
+import numpy as np
 from astral import LocationInfo
 from astral.sun import sun
 from math import floor, sin, pi
@@ -39,16 +45,13 @@ def image_to_base64(image_path):
         return None
 
 # Function to get current weather conditions from NWS API
+# Cached on disk so a restarted dashboard renders straight away. Raises if the observation can't be read
+@disk_cache.memoize(ttl=300)
+@singleflight.coalesce
 def get_current_conditions():
-    nws_url = "https://api.weather.gov/stations/KGON/observations"  # Weather station KGON (Groton, CT)
-    headers = {"User-Agent": "weather_app"}  # Identify our app to the API
-    now = datetime.datetime.now(pytz.UTC)  # Current time in UTC
-    
     try:
-        # Fetch the latest observation from NWS API
-        nws_response = requests.get(nws_url, headers=headers, params={"limit": 1})
-        nws_response.raise_for_status()  # Raise an error if the request fails
-        nws_data = nws_response.json()["features"][0]["properties"]
+        # Latest observation from the shared KGON feed
+        nws_data = observation_store.store.latest()
         
         # Try to use textDescription if available and non-empty
         text_description = nws_data["textDescription"] or None
@@ -192,59 +195,14 @@ def get_current_conditions():
         return result
 
     except Exception as e:
+        # No made-up defaults: the refresher serves the last good conditions instead
         print(f"[DEBUG] NWS Error: {e}")
-        # Default values if the API fails
-        result = {
-            "temperature": 50.0,
-            "wind_speed": 8,
-            "wind_direction": 0,
-            "wind_gust": "N/A",
-            "humidity": 50.0,
-            "precipitation": 0.0,
-            "precipitation_totals": {"1h": 0.0, "3h": 0.0, "6h": 0.0, "12h": 0.0, "24h": 0.0},
-            "visibility": 10.0,
-            "cloud_cover": 0,
-            "timestamp": "N/A",
-            "text_description": "Clear Conditions",  # Verbose default
-            "barometric_pressure": 30.0
-        }
-        print(f"[DEBUG] NWS Default Conditions: {result}")
-        return result
+        raise
 
 # Function to get precipitation totals from NWS API
 def get_nws_precipitation():
-    nws_url = "https://api.weather.gov/stations/KGON/observations"
-    headers = {"User-Agent": "weather_app"}
     try:
-        nws_response = requests.get(nws_url, headers=headers, params={"limit": 24})
-        nws_response.raise_for_status()
-        observations = nws_response.json()["features"]
-        
-        precip_totals = {"1h": 0.0, "3h": 0.0, "6h": 0.0, "12h": 0.0, "24h": 0.0}
-        now = datetime.datetime.now(pytz.UTC)
-        
-        for obs in observations:
-            props = obs["properties"]
-            timestamp = datetime.datetime.fromisoformat(props["timestamp"].replace("Z", "+00:00"))
-            precip = props.get("precipitationLastHour", {}).get("value", 0) or 0
-            time_diff = (now - timestamp).total_seconds() / 3600  # Hours ago
-            
-            if time_diff <= 1:
-                precip_totals["1h"] += precip
-            if time_diff <= 3:
-                precip_totals["3h"] += precip
-            if time_diff <= 6:
-                precip_totals["6h"] += precip
-            if time_diff <= 12:
-                precip_totals["12h"] += precip
-            if time_diff <= 24:
-                precip_totals["24h"] += precip
-        
-        # Convert mm to inches
-        for key in precip_totals:
-            precip_totals[key] = round(precip_totals[key] / 25.4, 2)
-        
-        return precip_totals
+        return observation_store.store.precipitation_totals()
     except Exception as e:
         print(f"[DEBUG] NWS Precip Error: {e}")
         return {"1h": 0.0, "3h": 0.0, "6h": 0.0, "12h": 0.0, "24h": 0.0}
@@ -252,7 +210,7 @@ def get_nws_precipitation():
 # Function to get wave height (placeholder, replace with your actual implementation)
 def get_wave_height():
     try:
-        response = requests.get("https://api.example.com/wave_height", headers={"User-Agent": "weather_app"})
+        response = http_client.get("https://api.example.com/wave_height")
         response.raise_for_status()
         data = response.json()
         wave_height = data.get("waveHeight", 0)
@@ -263,13 +221,11 @@ def get_wave_height():
         return 0, "N/A"
 
 # Function to get upcoming weather forecast from NWS API
+@singleflight.coalesce
 def get_forecast():
     url = "https://api.weather.gov/gridpoints/OKX/32,34/forecast/hourly"  # Forecast for grid OKX/32,34
-    headers = {"User-Agent": "weather_app"}
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        forecast_data = response.json()["properties"]["periods"]
+        forecast_data = http_client.get_json(url, ttl=1800)["properties"]["periods"]
         
         # Set up time periods for forecast (e.g., This Afternoon, Tomorrow Morning)
         now = datetime.datetime.now(pytz.timezone('US/Eastern'))
@@ -319,30 +275,29 @@ def get_forecast():
             base64_icon = image_to_base64(icon_path)
             return base64_icon if base64_icon else icon_path
         
-        # Build forecast periods
+        # Build forecast periods: parse and localize every start time in one go
+        eastern = pytz.timezone('US/Eastern')
+        start_utc = time_parse.parse_utc([period["startTime"] for period in forecast_data])
+        start_local = time_parse.to_local(start_utc, eastern)
+        start_dates = start_local.astype("datetime64[D]")
+        start_hours = (start_local - start_dates).astype("timedelta64[h]").astype(int)
         forecast_periods = []
         for label, target_date, target_hour in periods:
-            closest_period = None
-            min_diff = float('inf')
-            for period in forecast_data:
-                start_time = datetime.datetime.fromisoformat(period["startTime"].replace("Z", "+00:00"))
-                start_time_edt = start_time.astimezone(pytz.timezone('US/Eastern'))
-                if start_time_edt.date() == target_date:
-                    diff = abs(start_time_edt.hour - target_hour)
-                    if diff < min_diff:
-                        min_diff = diff
-                        condition = period["shortForecast"]  # Keep verbose description
-                        icon = match_icon(condition)
-                        closest_period = {
-                            "label": label,
-                            "time": start_time_edt,
-                            "temp": period["temperature"],
-                            "conditions": condition,
-                            "icon": icon
-                        }
-            if closest_period:
-                forecast_periods.append(closest_period)
-                print(f"[DEBUG] Forecast Period: {closest_period['label']}, Conditions: {closest_period['conditions']}")
+            candidates = np.flatnonzero(start_dates == np.datetime64(target_date))
+            if not len(candidates):
+                continue
+            best = candidates[np.argmin(np.abs(start_hours[candidates] - target_hour))]
+            period = forecast_data[best]
+            condition = period["shortForecast"]  # Keep verbose description
+            closest_period = {
+                "label": label,
+                "time": time_parse.as_datetimes(start_utc[best:best + 1])[0].astimezone(eastern),
+                "temp": period["temperature"],
+                "conditions": condition,
+                "icon": match_icon(condition)
+            }
+            forecast_periods.append(closest_period)
+            print(f"[DEBUG] Forecast Period: {closest_period['label']}, Conditions: {closest_period['conditions']}")
         
         return forecast_periods
     except Exception as e:
@@ -421,11 +376,8 @@ def get_next_full_moon():
 # Function to get current weather advisories from NWS API for Groton, CT
 def get_weather_advisories():
     url = "https://api.weather.gov/alerts/active?point=41.3148,-72.0076"  # Groton, CT coordinates
-    headers = {"User-Agent": "weather_app"}
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = http_client.get_json(url, ttl=300)
         alerts = data.get("features", [])
         if not alerts:
             return [{"message": "No active weather advisories for Groton, CT."}]
@@ -462,38 +414,80 @@ def get_weather_advisories():
         print(f"[DEBUG] Weather Advisories Error: {e}")
         return [{"message": "Unable to fetch weather advisories at this time."}]
 
+# Function to get active marine alerts for our NWS zone (Fishers Island Sound / Block Island Sound)
+@singleflight.coalesce
+def get_marine_alerts(zone_id="ANZ332"):
+    url = f"https://api.weather.gov/alerts/active/zone/{zone_id}"
+    headers = {
+        "User-Agent": "WeatherDashboard (your.email@example.com)",
+        "Accept": "application/geo+json"
+    }
+    try:
+        response = http_client.get(url, headers=headers)
+        if response.status_code == 200:
+            data = response.json()
+            alerts = data.get("features", [])
+            formatted_alerts = []
+            for alert in alerts:
+                props = alert.get("properties", {})
+                event = props.get("event", "Unknown")
+                severity = props.get("severity", "Unknown")
+                description = props.get("description", "").split("\n")
+                flag_map = {
+                    "Small Craft Advisory": "icons/small_craft.png",
+                    "Gale Warning": "icons/gale.png",
+                    "Storm Warning": "icons/storm.png",
+                    "Hurricane Warning": "icons/hurricane.png"
+                }
+                flag_file = flag_map.get(event, "icons/small_craft.png")
+                try:
+                    flag_base64 = image_to_base64(flag_file)
+                except Exception as e:
+                    flag_base64 = ""
+                    print(f"Failed to load flag {flag_file}: {e}")
+                details = ""
+                for line in description:
+                    if line.startswith("* WHAT"):
+                        details = line.replace("* WHAT...", "").strip()
+                    elif line.startswith("* WHEN"):
+                        details += f" until {line.replace('* WHEN...', '').strip()}"
+                expires = props.get("expires", "Unknown")
+                try:
+                    expires_dt = datetime.datetime.fromisoformat(expires.replace("Z", "+00:00"))
+                    expires_str = expires_dt.astimezone(pytz.timezone('US/Eastern')).strftime("%I:%M %p EDT").lstrip("0")
+                    details = details.replace("until further notice", f"until {expires_str}")
+                except:
+                    expires_str = "Unknown"
+                formatted_alerts.append({
+                    "event": event,
+                    "severity": severity,
+                    "description": details,
+                    "flag": flag_base64
+                })
+            return formatted_alerts if formatted_alerts else [{"description": "No active alerts.", "flag": ""}]
+        else:
+            return [{"description": f"NWS API Error: {response.status_code}", "flag": ""}]
+    except Exception as e:
+        return [{"description": f"NWS Request Failed: {e}", "flag": ""}]
+
 # Function to get current water temperature near Groton, CT (New London station)
 # Replace the existing get_current_water_temp function
 # Replace the existing get_current_water_temp function
 # Function to get current water temperature near Groton, CT (New London station)
+# Returns None when there's no reading, so callers never mistake a guess for a measurement
+@singleflight.coalesce
 def get_current_water_temp():
-    url = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
-    params = {
-        "station": "8461490",  # New London, CT
-        "product": "water_temperature",
-        "date": "today",
-        "units": "english",
-        "format": "json",
-        "time_zone": "gmt",  # Added required time zone
-        "application": "weather_dashboard"
-    }
-    headers = {"User-Agent": "weather_app"}
     try:
-        full_url = f"{url}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
-        print(f"[DEBUG] Water Temp URL: {full_url}")
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        if "data" not in data or not data["data"]:
+        reading = coops_client.latest("water_temperature")
+        if reading is None:
             print(f"[DEBUG] No water temp data available for today")
-            return 45.0
-        temp = float(data["data"][-1]["v"])  # Most recent value
-        timestamp = data["data"][-1]["t"]
+            return None
+        timestamp, temp = reading
         print(f"[DEBUG] Current Water Temp: {temp}°F at {timestamp}")
         return temp
     except Exception as e:
         print(f"[DEBUG] Water Temp Error: {e}")
-        return 45.0  # Fallback to approximate April average
+        return None
 
 # Function to get average water temperature for the current month
 def get_average_water_temp():